@@ -0,0 +1,273 @@
+"""
+Load test for the Chainlit RAG application (solution_app.py).
+
+This script starts two local stand-in servers that speak the same protocol as our Hugging Face endpoints:
+
+1. A TGI-style text-generation endpoint that streams tokens at a configurable rate
+2. A TEI-style feature-extraction endpoint that returns deterministic vectors
+
+It then imports solution_app.py against those servers (which indexes the documents), and simulates
+N concurrent chat sessions that each send a number of messages through the same LCEL RAG chain the app uses.
+
+Example:
+
+    uv run python loadtest.py --sessions 50 --messages-per-session 3 \\
+        --llm-latency-ms 150 --tokens-per-second 40 --embed-latency-ms 20
+
+Reported numbers: indexing time, time-to-first-token, per-stream tokens/s, aggregate tokens/s,
+p50/p95/p99 end-to-end latency, and how many embedding requests (and of what batch size) the endpoint received.
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_QUERIES = [
+    "What does Paul Graham say about startups?",
+    "How should founders think about growth?",
+    "What makes a good startup idea?",
+    "Why do startups die?",
+    "What is the best way to raise money?",
+    "How do you know when to quit your job to start a company?",
+    "What does it mean to make something people want?",
+    "How should a startup hire its first employees?",
+]
+
+FAKE_WORDS = "the a startup founder users growth idea build make want work hard fast money investors product".split()
+
+# ---- STAND-IN ENDPOINTS ---- #
+
+class EndpointStats:
+    """Counts the requests the stand-in endpoints receive so we can see the effect of batching."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.embed_requests = 0
+        self.embed_inputs = 0
+        self.generate_requests = 0
+
+    def record_embed(self, n_inputs):
+        with self.lock:
+            self.embed_requests += 1
+            self.embed_inputs += n_inputs
+
+    def record_generate(self):
+        with self.lock:
+            self.generate_requests += 1
+
+def fake_embedding(text, dim):
+    """Return a deterministic unit-ish vector for a piece of text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+def make_embed_handler(args, stats):
+    class EmbedHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            inputs = body.get("inputs", [])
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            stats.record_embed(len(inputs))
+
+            # TEI cost model: a fixed per-request cost plus a (much smaller) per-input cost
+            time.sleep((args.embed_latency_ms + args.embed_per_input_ms * len(inputs)) / 1000)
+
+            payload = json.dumps([fake_embedding(text, args.embed_dim) for text in inputs]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return EmbedHandler
+
+def make_llm_handler(args, stats):
+    class LLMHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            stats.record_generate()
+            parameters = body.get("parameters") or {}
+            n_tokens = min(args.output_tokens, parameters.get("max_new_tokens") or args.output_tokens)
+            tokens = [random.choice(FAKE_WORDS) + " " for _ in range(n_tokens)]
+
+            time.sleep(args.llm_latency_ms / 1000)
+
+            if not body.get("stream"):
+                payload = json.dumps([{"generated_text": "".join(tokens)}]).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            for i, token in enumerate(tokens):
+                last = i == len(tokens) - 1
+                event = {
+                    "index": i + 1,
+                    "token": {"id": i, "text": token, "logprob": -0.1, "special": False},
+                    "generated_text": "".join(tokens) if last else None,
+                    "details": {"finish_reason": "length", "generated_tokens": len(tokens), "seed": None} if last else None,
+                }
+                self.wfile.write(f"data:{json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if not last:
+                    time.sleep(1.0 / args.tokens_per_second)
+
+        def log_message(self, format, *args):
+            pass
+
+    return LLMHandler
+
+def start_server(handler_cls):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ---- LOAD GENERATION ---- #
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+async def run_message(chain, query):
+    start = time.perf_counter()
+    first_token_at = None
+    n_tokens = 0
+
+    async for chunk in chain.astream({"query": query}):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        n_tokens += 1
+
+    end = time.perf_counter()
+    first_token_at = first_token_at or end
+    stream_time = end - first_token_at
+    return {
+        "ttft": first_token_at - start,
+        "e2e": end - start,
+        "tokens": n_tokens,
+        "tokens_per_s": (n_tokens - 1) / stream_time if n_tokens > 1 and stream_time > 0 else float("nan"),
+    }
+
+async def run_session(app, session_id, args, results, errors):
+    # Each Chainlit session builds its own chain in on_chat_start
+    await asyncio.sleep(random.random() * args.ramp_up_s)
+    chain = app.build_rag_chain()
+
+    for i in range(args.messages_per_session):
+        query = SAMPLE_QUERIES[(session_id + i) % len(SAMPLE_QUERIES)]
+        try:
+            results.append(await run_message(chain, query))
+        except Exception as e:
+            errors.append(f"session {session_id}, message {i}: {e}")
+
+async def run_load(app, args):
+    results, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(app, i, args, results, errors) for i in range(args.sessions)))
+    return results, errors, time.perf_counter() - start
+
+def summarize(results, errors, wall_time, indexing_time, stats):
+    ttft = [r["ttft"] for r in results]
+    e2e = [r["e2e"] for r in results]
+    rates = [r["tokens_per_s"] for r in results if r["tokens_per_s"] == r["tokens_per_s"]]
+    total_tokens = sum(r["tokens"] for r in results)
+
+    return {
+        "indexing_time_s": indexing_time,
+        "messages": len(results),
+        "errors": len(errors),
+        "wall_time_s": wall_time,
+        "ttft_s": {p: percentile(ttft, p) for p in (50, 95, 99)},
+        "e2e_latency_s": {p: percentile(e2e, p) for p in (50, 95, 99)},
+        "stream_tokens_per_s_p50": percentile(rates, 50),
+        "aggregate_tokens_per_s": total_tokens / wall_time if wall_time else float("nan"),
+        "embed_requests": stats.embed_requests,
+        "embed_inputs": stats.embed_inputs,
+        "generate_requests": stats.generate_requests,
+    }
+
+def print_summary(summary, errors):
+    print("\n---- Load test results ----")
+    print(f"Indexing time:            {summary['indexing_time_s']:.2f}s")
+    print(f"Messages:                 {summary['messages']} ({summary['errors']} errors) in {summary['wall_time_s']:.2f}s")
+    for name, key in (("Time to first token", "ttft_s"), ("End-to-end latency", "e2e_latency_s")):
+        values = summary[key]
+        print(f"{name + ':':<26}p50 {values[50]:.3f}s  p95 {values[95]:.3f}s  p99 {values[99]:.3f}s")
+    print(f"Tokens/s per stream (p50): {summary['stream_tokens_per_s_p50']:.1f}")
+    print(f"Aggregate tokens/s:       {summary['aggregate_tokens_per_s']:.1f}")
+    print(f"Embedding endpoint:       {summary['embed_requests']} requests for {summary['embed_inputs']} inputs")
+    for error in errors[:5]:
+        print(f"  error: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test solution_app.py against local stand-in HF endpoints")
+    parser.add_argument("--sessions", type=int, default=20, help="Number of concurrent chat sessions")
+    parser.add_argument("--messages-per-session", type=int, default=3, help="Messages sent sequentially by each session")
+    parser.add_argument("--ramp-up-s", type=float, default=1.0, help="Spread session starts over this many seconds")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="Stand-in LLM delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50, help="Stand-in LLM streaming rate per request")
+    parser.add_argument("--output-tokens", type=int, default=128, help="Tokens generated per response")
+    parser.add_argument("--embed-latency-ms", type=float, default=20, help="Stand-in embedding cost per request")
+    parser.add_argument("--embed-per-input-ms", type=float, default=1, help="Stand-in embedding cost per input text")
+    parser.add_argument("--embed-dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--json", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    stats = EndpointStats()
+    llm_server = start_server(make_llm_handler(args, stats))
+    embed_server = start_server(make_embed_handler(args, stats))
+
+    # Point the app at the stand-in endpoints before it is imported
+    os.environ["HF_LLM_ENDPOINT"] = f"http://127.0.0.1:{llm_server.server_address[1]}"
+    os.environ["HF_EMBED_ENDPOINT"] = f"http://127.0.0.1:{embed_server.server_address[1]}"
+    os.environ.setdefault("HF_TOKEN", "hf_loadtest")
+
+    # The app loads its data with a relative path
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(app_dir)
+    sys.path.insert(0, app_dir)
+
+    # Importing the app indexes the documents
+    start = time.perf_counter()
+    import solution_app
+    indexing_time = time.perf_counter() - start
+    indexing_requests, indexing_inputs = stats.embed_requests, stats.embed_inputs
+
+    results, errors, wall_time = asyncio.run(run_load(solution_app, args))
+
+    stats.embed_requests -= indexing_requests
+    stats.embed_inputs -= indexing_inputs
+    summary = summarize(results, errors, wall_time, indexing_time, stats)
+    print_summary(summary, errors)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    llm_server.shutdown()
+    embed_server.shutdown()
+
+if __name__ == "__main__":
+    main()
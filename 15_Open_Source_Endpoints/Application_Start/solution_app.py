@@ -7,6 +7,7 @@ from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEndpointEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain_core.prompts import PromptTemplate
 from langchain.schema.output_parser import StrOutputParser
 from langchain.schema.runnable import RunnablePassthrough
@@ -46,12 +47,89 @@ documents = document_loader.load()
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=30)
 split_documents = text_splitter.split_documents(documents)
 
-hf_embeddings = HuggingFaceEndpointEmbeddings(
+hf_endpoint_embeddings = HuggingFaceEndpointEmbeddings(
     model=HF_EMBED_ENDPOINT,
     task="feature-extraction",
     huggingfacehub_api_token=HF_TOKEN,
 )
 
+# -- EMBEDDING MICRO-BATCHING -- #
+"""
+Every chat session embeds its query with a single-item request. Under load we collect the
+queries that arrive within a few milliseconds of each other and send them to the TEI endpoint
+as one batched feature-extraction call, then hand each vector back to the session that asked for it.
+"""
+HF_EMBED_MAX_BATCH_SIZE = int(os.environ.get("HF_EMBED_MAX_BATCH_SIZE", 32))
+HF_EMBED_BATCH_WAIT_MS = float(os.environ.get("HF_EMBED_BATCH_WAIT_MS", 5))
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings instance and coalesces concurrent `aembed_query` calls into batched
+    `aembed_documents` calls.
+
+    A batch is flushed when it reaches `max_batch_size` or `max_wait_ms` after its first query,
+    whichever comes first. Document embedding (indexing) is already batched and is passed straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()  # In-flight batches, referenced so they are not garbage collected
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch):
+        try:
+            vectors = await self.embeddings.aembed_documents([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+hf_embeddings = MicroBatchingEmbeddings(
+    hf_endpoint_embeddings,
+    max_batch_size=HF_EMBED_MAX_BATCH_SIZE,
+    max_wait_ms=HF_EMBED_BATCH_WAIT_MS,
+)
+
 async def add_documents_async(vectorstore, documents):
     await vectorstore.aadd_documents(documents)
 
@@ -139,6 +217,17 @@ hf_llm = HuggingFaceEndpoint(
     huggingfacehub_api_token=HF_TOKEN,
 )
 
+def build_rag_chain():
+    """
+    This function builds the LCEL RAG chain used by every chat session.
+
+    It is kept separate from the Chainlit handlers so the same chain can be driven outside of a Chainlit session (see loadtest.py).
+    """
+    return (
+        {"context": itemgetter("query") | hf_retriever, "query": itemgetter("query")}
+        | rag_prompt | hf_llm
+    )
+
 @cl.author_rename
 def rename(original_author: str):
     """
@@ -161,10 +250,7 @@ async def start_chat():
     The user session is a dictionary that is unique to each user session, and is stored in the memory of the server.
     """
 
-    lcel_rag_chain = (
-        {"context": itemgetter("query") | hf_retriever, "query": itemgetter("query")}
-        | rag_prompt | hf_llm
-    )
+    lcel_rag_chain = build_rag_chain()
 
     cl.user_session.set("lcel_rag_chain", lcel_rag_chain)
 
@@ -181,7 +267,7 @@ async def main(message: cl.Message):
 
     msg = cl.Message(content="")
 
-    for chunk in await cl.make_async(lcel_rag_chain.stream)(
+    async for chunk in lcel_rag_chain.astream(
         {"query": message.content},
         config=RunnableConfig(callbacks=[cl.LangchainCallbackHandler()]),
     ):
@@ -0,0 +1,221 @@
+"""Durable node memoization for rerunning reports.
+
+With the CHECKPOINT_DB environment variable set, the outputs of section-level nodes are stored in a
+SQLite file keyed by a hash of the node's name, its input state and the run's configuration. Rerunning a
+report with the same plan and configuration replays the stored outputs, so a run that crashed late only
+redoes the sections that had not finished.
+
+This is not a LangGraph checkpointer: it does not resume a thread, it only skips repeated work. Only nodes
+whose output is fully determined by their input state and configuration are memoized. Nodes that talk to
+the user (report planning and its review, the multi-agent supervisor) always run, so feedback is never
+answered with a stale plan.
+
+Outputs are stored as JSON. Only plain values, messages, Commands and the state models in MEMO_MODELS are
+decoded, so a memo file can at worst replay wrong content, never run code. Its path still comes only
+from the environment of the server process, never from a run's configurable, which API callers control.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from enum import Enum
+from typing import Any, Callable, Dict, Tuple
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Command, Send
+from pydantic import BaseModel
+
+from open_deep_research.configuration import Configuration
+from open_deep_research.state import SearchQuery, Section
+
+logger = logging.getLogger(__name__)
+
+# Part of every key; bump it when node outputs change shape so old entries are ignored
+NODE_MEMO_VERSION = 2
+
+# Configuration fields that only affect scheduling, not node outputs
+UNKEYED_CONFIG_FIELDS = frozenset({"llm_rate_limits", "llm_governor_scope"})
+
+def _canonical(value: Any) -> Any:
+    """JSON-compatible form of a state value that is stable across runs (message ids are dropped)."""
+    if isinstance(value, BaseMessage):
+        return {"type": value.type, "content": _canonical(value.content), "name": value.name,
+                "tool_calls": _canonical(getattr(value, "tool_calls", None)),
+                "tool_call_id": getattr(value, "tool_call_id", None)}
+    if isinstance(value, BaseModel):
+        return {"__model__": type(value).__name__, **_canonical(value.model_dump())}
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items() if key != "id"}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=repr)
+    if isinstance(value, Enum):
+        return value.value
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+# State models node outputs may contain, by name
+MEMO_MODELS: Dict[str, type] = {"Section": Section, "SearchQuery": SearchQuery}
+
+def _encode(value: Any) -> Any:
+    """JSON-compatible form of a node output, raising TypeError for values that cannot be decoded again."""
+    if isinstance(value, BaseMessage):
+        return {"__message__": message_to_dict(value)}
+    if isinstance(value, BaseModel):
+        name = type(value).__name__
+        if MEMO_MODELS.get(name) is not type(value):
+            raise TypeError(f"{name} is not a memoizable state model")
+        return {"__model__": name, "data": value.model_dump(mode="json")}
+    if isinstance(value, Command):
+        return {"__command__": {"update": _encode(value.update), "goto": _encode(value.goto)}}
+    if isinstance(value, Send):
+        return {"__send__": {"node": value.node, "arg": _encode(value.arg)}}
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Only dicts with string keys can be memoized")
+        return {"__dict__": {key: _encode(item) for key, item in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"{type(value).__name__} cannot be memoized")
+
+def _decode(value: Any) -> Any:
+    """Rebuild a node output from _encode's form."""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__message__" in value:
+        return messages_from_dict([value["__message__"]])[0]
+    if "__model__" in value:
+        return MEMO_MODELS[value["__model__"]].model_validate(value["data"])
+    if "__command__" in value:
+        return Command(update=_decode(value["__command__"]["update"]), goto=_decode(value["__command__"]["goto"]))
+    if "__send__" in value:
+        return Send(value["__send__"]["node"], _decode(value["__send__"]["arg"]))
+    return {key: _decode(item) for key, item in value["__dict__"].items()}
+
+def node_memo_key(node: str, state: Dict[str, Any], config: RunnableConfig | None) -> str:
+    """Hash a node invocation by node name, input state and configuration.
+
+    Args:
+        node: The node's name
+        state: The node's input state
+        config: The run's config; thread_id and scheduling-only options are not part of the key
+
+    Returns:
+        str: Hex digest identifying the invocation
+    """
+    configurable = dataclasses.asdict(Configuration.from_runnable_config(config))
+    configurable = {name: value for name, value in configurable.items() if name not in UNKEYED_CONFIG_FIELDS}
+    payload = json.dumps([NODE_MEMO_VERSION, node, _canonical(state), _canonical(configurable)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class NodeMemo:
+    """SQLite store of node outputs, as zlib-compressed JSON.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path: str):
+        """Open the store, creating its table if needed."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS node_memo "
+                         "(key TEXT PRIMARY KEY, node TEXT, value BLOB, created_at REAL)")
+        self._db.commit()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, output) for a stored invocation, or (False, None)."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM node_memo WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                try:
+                    value = _decode(json.loads(zlib.decompress(row[0])))
+                except Exception as e:
+                    logger.warning("Dropping unreadable node memo entry: %s", e)
+                    self._db.execute("DELETE FROM node_memo WHERE key = ?", (key,))
+                    self._db.commit()
+                else:
+                    self._stats["hits"] += 1
+                    return True, value
+            self._stats["misses"] += 1
+            return False, None
+
+    def set(self, key: str, node: str, value: Any):
+        """Store a node's output. Outputs that cannot be encoded are skipped."""
+        try:
+            data = zlib.compress(json.dumps(_encode(value)).encode("utf-8"))
+        except (TypeError, ValueError) as e:
+            logger.warning("Not memoizing %s, its output cannot be stored: %s", node, e)
+            return
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO node_memo (key, node, value, created_at) VALUES (?, ?, ?, ?)",
+                             (key, node, data, time.time()))
+            self._db.commit()
+            self._stats["stored"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hits, misses and stored outputs since the store was opened."""
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self):
+        """Drop every stored output."""
+        with self._lock:
+            self._db.execute("DELETE FROM node_memo")
+            self._db.commit()
+
+_node_memos: Dict[str, NodeMemo] = {}
+_node_memos_lock = threading.Lock()
+
+def get_node_memo(config: RunnableConfig | None) -> NodeMemo | None:
+    """Return the NodeMemo for $CHECKPOINT_DB, or None when checkpointing is off. The config is not consulted."""
+    path = os.environ.get("CHECKPOINT_DB")
+    if not path:
+        return None
+    with _node_memos_lock:
+        memo = _node_memos.get(path)
+        if memo is None:
+            memo = _node_memos[path] = NodeMemo(path)
+        return memo
+
+def memoized_node(fn: Callable) -> Callable:
+    """Memoize an async (state, config) node in $CHECKPOINT_DB.
+
+    Only use it on nodes whose output is fully determined by their input state and configuration, and
+    that neither interrupt nor depend on anything outside the graph state. Nodes are only memoized when
+    CHECKPOINT_DB is set. Exceptions are never stored, so a failed node runs again on the next attempt.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(state, config: RunnableConfig):
+        memo = get_node_memo(config)
+        if memo is None:
+            return await fn(state, config)
+
+        key = node_memo_key(name, state, config)
+        found, output = memo.get(key)
+        if found:
+            return output
+
+        output = await fn(state, config)
+        memo.set(key, name, output)
+        return output
+
+    return wrapper
@@ -36,6 +36,8 @@ class Configuration:
     report_structure: str = DEFAULT_REPORT_STRUCTURE # Defaults to the default report structure
     search_api: SearchAPI = SearchAPI.TAVILY # Default to TAVILY
     search_api_config: Optional[Dict[str, Any]] = None
+    llm_rate_limits: Optional[Dict[str, Dict[str, Any]]] = None # Per provider: requests_per_minute, tokens_per_minute, max_concurrency
+    llm_governor_scope: str = "run" # "run" for budgets per run, "process" to share them across runs
     
     # Graph-specific configuration
     number_of_queries: int = 2 # Number of search queries to generate per iteration
@@ -48,6 +50,7 @@ class Configuration:
     writer_model_kwargs: Optional[Dict[str, Any]] = None # kwargs for writer_model
     search_api: SearchAPI = SearchAPI.TAVILY # Default to TAVILY
     search_api_config: Optional[Dict[str, Any]] = None 
+    speculative_search: bool = False # Search follow-up queries while a section is being graded
     
     # Multi-agent specific configuration
     supervisor_model: str = "openai:gpt-4.1" # Model for supervisor agent in multi-agent setup
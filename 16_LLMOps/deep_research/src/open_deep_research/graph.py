@@ -1,6 +1,6 @@
-from typing import Literal
+import asyncio
+from typing import Literal, Optional
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 
@@ -11,6 +11,7 @@ from langgraph.types import interrupt, Command
 from open_deep_research.state import (
     ReportStateInput,
     ReportStateOutput,
+    Section,
     Sections,
     ReportState,
     SectionState,
@@ -29,16 +30,36 @@ from open_deep_research.prompts import (
     section_writer_inputs
 )
 
+from open_deep_research.checkpoint import memoized_node
 from open_deep_research.configuration import Configuration
+from open_deep_research.metrics import current_run_id, timed_node, write_run_summary
+from open_deep_research.streaming import (
+    get_report_stream,
+    release_report_stream,
+    reports_completed_sections,
+    start_report_stream,
+)
 from open_deep_research.utils import (
     format_sections, 
     get_config_value, 
+    get_chat_model,
+    get_structured_chat_model,
+    LLM_PRIORITY_CRITICAL,
+    LLM_PRIORITY_HIGH,
+    LLM_PRIORITY_LOW,
     get_search_params, 
+    get_search_coordinator,
+    release_llm_governors,
+    release_search_coordinator,
     select_and_execute_search
 )
 
+# With speculative_search, follow-up queries are generated once this much of the section draft is written
+SPECULATIVE_SEARCH_MIN_DRAFT_CHARS = 1500
+
 ## Nodes -- 
 
+@timed_node
 async def generate_report_plan(state: ReportState, config: RunnableConfig):
     """Generate the initial report plan with sections.
     
@@ -81,8 +102,8 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
     writer_model_kwargs = get_config_value(configurable.writer_model_kwargs or {})
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs) 
-    structured_llm = writer_model.with_structured_output(Queries)
+    structured_llm = get_structured_chat_model(writer_model_name, Queries, model_provider=writer_provider, model_kwargs=writer_model_kwargs,
+                                               priority=LLM_PRIORITY_CRITICAL)
 
     # Format system instructions
     system_instructions_query = report_planner_query_writer_instructions.format(topic=topic, report_organization=report_structure, number_of_queries=number_of_queries)
@@ -94,8 +115,9 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     # Web search
     query_list = [query.search_query for query in results.queries]
 
-    # Search the web with parameters
-    source_str = await select_and_execute_search(search_api, query_list, params_to_pass)
+    # Search the web with parameters, sharing in-flight and completed queries with the rest of the run
+    source_str = await select_and_execute_search(search_api, query_list, params_to_pass,
+                                                 coordinator=get_search_coordinator(config))
 
     # Format system instructions
     system_instructions_sections = report_planner_instructions.format(topic=topic, report_organization=report_structure, context=source_str, feedback=feedback)
@@ -112,19 +134,18 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     # Run the planner
     if planner_model == "claude-3-7-sonnet-latest":
         # Allocate a thinking budget for claude-3-7-sonnet-latest as the planner model
-        planner_llm = init_chat_model(model=planner_model, 
-                                      model_provider=planner_provider, 
-                                      max_tokens=20_000, 
-                                      thinking={"type": "enabled", "budget_tokens": 16_000})
+        structured_llm = get_structured_chat_model(planner_model, Sections, priority=LLM_PRIORITY_CRITICAL,
+                                                   model_provider=planner_provider, 
+                                                   max_tokens=20_000, 
+                                                   thinking={"type": "enabled", "budget_tokens": 16_000})
 
     else:
         # With other models, thinking tokens are not specifically allocated
-        planner_llm = init_chat_model(model=planner_model, 
-                                      model_provider=planner_provider,
-                                      model_kwargs=planner_model_kwargs)
+        structured_llm = get_structured_chat_model(planner_model, Sections, priority=LLM_PRIORITY_CRITICAL,
+                                                   model_provider=planner_provider,
+                                                   model_kwargs=planner_model_kwargs)
     
     # Generate the report sections
-    structured_llm = planner_llm.with_structured_output(Sections)
     report_sections = await structured_llm.ainvoke([SystemMessage(content=system_instructions_sections),
                                              HumanMessage(content=planner_message)])
 
@@ -133,6 +154,7 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
 
     return {"sections": sections}
 
+@timed_node
 def human_feedback(state: ReportState, config: RunnableConfig) -> Command[Literal["generate_report_plan","build_section_with_web_research"]]:
     """Get human feedback on the report plan and route to next steps.
     
@@ -170,7 +192,8 @@ def human_feedback(state: ReportState, config: RunnableConfig) -> Command[Litera
 
     # If the user approves the report plan, kick off section writing
     if isinstance(feedback, bool) and feedback is True:
-        # Treat this as approve and kick off section writing
+        # Treat this as approve, open the report stream and kick off section writing
+        start_report_stream(config, sections)
         return Command(goto=[
             Send("build_section_with_web_research", {"topic": topic, "section": s, "search_iterations": 0}) 
             for s in sections 
@@ -185,6 +208,8 @@ def human_feedback(state: ReportState, config: RunnableConfig) -> Command[Litera
     else:
         raise TypeError(f"Interrupt value of type {type(feedback)} is not supported.")
     
+@timed_node
+@memoized_node
 async def generate_queries(state: SectionState, config: RunnableConfig):
     """Generate search queries for researching a specific section.
     
@@ -211,8 +236,7 @@ async def generate_queries(state: SectionState, config: RunnableConfig):
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
     writer_model_kwargs = get_config_value(configurable.writer_model_kwargs or {})
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs) 
-    structured_llm = writer_model.with_structured_output(Queries)
+    structured_llm = get_structured_chat_model(writer_model_name, Queries, model_provider=writer_provider, model_kwargs=writer_model_kwargs)
 
     # Format system instructions
     system_instructions = query_writer_instructions.format(topic=topic, 
@@ -225,6 +249,8 @@ async def generate_queries(state: SectionState, config: RunnableConfig):
 
     return {"search_queries": queries.queries}
 
+@timed_node
+@memoized_node
 async def search_web(state: SectionState, config: RunnableConfig):
     """Execute web searches for the section queries.
     
@@ -253,12 +279,74 @@ async def search_web(state: SectionState, config: RunnableConfig):
     # Web search
     query_list = [query.search_query for query in search_queries]
 
-    # Search the web with parameters
-    source_str = await select_and_execute_search(search_api, query_list, params_to_pass)
+    # Search the web with parameters, sharing in-flight and completed queries with the rest of the run
+    source_str = await select_and_execute_search(search_api, query_list, params_to_pass,
+                                                 coordinator=get_search_coordinator(config))
 
     return {"source_str": source_str, "search_iterations": state["search_iterations"] + 1}
 
-async def write_section(state: SectionState, config: RunnableConfig) -> Command[Literal[END, "search_web"]]:
+def _content_text(content) -> str:
+    """Text of a message's content, whether it is a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block if isinstance(block, str) else block.get("text", "") for block in content)
+
+async def speculative_follow_up_search(topic: str, section: Section, draft: str, config: RunnableConfig):
+    """Generate follow-up queries from a (possibly partial) section draft and search them.
+
+    Runs while the section is being graded, so a failing grade can go straight back to writing
+    instead of waiting for query generation and search.
+
+    Args:
+        topic: The report topic
+        section: The section being written
+        draft: The section draft written so far
+        config: Configuration for the writer model and search API
+
+    Returns:
+        Tuple of the search queries and the formatted search results
+    """
+
+    configurable = Configuration.from_runnable_config(config)
+    writer_provider = get_config_value(configurable.writer_provider)
+    writer_model_name = get_config_value(configurable.writer_model)
+    writer_model_kwargs = get_config_value(configurable.writer_model_kwargs or {})
+    structured_llm = get_structured_chat_model(writer_model_name, Queries, model_provider=writer_provider, model_kwargs=writer_model_kwargs,
+                                               priority=LLM_PRIORITY_LOW)
+
+    # Generate queries for what the draft is missing
+    system_instructions = query_writer_instructions.format(topic=topic, 
+                                                           section_topic=section.description, 
+                                                           number_of_queries=configurable.number_of_queries)
+    queries = await structured_llm.ainvoke([SystemMessage(content=system_instructions),
+                                     HumanMessage(content=f"Generate search queries for information missing from this draft of the section:\n\n{draft}")])
+
+    # Search the web with parameters
+    search_api = get_config_value(configurable.search_api)
+    params_to_pass = get_search_params(search_api, configurable.search_api_config or {})
+    source_str = await select_and_execute_search(search_api, [query.search_query for query in queries.queries], params_to_pass,
+                                                 coordinator=get_search_coordinator(config))
+    return queries.queries, source_str
+
+async def _stream_section(writer_model, writer_messages, section: Section, report_stream) -> str:
+    """Write a section with the writer model, passing its tokens to the run's report stream."""
+    content = ""
+    async for chunk in writer_model.astream(writer_messages):
+        text = _content_text(chunk.content)
+        content += text
+        report_stream.token(section.name, text)
+    return content
+
+def _start_speculative_search(topic: str, section: Section, draft: str, config: RunnableConfig) -> asyncio.Task:
+    task = asyncio.create_task(speculative_follow_up_search(topic, section, draft, config))
+    # The result may be discarded, so retrieve any exception to keep it from being reported as unhandled
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+@timed_node
+@reports_completed_sections
+@memoized_node
+async def write_section(state: SectionState, config: RunnableConfig) -> Command[Literal[END, "search_web", "write_section"]]:
     """Write a section of the report and evaluate if more research is needed.
     
     This node:
@@ -272,6 +360,11 @@ async def write_section(state: SectionState, config: RunnableConfig) -> Command[
         state: Current state with search results and section info
         config: Configuration for writing and evaluation
         
+    With speculative_search enabled, the draft is streamed and follow-up queries are generated and
+    searched while the rest of the draft is written and graded. A failing section then goes straight
+    back to writing with the new sources; a passing section discards them and sends its draft to the
+    report stream. Grading itself still waits for the full draft.
+
     Returns:
         Command to either complete section or do more research
     """
@@ -295,13 +388,35 @@ async def write_section(state: SectionState, config: RunnableConfig) -> Command[
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
     writer_model_kwargs = get_config_value(configurable.writer_model_kwargs or {})
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs) 
-
-    section_content = await writer_model.ainvoke([SystemMessage(content=section_writer_instructions),
-                                           HumanMessage(content=section_writer_inputs_formatted)])
-    
-    # Write content to the section object  
-    section.content = section_content.content
+    writer_model = get_chat_model(writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs,
+                                  priority=LLM_PRIORITY_HIGH)
+
+    writer_messages = [SystemMessage(content=section_writer_instructions),
+                       HumanMessage(content=section_writer_inputs_formatted)]
+    report_stream = get_report_stream(config)
+    streamed = False
+
+    # Speculate only if another search iteration is allowed
+    speculative_search: Optional[asyncio.Task] = None
+    if configurable.speculative_search and state["search_iterations"] < configurable.max_search_depth:
+        # Stream the draft, starting the follow-up search as soon as enough of it is written
+        draft = ""
+        async for chunk in writer_model.astream(writer_messages):
+            draft += _content_text(chunk.content)
+            if speculative_search is None and len(draft) >= SPECULATIVE_SEARCH_MIN_DRAFT_CHARS:
+                speculative_search = _start_speculative_search(topic, section, draft, config)
+        section.content = draft
+        if speculative_search is None:
+            speculative_search = _start_speculative_search(topic, section, draft, config)
+    elif report_stream is not None and state["search_iterations"] >= configurable.max_search_depth:
+        # Last allowed write, so the section will complete as written: stream it into the report
+        section.content = await _stream_section(writer_model, writer_messages, section, report_stream)
+        streamed = True
+    else:
+        section_content = await writer_model.ainvoke(writer_messages)
+        
+        # Write content to the section object  
+        section.content = section_content.content
 
     # Grade prompt 
     section_grader_message = ("Grade the report and consider follow-up questions for missing information. "
@@ -320,32 +435,55 @@ async def write_section(state: SectionState, config: RunnableConfig) -> Command[
 
     if planner_model == "claude-3-7-sonnet-latest":
         # Allocate a thinking budget for claude-3-7-sonnet-latest as the planner model
-        reflection_model = init_chat_model(model=planner_model, 
-                                           model_provider=planner_provider, 
-                                           max_tokens=20_000, 
-                                           thinking={"type": "enabled", "budget_tokens": 16_000}).with_structured_output(Feedback)
+        reflection_model = get_structured_chat_model(planner_model, Feedback, priority=LLM_PRIORITY_HIGH,
+                                                     model_provider=planner_provider, 
+                                                     max_tokens=20_000, 
+                                                     thinking={"type": "enabled", "budget_tokens": 16_000})
     else:
-        reflection_model = init_chat_model(model=planner_model, 
-                                           model_provider=planner_provider, model_kwargs=planner_model_kwargs).with_structured_output(Feedback)
+        reflection_model = get_structured_chat_model(planner_model, Feedback, priority=LLM_PRIORITY_HIGH,
+                                                     model_provider=planner_provider, model_kwargs=planner_model_kwargs)
     # Generate feedback
     feedback = await reflection_model.ainvoke([SystemMessage(content=section_grader_instructions_formatted),
                                         HumanMessage(content=section_grader_message)])
 
     # If the section is passing or the max search depth is reached, publish the section to completed sections 
     if feedback.grade == "pass" or state["search_iterations"] >= configurable.max_search_depth:
+        # The speculative follow-up search is not needed
+        if speculative_search is not None:
+            speculative_search.cancel()
+
+        # A draft that could still have been rewritten was not streamed, so send the accepted one now
+        if report_stream is not None and not streamed:
+            report_stream.token(section.name, section.content)
+
         # Publish the section to completed sections 
         return  Command(
         update={"completed_sections": [section]},
         goto=END
     )
 
+    # Use the speculative follow-up search and rewrite the section right away
+    if speculative_search is not None:
+        try:
+            search_queries, source_str = await speculative_search
+        except Exception as e:
+            print(f"Warning: Speculative follow-up search failed, searching the grader's follow-up queries instead: {str(e)}")
+        else:
+            return  Command(
+            update={"search_queries": search_queries, "source_str": source_str,
+                    "search_iterations": state["search_iterations"] + 1, "section": section},
+            goto="write_section"
+            )
+
     # Update the existing section with new content and update search queries
-    else:
-        return  Command(
-        update={"search_queries": feedback.follow_up_queries, "section": section},
-        goto="search_web"
-        )
+    return  Command(
+    update={"search_queries": feedback.follow_up_queries, "section": section},
+    goto="search_web"
+    )
     
+@timed_node
+@reports_completed_sections
+@memoized_node
 async def write_final_sections(state: SectionState, config: RunnableConfig):
     """Write sections that don't require research using completed sections as context.
     
@@ -353,7 +491,7 @@ async def write_final_sections(state: SectionState, config: RunnableConfig):
     the researched sections rather than requiring direct research.
     
     Args:
-        state: Current state with completed sections as context
+        state: Current state with the completed sections the section depends on as context
         config: Configuration for the writing model
         
     Returns:
@@ -375,17 +513,39 @@ async def write_final_sections(state: SectionState, config: RunnableConfig):
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
     writer_model_kwargs = get_config_value(configurable.writer_model_kwargs or {})
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs) 
+    writer_model = get_chat_model(writer_model_name, model_provider=writer_provider, model_kwargs=writer_model_kwargs,
+                                  priority=LLM_PRIORITY_CRITICAL)
     
-    section_content = await writer_model.ainvoke([SystemMessage(content=system_instructions),
-                                           HumanMessage(content="Generate a report section based on the provided sources.")])
-    
-    # Write content to section 
-    section.content = section_content.content
+    writer_messages = [SystemMessage(content=system_instructions),
+                       HumanMessage(content="Generate a report section based on the provided sources.")]
+
+    # Stream the section into the report if a stream is open
+    report_stream = get_report_stream(config)
+    if report_stream is not None:
+        section.content = await _stream_section(writer_model, writer_messages, section, report_stream)
+    else:
+        section_content = await writer_model.ainvoke(writer_messages)
+        section.content = section_content.content
 
     # Write the updated section to completed sections
     return {"completed_sections": [section]}
 
+def section_dependencies(section: Section, sections: list[Section]) -> list[str]:
+    """Names of the research sections a section without research draws on, in plan order.
+    
+    Args:
+        section: A section that does not require research
+        sections: Every section of the report plan
+        
+    Returns:
+        The research sections named in section.depends_on, or all research sections if it names none
+    """
+
+    research_names = [s.name for s in sections if s.research]
+    depends_on = set(section.depends_on)
+    return [name for name in research_names if name in depends_on] or research_names
+
+@timed_node
 def gather_completed_sections(state: ReportState):
     """Format completed sections as context for writing final sections.
     
@@ -407,7 +567,8 @@ def gather_completed_sections(state: ReportState):
 
     return {"report_sections_from_research": completed_report_sections}
 
-def compile_final_report(state: ReportState):
+@timed_node
+async def compile_final_report(state: ReportState, config: RunnableConfig):
     """Compile all sections into the final report.
     
     This node:
@@ -417,6 +578,7 @@ def compile_final_report(state: ReportState):
     
     Args:
         state: Current state with all completed sections
+        config: Configuration identifying the run
         
     Returns:
         Dict containing the complete report
@@ -433,27 +595,43 @@ def compile_final_report(state: ReportState):
     # Compile final report
     all_sections = "\n\n".join([s.content for s in sections])
 
+    # The run's searches are done, so its search coordinator, LLM governors and report stream can go
+    release_search_coordinator(config)
+    release_llm_governors(config)
+    release_report_stream(config)
+
+    # Save the run's metrics summary to $METRICS_DIR, if set
+    write_run_summary(current_run_id())
+
     return {"final_report": all_sections}
 
 def initiate_final_section_writing(state: ReportState):
     """Create parallel tasks for writing non-research sections.
     
     This edge function identifies sections that don't need research and
-    creates parallel writing tasks for each one.
+    creates parallel writing tasks for each one. Each task gets only the
+    completed research sections the section depends on as context.
     
     Args:
-        state: Current state with all sections and research context
+        state: Current state with all sections and completed research sections
         
     Returns:
-        List of Send commands for parallel section writing
+        List of Send commands for parallel section writing, or the final report node if there are none
     """
 
+    # Completed research sections by name
+    completed_sections = {s.name: s for s in state["completed_sections"]}
+
     # Kick off section writing in parallel via Send() API for any sections that do not require research
-    return [
-        Send("write_final_sections", {"topic": state["topic"], "section": s, "report_sections_from_research": state["report_sections_from_research"]}) 
+    sends = [
+        Send("write_final_sections", {"topic": state["topic"], "section": s,
+                                      "report_sections_from_research": format_sections(
+                                          [completed_sections[name] for name in section_dependencies(s, state["sections"])
+                                           if name in completed_sections])})
         for s in state["sections"] 
         if not s.research
     ]
+    return sends or "compile_final_report"
 
 # Report section sub-graph -- 
 
@@ -475,15 +653,15 @@ builder = StateGraph(ReportState, input=ReportStateInput, output=ReportStateOutp
 builder.add_node("generate_report_plan", generate_report_plan)
 builder.add_node("human_feedback", human_feedback)
 builder.add_node("build_section_with_web_research", section_builder.compile())
-builder.add_node("gather_completed_sections", gather_completed_sections)
 builder.add_node("write_final_sections", write_final_sections)
+builder.add_node("gather_completed_sections", gather_completed_sections)
 builder.add_node("compile_final_report", compile_final_report)
 
 # Add edges
 builder.add_edge(START, "generate_report_plan")
 builder.add_edge("generate_report_plan", "human_feedback")
 builder.add_edge("build_section_with_web_research", "gather_completed_sections")
-builder.add_conditional_edges("gather_completed_sections", initiate_final_section_writing, ["write_final_sections"])
+builder.add_conditional_edges("gather_completed_sections", initiate_final_section_writing, ["write_final_sections", "compile_final_report"])
 builder.add_edge("write_final_sections", "compile_final_report")
 builder.add_edge("compile_final_report", END)
 
@@ -0,0 +1,125 @@
+"""HTML-to-text extraction for scraped pages.
+
+These functions are CPU-bound and run in a process pool (see utils.get_html_executor). They live in
+their own module so worker processes only import lxml, markdownify and BeautifulSoup, not the whole
+search and LLM stack in utils.
+"""
+
+import re
+from typing import Literal
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+from markdownify import markdownify
+
+# Pages are cut to this many characters before parsing
+HTML_EXTRACT_MAX_CHARS = 1_000_000
+
+# Main content shorter than this is treated as a failed extraction and the whole page is converted
+MIN_MAIN_CONTENT_CHARS = 200
+
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+                    "iframe", "svg", "button", "template", "select", "object", "embed"]
+BOILERPLATE_PATTERN = re.compile(
+    r"nav|menu|footer|sidebar|comment|cookie|consent|banner|advert|promo|share|social|related|"
+    r"breadcrumb|popup|modal|newsletter|subscribe|masthead|skip-link", re.I)
+CONTENT_PATTERN = re.compile(r"article|content|main|post|entry|story|body|text", re.I)
+PARAGRAPH_TAGS = ("p", "pre", "td", "blockquote", "li")
+BLOCK_TAGS = PARAGRAPH_TAGS + ("div", "section", "article", "main", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "br", "ul", "ol", "table")
+
+def _link_density(element) -> float:
+    """Fraction of an element's text that sits inside links."""
+    text_length = len(element.text_content())
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.text_content()) for link in element.iter("a"))
+    return link_length / text_length
+
+def _strip_boilerplate(doc):
+    """Remove scripts, navigation and other page chrome in place."""
+    etree.strip_elements(doc, *BOILERPLATE_TAGS, with_tail=False)
+    etree.strip_elements(doc, etree.Comment, with_tail=False)
+    for element in list(doc.iter()):
+        if not isinstance(element.tag, str) or element.tag in ("html", "body") or element.getparent() is None:
+            continue
+        attrs = f"{element.get('class', '')} {element.get('id', '')} {element.get('role', '')}"
+        if attrs.strip() and BOILERPLATE_PATTERN.search(attrs) and not CONTENT_PATTERN.search(attrs):
+            element.drop_tree()
+
+def _find_main_element(doc):
+    """Pick the element holding the page's main content, readability style.
+
+    Every paragraph adds to its parent's score (and half as much to its grandparent) according to its
+    length and comma count. The best-scoring container, discounted by its link density, wins.
+    An explicit <article> or <main> with enough text is preferred.
+    """
+    for tag in ("article", "main"):
+        candidates = [el for el in doc.iter(tag) if len(el.text_content().strip()) >= MIN_MAIN_CONTENT_CHARS]
+        if candidates:
+            return max(candidates, key=lambda el: len(el.text_content()))
+
+    scores = {}
+    for paragraph in doc.iter(*PARAGRAPH_TAGS):
+        text = paragraph.text_content().strip()
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+
+    if not scores:
+        return None
+    return max(scores, key=lambda el: scores[el] * (1 - _link_density(el)))
+
+def _block_text(element) -> str:
+    """text_content() with a line break after every block element, so paragraphs don't run together."""
+    for block in element.iter(*BLOCK_TAGS):
+        block.tail = "\n" + (block.tail or "")
+    return element.text_content()
+
+def _collapse_whitespace(text: str) -> str:
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+def extract_main_content(html: str, output: Literal["markdown", "text"] = "markdown",
+                         max_chars: int | None = HTML_EXTRACT_MAX_CHARS) -> str:
+    """Extract the main content of an HTML page as markdown or plain text.
+
+    Navigation, scripts, styles and other boilerplate are dropped before the main content element is
+    chosen. If no main content can be found, the whole page is converted as before (markdownify for
+    markdown, BeautifulSoup's get_text for text).
+
+    Args:
+        html (str): The page's HTML
+        output (Literal["markdown", "text"]): Whether to return markdown or plain text
+        max_chars (int, optional): Characters of HTML kept before parsing. None disables the cap.
+
+    Returns:
+        str: The extracted content
+    """
+    if max_chars is not None and len(html) > max_chars:
+        html = html[:max_chars]
+    if not html.strip():
+        return ""
+
+    try:
+        doc = lxml.html.document_fromstring(html)
+        _strip_boilerplate(doc)
+        main = _find_main_element(doc)
+        if main is not None and len(main.text_content().strip()) >= MIN_MAIN_CONTENT_CHARS:
+            if output == "markdown":
+                return _collapse_whitespace(markdownify(lxml.html.tostring(main, encoding="unicode")))
+            return _collapse_whitespace(_block_text(main))
+    except (etree.ParserError, ValueError):
+        pass
+
+    # Fall back to converting the whole page
+    if output == "markdown":
+        return markdownify(html)
+    return BeautifulSoup(html, "html.parser").get_text()
@@ -0,0 +1,382 @@
+"""Local instrumentation for the deep research graphs.
+
+Node wall time, LLM calls and token usage, search latency and queueing delay, and cache events are
+recorded into an in-process registry. The registry can be exported as Prometheus text
+(prometheus_text, or start_metrics_server for a scrape endpoint). Every run also gets a JSON summary
+keyed by its thread_id (get_run_summary, or write_run_summary to save it to $METRICS_DIR).
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import ensure_config
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+METRIC_HELP = {
+    "odr_node_duration_seconds": "Wall time of graph node invocations",
+    "odr_llm_requests_total": "LLM calls",
+    "odr_llm_errors_total": "LLM calls that raised an error",
+    "odr_llm_tokens_total": "LLM tokens by direction (input or output)",
+    "odr_llm_duration_seconds": "Latency of LLM calls",
+    "odr_llm_queue_seconds": "Time LLM calls waited for their provider's LLMGovernor",
+    "odr_search_queries_total": "Queries sent to search backends (cache misses only)",
+    "odr_search_duration_seconds": "Latency of search backend calls",
+    "odr_search_queue_seconds": "Time search calls waited for their backend's rate and concurrency limits",
+    "odr_cache_events_total": "Search and page cache events (hits, misses, revalidations, evictions)",
+}
+
+# USD per million input and output tokens, for the cost estimate in run summaries. Matched by model name prefix.
+LLM_PRICES_PER_MILLION = {
+    "claude-3-7-sonnet": (3.0, 15.0),
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-4.1-nano": (0.1, 0.4),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+# Run summaries kept in memory (oldest dropped first)
+MAX_RUN_SUMMARIES = 64
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms, labelled like Prometheus metrics."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Create an empty registry whose histograms use the given bucket upper bounds, in seconds."""
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, list]] = {}  # labels -> bucket counts, then count and sum
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Add value to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record an observation in a histogram."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every counter value, and the count and sum of every histogram."""
+        with self._lock:
+            return {
+                "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                             for name, series in self._counters.items()},
+                "histograms": {name: [{"labels": dict(key), "count": counts[-2], "sum": counts[-1]} for key, counts in series.items()]
+                               for name, series in self._histograms.items()},
+            }
+
+    def prometheus_text(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, counts in series.items():
+                    for bound, count in zip(self.buckets, counts):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {counts[-2]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {counts[-2]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {counts[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Drop every recorded counter and histogram."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+_registry = MetricsRegistry()
+_run_summaries: OrderedDict = OrderedDict()
+_run_summaries_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _registry
+
+def prometheus_text() -> str:
+    """Render the process-wide metrics registry in the Prometheus text exposition format."""
+    return _registry.prometheus_text()
+
+def current_run_id() -> str | None:
+    """thread_id of the graph run being executed, if any."""
+    thread_id = (ensure_config().get("configurable") or {}).get("thread_id")
+    return None if thread_id is None else str(thread_id)
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float | None:
+    """Estimated USD cost of a call, or None if the model has no entry in LLM_PRICES_PER_MILLION."""
+    name = model.split(":", 1)[-1]
+    matches = [prefix for prefix in LLM_PRICES_PER_MILLION if name.startswith(prefix)]
+    if not matches:
+        return None
+    input_price, output_price = LLM_PRICES_PER_MILLION[max(matches, key=len)]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+def _update_run(run_id: str | None, section: str, name: str, seconds_ago: float = 0.0, **values):
+    """Add values to one entry of a run's summary, for an event that started seconds_ago."""
+    if run_id is None:
+        return
+    now = time.time()
+    with _run_summaries_lock:
+        summary = _run_summaries.get(run_id)
+        if summary is None:
+            summary = _run_summaries[run_id] = {"run_id": run_id, "started_at": now, "nodes": {}, "llm": {},
+                                                "llm_queue": {}, "search": {}, "cache": {}}
+            while len(_run_summaries) > MAX_RUN_SUMMARIES:
+                _run_summaries.popitem(last=False)
+        summary["started_at"] = min(summary["started_at"], now - seconds_ago)
+        summary["updated_at"] = now
+        entry = summary[section].setdefault(name, {})
+        for key, value in values.items():
+            if key.startswith("max_"):
+                entry[key] = max(entry.get(key, 0.0), value)
+            elif value is None:
+                entry.setdefault(key, None)
+            else:
+                entry[key] = (entry.get(key) or 0) + value
+
+def record_node(node: str, seconds: float, run_id: str | None = None):
+    """Record one invocation of a graph node."""
+    _registry.observe("odr_node_duration_seconds", seconds, node=node)
+    _update_run(run_id or current_run_id(), "nodes", node, seconds_ago=seconds, calls=1, seconds=seconds, max_seconds=seconds)
+
+def record_llm_call(model: str, seconds: float, input_tokens: int = 0, output_tokens: int = 0,
+                    run_id: str | None = None, error: bool = False):
+    """Record one LLM call with its token usage."""
+    _registry.inc("odr_llm_requests_total", model=model)
+    _registry.observe("odr_llm_duration_seconds", seconds, model=model)
+    if error:
+        _registry.inc("odr_llm_errors_total", model=model)
+    _registry.inc("odr_llm_tokens_total", input_tokens, model=model, direction="input")
+    _registry.inc("odr_llm_tokens_total", output_tokens, model=model, direction="output")
+    _update_run(run_id or current_run_id(), "llm", model, calls=1, errors=int(error), seconds=seconds,
+                input_tokens=input_tokens, output_tokens=output_tokens,
+                cost_usd=estimate_cost(model, input_tokens, output_tokens))
+
+def record_llm_queue(provider: str, priority: int, seconds: float, run_id: str | None = None):
+    """Record how long an LLM call waited for its provider's request, token and concurrency budgets."""
+    _registry.observe("odr_llm_queue_seconds", seconds, provider=provider, priority=priority)
+    _update_run(run_id or current_run_id(), "llm_queue", provider, calls=1, queue_seconds=seconds)
+
+def record_search(backend: str, queries: int, seconds: float, queue_seconds: float = 0.0, run_id: str | None = None):
+    """Record one call to a search backend, and how long it waited for the backend's limits."""
+    _registry.inc("odr_search_queries_total", queries, backend=backend)
+    _registry.observe("odr_search_duration_seconds", seconds, backend=backend)
+    _registry.observe("odr_search_queue_seconds", queue_seconds, backend=backend)
+    _update_run(run_id or current_run_id(), "search", backend, calls=1, queries=queries, seconds=seconds,
+                queue_seconds=queue_seconds)
+
+def record_cache_event(cache: str, event: str, api: str = "", run_id: str | None = None):
+    """Record a cache event ("hits", "misses", "revalidated" or "evictions") of the search or page cache."""
+    _registry.inc("odr_cache_events_total", cache=cache, api=api, event=event)
+    _update_run(run_id or current_run_id(), "cache", f"{cache}:{api}" if api else cache, **{event: 1})
+
+def get_run_summary(run_id: str | None) -> Dict[str, Any] | None:
+    """Return the summary of a run.
+
+    The summary has the run's wall time, per-node time, LLM calls, tokens and estimated cost per model,
+    search calls, latency and queueing delay per backend, and cache events.
+
+    Args:
+        run_id: The run's thread_id
+
+    Returns:
+        dict: The summary, or None if nothing was recorded for the run
+    """
+    with _run_summaries_lock:
+        summary = _run_summaries.get(None if run_id is None else str(run_id))
+        if summary is None:
+            return None
+        summary = json.loads(json.dumps(summary))
+
+    costs = [entry.get("cost_usd") for entry in summary["llm"].values()]
+    summary["wall_seconds"] = summary["updated_at"] - summary["started_at"]
+    summary["totals"] = {
+        "llm_calls": sum(entry.get("calls", 0) for entry in summary["llm"].values()),
+        "input_tokens": sum(entry.get("input_tokens", 0) for entry in summary["llm"].values()),
+        "output_tokens": sum(entry.get("output_tokens", 0) for entry in summary["llm"].values()),
+        # None when any model's price is unknown
+        "cost_usd": None if None in costs else sum(costs),
+        "llm_queue_seconds": sum(entry.get("queue_seconds", 0.0) for entry in summary["llm_queue"].values()),
+        "search_calls": sum(entry.get("calls", 0) for entry in summary["search"].values()),
+        "search_queue_seconds": sum(entry.get("queue_seconds", 0.0) for entry in summary["search"].values()),
+    }
+    return summary
+
+def write_run_summary(run_id: str | None, path: str | None = None) -> Dict[str, Any] | None:
+    """Write a run's summary as JSON.
+
+    Args:
+        run_id: The run's thread_id
+        path: Output file; defaults to $METRICS_DIR/run_<thread_id>.json, and nothing is written if
+            METRICS_DIR is not set either
+
+    Returns:
+        dict: The summary, or None if nothing was recorded for the run
+    """
+    summary = get_run_summary(run_id)
+    if summary is None:
+        return None
+    if path is None and os.environ.get("METRICS_DIR"):
+        path = os.path.join(os.environ["METRICS_DIR"], f"run_{run_id}.json")
+    if path is not None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            logger.warning("Failed to write run summary to %s: %s", path, e)
+    return summary
+
+def timed_node(fn: Callable) -> Callable:
+    """Record the wall time of a graph node (sync or async) under its function name."""
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                record_node(name, time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record_node(name, time.perf_counter() - start)
+    return wrapper
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Input and output tokens of an LLM response, from usage_metadata or the provider's llm_output."""
+    input_tokens = output_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                found = True
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage") or {}
+        input_tokens = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+        output_tokens = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    return input_tokens, output_tokens
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """Callback handler recording latency and token usage of every call made by a chat model."""
+
+    run_inline = True
+
+    def __init__(self):
+        """Create a handler with no calls in progress."""
+        self._calls: Dict[UUID, tuple] = {}  # LLM run id -> (model, start time, graph run id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[list], *, run_id: UUID,
+                            metadata: Dict[str, Any] | None = None, **kwargs):
+        """Start timing a chat model call."""
+        model = (metadata or {}).get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model") or "unknown"
+        self._calls[run_id] = (model, time.perf_counter(), current_run_id())
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID,
+                     metadata: Dict[str, Any] | None = None, **kwargs):
+        """Start timing a completion model call."""
+        self.on_chat_model_start(serialized, [], run_id=run_id, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        """Record a finished call with its token usage."""
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        model, start, graph_run_id = call
+        input_tokens, output_tokens = _token_usage(response)
+        record_llm_call(model, time.perf_counter() - start, input_tokens, output_tokens, run_id=graph_run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        """Record a failed call."""
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        model, start, graph_run_id = call
+        record_llm_call(model, time.perf_counter() - start, run_id=graph_run_id, error=True)
+
+llm_metrics_handler = LLMMetricsCallbackHandler()
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve prometheus_text() at /metrics from a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        host: Interface to bind to
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            payload = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
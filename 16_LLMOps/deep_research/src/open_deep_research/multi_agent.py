@@ -1,7 +1,8 @@
-from typing import List, Annotated, TypedDict, operator, Literal
+import asyncio
+from typing import List, Annotated, Optional, Tuple, TypedDict, operator, Literal
 from pydantic import BaseModel, Field
 
-from langchain.chat_models import init_chat_model
+from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import MessagesState
@@ -10,28 +11,46 @@ from langgraph.types import Command, Send
 from langgraph.graph import START, END, StateGraph
 
 from open_deep_research.configuration import Configuration
-from open_deep_research.utils import get_config_value, tavily_search, duckduckgo_search
+from open_deep_research.checkpoint import memoized_node
+from open_deep_research.metrics import current_run_id, timed_node, write_run_summary
+from open_deep_research.utils import (
+    get_config_value,
+    get_tool_calling_model,
+    LLM_PRIORITY_CRITICAL,
+    LLM_PRIORITY_HIGH,
+    get_search_params,
+    make_search_tool,
+    release_llm_governors,
+    SEARCH_BACKENDS,
+)
 from open_deep_research.prompts import SUPERVISOR_INSTRUCTIONS, RESEARCH_INSTRUCTIONS
 
+# Supervisor tool outputs are stored in the message history cut to a preview; the full outputs of the latest
+# tool turn are only shown on the supervisor's next turn
+SUPERVISOR_TOOL_PREVIEW_CHARS = 500
+# The supervisor's status ledger summarizes each completed section in this many characters; full bodies
+# are only sent on the turns that write the introduction and conclusion
+SUPERVISOR_SECTION_SUMMARY_CHARS = 300
+
+# Researchers see a snippet of each search result; the full content is kept in state and read with RecallSource
+SOURCE_SNIPPET_CHARS = 500
+RECALL_SOURCE_MAX_CHARS = 30000
+# Recalled content is stored cut to a snippet-sized preview and shown whole on the researcher's next turn only
+
 ## Tools factory - will be initialized based on configuration
 def get_search_tool(config: RunnableConfig):
     """Get the appropriate search tool based on configuration"""
     configurable = Configuration.from_runnable_config(config)
     search_api = get_config_value(configurable.search_api)
 
-    # TODO: Configure other search functions as tools
-    if search_api.lower() == "tavily":
-        # Use Tavily search tool
-        return tavily_search
-    elif search_api.lower() == "duckduckgo":
-        # Use the DuckDuckGo search tool
-        return duckduckgo_search
+    if search_api.lower() in SEARCH_BACKENDS:
+        # Tavily and DuckDuckGo have their own tools; other registered search backends are wrapped as one
+        params_to_pass = get_search_params(search_api.lower(), configurable.search_api_config or {})
+        return make_search_tool(search_api.lower(), params_to_pass)
     else:
-        # Raise NotImplementedError for search APIs other than Tavily
         raise NotImplementedError(
-            f"The search API '{search_api}' is not yet supported in the multi-agent implementation. "
-            f"Currently, only Tavily is supported. Please use the graph-based implementation in "
-            f"src/open_deep_research/graph.py for other search APIs, or set search_api to 'tavily'."
+            f"The search API '{search_api}' is not supported in the multi-agent implementation. "
+            f"Supported search APIs: {', '.join(SEARCH_BACKENDS)}."
         )
 
 @tool
@@ -46,6 +65,12 @@ class Section(BaseModel):
         description="The content of the section."
     )
 
+@tool
+class RecallSource(BaseModel):
+    url: str = Field(
+        description="URL of a source from an earlier search whose full content you need.",
+    )
+
 @tool
 class Sections(BaseModel):
     sections: List[str] = Field(
@@ -77,15 +102,168 @@ class ReportStateOutput(TypedDict):
 class ReportState(MessagesState):
     sections: list[str] # List of report sections 
     completed_sections: Annotated[list, operator.add] # Send() API key
+    introduction: str # Introduction, once written
+    conclusion: str # Conclusion, once written
+    tool_outputs: dict # Full outputs of the latest tool turn that were cut to a preview in messages, by tool_call_id
     final_report: str # Final report
 
 class SectionState(MessagesState):
     section: str # Report section  
+    sources: Annotated[dict, operator.or_] # Full search results by URL, recalled with RecallSource
+    tool_outputs: dict # Full outputs of the latest tool turn that were cut to a preview in messages, by tool_call_id
     completed_sections: list[Section] # Final key we duplicate in outer state for Send() API
 
 class SectionOutputState(TypedDict):
     completed_sections: list[Section] # Final key we duplicate in outer state for Send() API
 
+def compact_tool_outputs(tool_messages: list, preview_chars: int = SUPERVISOR_TOOL_PREVIEW_CHARS,
+                         tool_names: Optional[set] = None) -> dict:
+    """
+    Cut the outputs of a tool turn down to a short preview before they are stored in the message history.
+
+    Messages already in the history are never rewritten, so the prompt prefix they form stays the same
+    from turn to turn.
+
+    Args:
+        tool_messages: The turn's tool messages, modified in place
+        preview_chars: Characters kept of each output
+        tool_names: Only compact the outputs of these tools; None compacts every tool
+
+    Returns:
+        dict: The full outputs that were cut, by tool_call_id, for latest_tool_outputs to show on the next turn
+    """
+    full_outputs = {}
+    for tool_message in tool_messages:
+        content = tool_message["content"]
+        if ((tool_names is None or tool_message["name"] in tool_names)
+                and isinstance(content, str) and len(content) > preview_chars):
+            full_outputs[tool_message["tool_call_id"]] = content
+            tool_message["content"] = (
+                f"{content[:preview_chars]}\n\n"
+                f"[{len(content) - preview_chars} more characters of this {tool_message['name']} output were removed "
+                "from the history; the full output is only shown on the turn after the call]"
+            )
+    return full_outputs
+
+def latest_tool_outputs(state: MessagesState) -> list:
+    """
+    Trailing message with the full outputs of the model's latest tool turn that were cut in the history.
+
+    It is added to the model's input only, on the turn that acts on those outputs, and never stored.
+
+    Args:
+        state: Agent state with the message history and the latest turn's tool_outputs
+
+    Returns:
+        list: The message, or nothing if no output of the latest tool turn was cut
+    """
+    outputs = state.get("tool_outputs") or {}
+    last_turn = next((m for m in reversed(state["messages"]) if isinstance(m, AIMessage) and m.tool_calls), None)
+    if not outputs or last_turn is None:
+        return []
+    shown = [f"--- {tool_call['name']} ({tool_call['id']}) ---\n{outputs[tool_call['id']]}"
+             for tool_call in last_turn.tool_calls if tool_call["id"] in outputs]
+    if not shown:
+        return []
+    return [{"role": "user", "content": "Full outputs of your latest tool calls, shortened in the history above:\n\n" + "\n\n".join(shown)}]
+
+def section_summary(section: Section, max_chars: int = SUPERVISOR_SECTION_SUMMARY_CHARS) -> str:
+    """Opening text of a completed section, without its headings, cut to max_chars."""
+    text = " ".join(line.strip() for line in section.content.splitlines() if line.strip() and not line.lstrip().startswith("#"))
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+def report_status_ledger(state: ReportState) -> str:
+    """Compact status of the report's sections, introduction and conclusion for the supervisor."""
+    planned = state.get("sections") or []
+    completed = state.get("completed_sections") or []
+    lines = [
+        "Report status:",
+        f"- Sections planned: {len(planned)}",
+        f"- Sections completed: {len(completed)}",
+    ]
+    lines += [f"  - {s.name}: {section_summary(s)}" for s in completed]
+    lines += [
+        f"- Introduction: {'written' if state.get('introduction') else 'not written'}",
+        f"- Conclusion: {'written' if state.get('conclusion') else 'not written'}",
+    ]
+    return "\n".join(lines)
+
+def is_report_writing_turn(state: ReportState) -> bool:
+    """Whether the supervisor still has to write the introduction or conclusion once the research is done."""
+    return bool(state.get("completed_sections")) and not (state.get("introduction") and state.get("conclusion"))
+
+async def execute_tool_calls(tool_calls: list, tools_by_name: dict) -> Tuple[list, dict]:
+    """
+    Run a turn's tool calls concurrently.
+
+    Args:
+        tool_calls: Tool calls of the model's last message
+        tools_by_name: Tools available to the model, by name
+
+    Returns:
+        tuple: The tool messages, in the order of the tool calls, and the artifacts of tools that
+            return them (such as the search results of the search tools) by tool_call_id
+    """
+    artifacts = {}
+
+    async def execute(tool_call):
+        # Get the tool
+        tool = tools_by_name[tool_call["name"]]
+        # Perform the tool call - use ainvoke for async tools
+        if getattr(tool, "response_format", None) == "content_and_artifact":
+            # Invoke with the whole tool call to get the artifact along with the content
+            tool_message = await tool.ainvoke({**tool_call, "type": "tool_call"})
+            artifacts[tool_call["id"]] = tool_message.artifact
+            observation = tool_message.content
+        elif hasattr(tool, 'ainvoke'):
+            observation = await tool.ainvoke(tool_call["args"])
+        else:
+            observation = tool.invoke(tool_call["args"])
+        return {"role": "tool",
+                "content": observation,
+                "name": tool_call["name"],
+                "tool_call_id": tool_call["id"]}
+
+    messages = list(await asyncio.gather(*(execute(tool_call) for tool_call in tool_calls)))
+    return messages, artifacts
+
+def format_source_snippets(sources: list[dict], known_sources: dict) -> str:
+    """
+    Compact form of search results for the research loop: a snippet of each new source and a
+    one-line reference to sources found by an earlier search.
+
+    Args:
+        sources: Sources returned by a search tool, with 'url', 'title', 'summary' and 'content'
+        known_sources: Sources already found, by URL
+
+    Returns:
+        str: The formatted snippets
+    """
+    if not sources:
+        return "No valid search results found. Please try different search queries or use a different search API."
+
+    formatted_output = "Search results (snippets only; call RecallSource with a URL to read the full content):\n"
+    for source in sources:
+        if source["url"] in known_sources:
+            formatted_output += f"\n--- ALREADY FOUND: {source['title']} ---\nURL: {source['url']}\n"
+            continue
+        snippet = source.get("summary") or source["content"]
+        if len(snippet) > SOURCE_SNIPPET_CHARS:
+            snippet = snippet[:SOURCE_SNIPPET_CHARS] + "..."
+        formatted_output += (f"\n--- SOURCE: {source['title']} ---\nURL: {source['url']}\n"
+                             f"Full content: {len(source['content'])} characters\n\nSNIPPET:\n{snippet}\n")
+    return formatted_output
+
+def recall_source(url: str, sources: dict) -> str:
+    """Full content of a source found by an earlier search, for the RecallSource tool."""
+    source = sources.get(url)
+    if source is None:
+        return f"No source with URL {url} has been found yet. Use a URL from an earlier search result, or search again."
+    content = source["content"]
+    if len(content) > RECALL_SOURCE_MAX_CHARS:
+        content = content[:RECALL_SOURCE_MAX_CHARS] + "..."
+    return f"--- SOURCE: {source['title']} ---\nURL: {url}\n\nFULL CONTENT:\n{content}"
+
 # Tool lists will be built dynamically based on configuration
 def get_supervisor_tools(config: RunnableConfig):
     """Get supervisor tools based on configuration"""
@@ -96,34 +274,41 @@ def get_supervisor_tools(config: RunnableConfig):
 def get_research_tools(config: RunnableConfig):
     """Get research tools based on configuration"""
     search_tool = get_search_tool(config)
-    tool_list = [search_tool, Section]
+    tool_list = [search_tool, RecallSource, Section]
     return tool_list, {tool.name: tool for tool in tool_list}
 
+@timed_node
 async def supervisor(state: ReportState, config: RunnableConfig):
     """LLM decides whether to call a tool or not"""
 
-    # Messages
-    messages = state["messages"]
+    # Messages, followed by the full outputs of the latest tool turn that were cut in the history
+    messages = state["messages"] + latest_tool_outputs(state)
 
     # Get configuration
     configurable = Configuration.from_runnable_config(config)
     supervisor_model = get_config_value(configurable.supervisor_model)
     
-    # Initialize the model
-    llm = init_chat_model(model=supervisor_model)
-    
-    # If sections have been completed, but we don't yet have the final report, then we need to initiate writing the introduction and conclusion
-    if state.get("completed_sections") and not state.get("final_report"):
-        research_complete_message = {"role": "user", "content": "Research is complete. Now write the introduction and conclusion for the report. Here are the completed main body sections: \n\n" + "\n\n".join([s.content for s in state["completed_sections"]])}
+    # If sections have been completed, but the introduction or conclusion is missing, then we need to initiate writing them.
+    # The instruction is repeated on every turn until both are written, searches included; only these turns get the
+    # full section bodies, every other turn gets the ledger's section summaries.
+    if is_report_writing_turn(state):
+        missing = " and ".join(part for part in ("introduction", "conclusion") if not state.get(part))
+        research_complete_message = {"role": "user", "content": report_status_ledger(state) + f"\n\nResearch is complete. Now write the {missing} for the report. Here are the completed main body sections: \n\n" + "\n\n".join([s.content for s in state["completed_sections"]])}
         messages = messages + [research_complete_message]
+    # Otherwise, once sections are planned, add a compact ledger of the report's status
+    elif state.get("sections"):
+        messages = messages + [{"role": "user", "content": report_status_ledger(state)}]
 
-    # Get tools based on configuration
+    # Get tools based on configuration and the (cached) model bound to them. Sections starts the research and
+    # ends the turn, so the supervisor makes one tool call per turn.
     supervisor_tool_list, _ = get_supervisor_tools(config)
+    llm = get_tool_calling_model(supervisor_model, supervisor_tool_list, priority=LLM_PRIORITY_CRITICAL,
+                                 bind_kwargs={"parallel_tool_calls": False})
     
     # Invoke
     return {
         "messages": [
-            await llm.bind_tools(supervisor_tool_list, parallel_tool_calls=False).ainvoke(
+            await llm.ainvoke(
                 [
                     {"role": "system",
                      "content": SUPERVISOR_INSTRUCTIONS,
@@ -134,10 +319,10 @@ async def supervisor(state: ReportState, config: RunnableConfig):
         ]
     }
 
+@timed_node
 async def supervisor_tools(state: ReportState, config: RunnableConfig)  -> Command[Literal["supervisor", "research_team", "__end__"]]:
     """Performs the tool call and sends to the research agent"""
 
-    result = []
     sections_list = []
     intro_content = None
     conclusion_content = None
@@ -145,61 +330,66 @@ async def supervisor_tools(state: ReportState, config: RunnableConfig)  -> Comma
     # Get tools based on configuration
     _, supervisor_tools_by_name = get_supervisor_tools(config)
     
-    # First process all tool calls to ensure we respond to each one (required for OpenAI)
-    for tool_call in state["messages"][-1].tool_calls:
-        # Get the tool
-        tool = supervisor_tools_by_name[tool_call["name"]]
-        # Perform the tool call - use ainvoke for async tools
-        if hasattr(tool, 'ainvoke'):
-            observation = await tool.ainvoke(tool_call["args"])
-        else:
-            observation = tool.invoke(tool_call["args"])
+    # First run all tool calls concurrently to ensure we respond to each one (required for OpenAI)
+    result, _ = await execute_tool_calls(state["messages"][-1].tool_calls, supervisor_tools_by_name)
 
-        # Append to messages 
-        result.append({"role": "tool", 
-                       "content": observation, 
-                       "name": tool_call["name"], 
-                       "tool_call_id": tool_call["id"]})
-        
+    for tool_message in result:
+        observation = tool_message["content"]
         # Store special tool results for processing after all tools have been called
-        if tool_call["name"] == "Sections":
+        if tool_message["name"] == "Sections":
             sections_list = observation.sections
-        elif tool_call["name"] == "Introduction":
+        elif tool_message["name"] == "Introduction":
             # Format introduction with proper H1 heading if not already formatted
             if not observation.content.startswith("# "):
                 intro_content = f"# {observation.name}\n\n{observation.content}"
             else:
                 intro_content = observation.content
-        elif tool_call["name"] == "Conclusion":
+        elif tool_message["name"] == "Conclusion":
             # Format conclusion with proper H2 heading if not already formatted
             if not observation.content.startswith("## "):
                 conclusion_content = f"## {observation.name}\n\n{observation.content}"
             else:
                 conclusion_content = observation.content
     
+    # Store the tool outputs cut to a preview; the full outputs are shown on the next turn only
+    tool_outputs = compact_tool_outputs(result)
+
     # After processing all tool calls, decide what to do next
     if sections_list:
         # Send the sections to the research agents
-        return Command(goto=[Send("research_team", {"section": s}) for s in sections_list], update={"messages": result})
-    elif intro_content:
-        # Store introduction while waiting for conclusion
-        # Append to messages to guide the LLM to write conclusion next
-        result.append({"role": "user", "content": "Introduction written. Now write a conclusion section."})
-        return Command(goto="supervisor", update={"final_report": intro_content, "messages": result})
-    elif conclusion_content:
+        return Command(goto=[Send("research_team", {"section": s}) for s in sections_list],
+                       update={"messages": result, "sections": sections_list, "tool_outputs": tool_outputs})
+    elif intro_content or conclusion_content:
+        # Either may have been written in an earlier turn
+        intro = intro_content or state.get("introduction")
+        conclusion = conclusion_content or state.get("conclusion")
+        update = {key: value for key, value in (("introduction", intro), ("conclusion", conclusion)) if value}
+        if not conclusion:
+            # Store introduction while waiting for conclusion
+            # Append to messages to guide the LLM to write conclusion next
+            result.append({"role": "user", "content": "Introduction written. Now write a conclusion section."})
+            return Command(goto="supervisor", update={**update, "messages": result, "tool_outputs": tool_outputs})
+        if not intro:
+            result.append({"role": "user", "content": "Conclusion written. Now write an introduction."})
+            return Command(goto="supervisor", update={**update, "messages": result, "tool_outputs": tool_outputs})
+
         # Get all sections and combine in proper order: Introduction, Body Sections, Conclusion
-        intro = state.get("final_report", "")
         body_sections = "\n\n".join([s.content for s in state["completed_sections"]])
         
         # Assemble final report in correct order
-        complete_report = f"{intro}\n\n{body_sections}\n\n{conclusion_content}"
+        complete_report = f"{intro}\n\n{body_sections}\n\n{conclusion}"
+
+        # The report is done, so the run's LLM governors can go and its metrics summary is saved to $METRICS_DIR, if set
+        release_llm_governors(config)
+        write_run_summary(current_run_id())
         
         # Append to messages to indicate completion
         result.append({"role": "user", "content": "Report is now complete with introduction, body sections, and conclusion."})
-        return Command(goto="supervisor", update={"final_report": complete_report, "messages": result})
+        return Command(goto="supervisor", update={**update, "final_report": complete_report, "messages": result,
+                                                  "tool_outputs": tool_outputs})
     else:
         # Default case (for search tools, etc.)
-        return Command(goto="supervisor", update={"messages": result})
+        return Command(goto="supervisor", update={"messages": result, "tool_outputs": tool_outputs})
 
 async def supervisor_should_continue(state: ReportState) -> Literal["supervisor_tools", END]:
     """Decide if we should continue the loop or stop based upon whether the LLM made a tool call"""
@@ -215,6 +405,8 @@ async def supervisor_should_continue(state: ReportState) -> Literal["supervisor_
     else:
         return END
 
+@timed_node
+@memoized_node
 async def research_agent(state: SectionState, config: RunnableConfig):
     """LLM decides whether to call a tool or not"""
     
@@ -222,61 +414,66 @@ async def research_agent(state: SectionState, config: RunnableConfig):
     configurable = Configuration.from_runnable_config(config)
     researcher_model = get_config_value(configurable.researcher_model)
     
-    # Initialize the model
-    llm = init_chat_model(model=researcher_model)
-
-    # Get tools based on configuration
+    # Get tools based on configuration and the (cached) model bound to them
     research_tool_list, _ = get_research_tools(config)
+    llm = get_tool_calling_model(researcher_model, research_tool_list, priority=LLM_PRIORITY_HIGH)
+
+    # Recalled sources are stored as a preview; the ones recalled in the latest turn are shown whole
+    messages = state["messages"] + latest_tool_outputs(state)
     
     return {
         "messages": [
             # Enforce tool calling to either perform more search or call the Section tool to write the section
-            await llm.bind_tools(research_tool_list).ainvoke(
+            await llm.ainvoke(
                 [
                     {"role": "system",
                      "content": RESEARCH_INSTRUCTIONS.format(section_description=state["section"])
                     }
                 ]
-                + state["messages"]
+                + messages
             )
         ]
     }
 
+@timed_node
 async def research_agent_tools(state: SectionState, config: RunnableConfig):
     """Performs the tool call and route to supervisor or continue the research loop"""
 
-    result = []
     completed_section = None
     
     # Get tools based on configuration
     _, research_tools_by_name = get_research_tools(config)
     
-    # Process all tool calls first (required for OpenAI)
-    for tool_call in state["messages"][-1].tool_calls:
-        # Get the tool
-        tool = research_tools_by_name[tool_call["name"]]
-        # Perform the tool call - use ainvoke for async tools
-        if hasattr(tool, 'ainvoke'):
-            observation = await tool.ainvoke(tool_call["args"])
-        else:
-            observation = tool.invoke(tool_call["args"])
-        # Append to messages 
-        result.append({"role": "tool", 
-                       "content": observation, 
-                       "name": tool_call["name"], 
-                       "tool_call_id": tool_call["id"]})
-        
+    # Run all tool calls concurrently first (required for OpenAI)
+    result, artifacts = await execute_tool_calls(state["messages"][-1].tool_calls, research_tools_by_name)
+
+    # Keep full search results in state and only snippets in messages
+    known_sources = dict(state.get("sources") or {})
+    new_sources = {}
+    for tool_message in result:
+        sources = artifacts.get(tool_message["tool_call_id"])
+        if sources is not None:
+            tool_message["content"] = format_source_snippets(sources, {**known_sources, **new_sources})
+            new_sources.update({source["url"]: source for source in sources if source["url"] not in known_sources})
+
+    for tool_message in result:
+        # Answer recalls from every source found so far, including this turn's
+        if tool_message["name"] == "RecallSource":
+            tool_message["content"] = recall_source(tool_message["content"].url, {**known_sources, **new_sources})
         # Store the section observation if a Section tool was called
-        if tool_call["name"] == "Section":
-            completed_section = observation
+        elif tool_message["name"] == "Section":
+            completed_section = tool_message["content"]
+
+    # Store recalled sources cut to a preview; RecallSource rereads them
+    tool_outputs = compact_tool_outputs(result, preview_chars=SOURCE_SNIPPET_CHARS, tool_names={RecallSource.name})
     
     # After processing all tools, decide what to do next
     if completed_section:
         # Write the completed section to state and return to the supervisor
-        return {"messages": result, "completed_sections": [completed_section]}
+        return {"messages": result, "sources": new_sources, "tool_outputs": tool_outputs, "completed_sections": [completed_section]}
     else:
         # Continue the research loop for search tools, etc.
-        return {"messages": result}
+        return {"messages": result, "sources": new_sources, "tool_outputs": tool_outputs}
 
 async def research_agent_should_continue(state: SectionState) -> Literal["research_agent_tools", END]:
     """Decide if we should continue the loop or stop based upon whether the LLM made a tool call"""
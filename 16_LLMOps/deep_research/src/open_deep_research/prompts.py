@@ -57,6 +57,7 @@ Each section should have the fields:
 - Description - Brief overview of the main topics covered in this section.
 - Research - Whether to perform web research for this section of the report. IMPORTANT: Main body sections (not intro/conclusion) MUST have Research=True. A report must have AT LEAST 2-3 sections with Research=True to be useful.
 - Content - The content of the section, which you will leave blank for now.
+- Depends on - For sections without research (e.g. intro/conclusion), the names of the research sections they draw on. Leave it empty if they draw on all of them.
 
 Integration guidelines:
 - Include examples and implementation details within main topic sections, not as separate sections
@@ -328,6 +329,7 @@ You are a researcher responsible for completing a specific section of a report.
 
    b) **Analyze Results Thoroughly**: After receiving search results:
       - Carefully read and analyze ALL provided content
+      - Search results show a snippet of each source; use the `RecallSource` tool with a source's URL to read its full content when the snippet is not enough
       - Identify specific aspects that are well-covered and those that need more information
       - Assess how well the current information addresses the section scope
 
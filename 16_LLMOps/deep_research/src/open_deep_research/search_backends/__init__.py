@@ -0,0 +1,5 @@
+"""Search backends registered in open_deep_research.utils.SEARCH_BACKENDS.
+
+Each backend lives in its own module, which imports its SDK at the top. The registry refers to the
+modules by name, so a backend's SDK is only imported once a run uses it.
+"""
@@ -0,0 +1,250 @@
+"""arXiv search, with the full text of each paper parsed from its PDF."""
+
+import asyncio
+import concurrent.futures
+import logging
+import re
+from collections import OrderedDict
+
+import arxiv
+import pymupdf
+from langsmith import traceable
+
+from open_deep_research.utils import AsyncRateLimiter, get_http_client
+
+logger = logging.getLogger(__name__)
+
+# arXiv asks API clients for at most one request every 3 seconds
+ARXIV_MAX_QUERY_LENGTH = 300
+ARXIV_PDF_CONCURRENCY = 4
+ARXIV_FULL_TEXT_CACHE_SIZE = 256
+_arxiv_rate_limiter = AsyncRateLimiter(rate=1 / 3.0)
+_arxiv_pdf_executor = None
+_arxiv_full_text_cache: OrderedDict = OrderedDict()  # arXiv short ID -> parsed full text
+
+def new_arxiv_client():
+    """Return an arxiv.Client for one metadata search.
+
+    arxiv.Client tracks its last request time without a lock, so each search run in an executor thread
+    gets its own client. Its built-in delay is disabled because _arxiv_rate_limiter already spaces out
+    every arXiv request in the process; a search for up to page_size results is a single request.
+    """
+    return arxiv.Client(page_size=100, delay_seconds=0.0, num_retries=3)
+
+def get_arxiv_pdf_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the bounded thread pool used to parse arXiv PDFs off the event loop."""
+    global _arxiv_pdf_executor
+    if _arxiv_pdf_executor is None:
+        _arxiv_pdf_executor = concurrent.futures.ThreadPoolExecutor(max_workers=ARXIV_PDF_CONCURRENCY, thread_name_prefix="arxiv-pdf")
+    return _arxiv_pdf_executor
+
+def _parse_pdf_text(data: bytes) -> str:
+    """Extract the text of every page of a PDF held in memory."""
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return "".join(page.get_text() for page in doc)
+
+def _is_arxiv_identifier(query: str) -> bool:
+    """Check whether a query is a whitespace-separated list of arXiv IDs (e.g. '2103.00020' or 'hep-th/9901001v2')."""
+    pattern = r"^(\d{4}\.\d{4,5}|[a-z\-]+(\.[A-Z]{2})?/\d{7})(v\d+)?$"
+    return bool(query.split()) and all(re.match(pattern, token) for token in query.split())
+
+def _arxiv_result_metadata(result, load_all_available_meta: bool) -> dict:
+    """Build the same metadata dict ArxivRetriever produced for a full-text document."""
+    metadata = {
+        "Published": str(result.updated.date()),
+        "Title": result.title,
+        "Authors": ", ".join(a.name for a in result.authors),
+        "Summary": result.summary,
+    }
+    if load_all_available_meta:
+        metadata.update({
+            "entry_id": result.entry_id,
+            "published_first_time": str(result.published.date()),
+            "comment": result.comment,
+            "journal_ref": result.journal_ref,
+            "doi": result.doi,
+            "primary_category": result.primary_category,
+            "categories": result.categories,
+            "links": [link.href for link in result.links],
+        })
+    else:
+        metadata["entry_id"] = result.entry_id
+    return metadata
+
+@traceable
+async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents=True, load_all_available_meta=True, doc_content_chars_max=4000):
+    """Perform pipelined searches on arXiv.
+
+    Metadata searches are rate-limited to arXiv's one request every 3 seconds by a process-wide limiter.
+    Full-text PDFs are downloaded and parsed in a bounded pool as soon as each query's metadata lands,
+    so the next query's metadata request overlaps with PDF parsing for the previous one. Parsed full
+    texts are cached by arXiv ID.
+
+    Args:
+        search_queries (List[str]): List of search queries or article IDs
+        load_max_docs (int, optional): Maximum number of documents to return per query. Default is 5.
+        get_full_documents (bool, optional): Whether to fetch full text of documents. Default is True.
+        load_all_available_meta (bool, optional): Whether to load all available metadata. Default is True.
+        doc_content_chars_max (int, optional): Maximum characters of full text kept per document. Default is 4000.
+
+    Returns:
+        List[dict]: List of search responses from arXiv, one per query. Each response has format:
+            {
+                'query': str,                    # The original search query
+                'follow_up_questions': None,      
+                'answer': None,
+                'images': [],
+                'results': [                     # List of search results
+                    {
+                        'title': str,            # Title of the paper
+                        'url': str,              # URL (Entry ID) of the paper
+                        'content': str,          # Formatted summary with metadata
+                        'score': float,          # Relevance score (approximated)
+                        'raw_content': str|None  # Full paper content if available
+                    },
+                    ...
+                ]
+            }
+    """
+    loop = asyncio.get_running_loop()
+    pdf_semaphore = asyncio.Semaphore(ARXIV_PDF_CONCURRENCY)
+
+    http_client = get_http_client()
+
+    async def fetch_full_text(result):
+        short_id = result.get_short_id()
+        if short_id in _arxiv_full_text_cache:
+            _arxiv_full_text_cache.move_to_end(short_id)
+            return _arxiv_full_text_cache[short_id]
+
+        async with pdf_semaphore:
+            response = await http_client.get(result.pdf_url, timeout=60.0)
+            response.raise_for_status()
+            text = await loop.run_in_executor(get_arxiv_pdf_executor(), _parse_pdf_text, response.content)
+
+        _arxiv_full_text_cache[short_id] = text
+        while len(_arxiv_full_text_cache) > ARXIV_FULL_TEXT_CACHE_SIZE:
+            _arxiv_full_text_cache.popitem(last=False)
+        return text
+
+    async def process_single_query(query):
+        try:
+            # Only the metadata request is rate-limited
+            await _arxiv_rate_limiter.acquire()
+            if _is_arxiv_identifier(query):
+                search = arxiv.Search(id_list=query.split(), max_results=load_max_docs)
+            else:
+                # Remove the ":" and "-" from the query, as they can cause search problems
+                cleaned_query = query.replace(":", "").replace("-", "")[:ARXIV_MAX_QUERY_LENGTH]
+                search = arxiv.Search(query=cleaned_query, max_results=load_max_docs)
+            arxiv_results = await loop.run_in_executor(None, lambda: list(new_arxiv_client().results(search)))
+
+            # Start the PDF downloads for this query right away
+            if get_full_documents:
+                full_texts = await asyncio.gather(*(fetch_full_text(r) for r in arxiv_results), return_exceptions=True)
+            else:
+                full_texts = [None] * len(arxiv_results)
+
+            results = []
+            # Assign decreasing scores based on the order
+            base_score = 1.0
+            score_decrement = 1.0 / (len(arxiv_results) + 1) if arxiv_results else 0
+
+            for i, (arxiv_result, full_text) in enumerate(zip(arxiv_results, full_texts)):
+                # Extract metadata
+                metadata = _arxiv_result_metadata(arxiv_result, load_all_available_meta)
+
+                # Use entry_id as the URL (this is the actual arxiv link)
+                url = metadata.get('entry_id', '')
+
+                # Format content with all useful metadata
+                content_parts = []
+
+                # Primary information
+                if 'Summary' in metadata:
+                    content_parts.append(f"Summary: {metadata['Summary']}")
+
+                if 'Authors' in metadata:
+                    content_parts.append(f"Authors: {metadata['Authors']}")
+
+                # Add publication information
+                published = metadata.get('Published')
+                published_str = published.isoformat() if hasattr(published, 'isoformat') else str(published) if published else ''
+                if published_str:
+                    content_parts.append(f"Published: {published_str}")
+
+                # Add additional metadata if available
+                if 'primary_category' in metadata:
+                    content_parts.append(f"Primary Category: {metadata['primary_category']}")
+
+                if 'categories' in metadata and metadata['categories']:
+                    content_parts.append(f"Categories: {', '.join(metadata['categories'])}")
+
+                if 'comment' in metadata and metadata['comment']:
+                    content_parts.append(f"Comment: {metadata['comment']}")
+
+                if 'journal_ref' in metadata and metadata['journal_ref']:
+                    content_parts.append(f"Journal Reference: {metadata['journal_ref']}")
+
+                if 'doi' in metadata and metadata['doi']:
+                    content_parts.append(f"DOI: {metadata['doi']}")
+
+                # Get PDF link if available in the links
+                pdf_link = ""
+                if 'links' in metadata and metadata['links']:
+                    for link in metadata['links']:
+                        if 'pdf' in link:
+                            pdf_link = link
+                            content_parts.append(f"PDF: {pdf_link}")
+                            break
+
+                # Join all content parts with newlines 
+                content = "\n".join(content_parts)
+
+                # Fall back to the abstract if the PDF could not be fetched or parsed
+                raw_content = None
+                if get_full_documents:
+                    if isinstance(full_text, BaseException):
+                        logger.warning("Failed to fetch full text for %s: %s", url, full_text)
+                        raw_content = arxiv_result.summary
+                    else:
+                        raw_content = full_text[:doc_content_chars_max]
+
+                result = {
+                    'title': metadata.get('Title', ''),
+                    'url': url,  # Using entry_id as the URL
+                    'content': content,
+                    'score': base_score - (i * score_decrement),
+                    'raw_content': raw_content
+                }
+                results.append(result)
+
+            return {
+                'query': query,
+                'follow_up_questions': None,
+                'answer': None,
+                'images': [],
+                'results': results
+            }
+        except Exception as e:
+            # Handle exceptions gracefully
+            logger.warning("Error processing arXiv query %r: %s", query, e)
+
+            # Hold back every arXiv request if we hit a rate limit error
+            if "429" in str(e) or "Too Many Requests" in str(e):
+                logger.warning("arXiv rate limit exceeded, adding additional delay")
+                _arxiv_rate_limiter.pause(5.0)
+
+            return {
+                'query': query,
+                'follow_up_questions': None,
+                'answer': None,
+                'images': [],
+                'results': [],
+                'error': str(e)
+            }
+
+    # All queries start together; the rate limiter serializes their metadata requests
+    search_docs = await asyncio.gather(*(process_single_query(query) for query in search_queries))
+
+    return list(search_docs)
@@ -0,0 +1,99 @@
+"""Azure AI Search over an index of internal documents."""
+
+import asyncio
+import os
+from typing import List
+
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents.aio import SearchClient as AsyncAzureAISearchClient
+from langchain_core.tools import tool
+from langsmith import traceable
+
+from open_deep_research.utils import (
+    cached_search,
+    format_search_results,
+    get_pooled_client,
+)
+
+
+@traceable
+async def azureaisearch_search_async(search_queries: list[str], max_results: int = 5, topic: str = "general", include_raw_content: bool = True) -> list[dict]:
+    """Perform concurrent web searches using the Azure AI Search API.
+
+    Args:
+        search_queries (List[str]): list of search queries to process
+        max_results (int): maximum number of results to return for each query
+        topic (str): semantic topic filter for the search.
+        include_raw_content (bool)
+
+    Returns:
+        List[dict]: list of search responses from Azure AI Search API, one per query.
+    """
+    # configure and reuse the pooled Azure Search client
+    # ensure all environment variables are set
+    if not all(var in os.environ for var in ["AZURE_AI_SEARCH_ENDPOINT", "AZURE_AI_SEARCH_INDEX_NAME", "AZURE_AI_SEARCH_API_KEY"]):
+        raise ValueError("Missing required environment variables for Azure Search API which are: AZURE_AI_SEARCH_ENDPOINT, AZURE_AI_SEARCH_INDEX_NAME, AZURE_AI_SEARCH_API_KEY")
+    endpoint = os.getenv("AZURE_AI_SEARCH_ENDPOINT")
+    index_name = os.getenv("AZURE_AI_SEARCH_INDEX_NAME")
+    credential = AzureKeyCredential(os.getenv("AZURE_AI_SEARCH_API_KEY"))
+
+    reranker_key = '@search.reranker_score'
+
+    client = get_pooled_client(f"azureaisearch:{endpoint}:{index_name}", lambda: AsyncAzureAISearchClient(endpoint, index_name, credential))
+
+    async def do_search(query: str) -> dict:
+        # search query 
+        paged = await client.search(
+            search_text=query,
+            vector_queries=[{
+                "fields": "vector",
+                "kind": "text",
+                "text": query,
+                "exhaustive": True
+            }],
+            semantic_configuration_name="fraunhofer-rag-semantic-config",
+            query_type="semantic",
+            select=["url", "title", "chunk", "creationTime", "lastModifiedTime"],
+            top=max_results,
+        )
+        # async iterator to get all results
+        items = [doc async for doc in paged]
+        # Umwandlung in einfaches Dict-Format
+        results = [
+            {
+                "title": doc.get("title"),
+                "url": doc.get("url"),
+                "content": doc.get("chunk"),
+                "score": doc.get(reranker_key),
+                "raw_content": doc.get("chunk") if include_raw_content else None
+            }
+            for doc in items
+        ]
+        return {"query": query, "results": results}
+
+    # parallelize the search queries
+    tasks = [do_search(q) for q in search_queries]
+    return await asyncio.gather(*tasks)
+
+
+@tool
+async def azureaisearch_search(queries: List[str], max_results: int = 5, topic: str = "general") -> str:
+    """Fetch results from Azure AI Search API.
+    
+    Args:
+        queries (List[str]): List of search queries
+        
+    Returns:
+        str: A formatted string of search results
+    """
+    # Use azureaisearch_search_async with include_raw_content=True to get content directly
+    search_results = await cached_search(
+        "azureaisearch",
+        azureaisearch_search_async,
+        queries,
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=True
+    )
+
+    return format_search_results(search_results)
@@ -0,0 +1,158 @@
+"""DuckDuckGo web search, with the full content of each result scraped from its page."""
+
+import asyncio
+import concurrent.futures
+import logging
+import random
+from typing import List
+
+from duckduckgo_search import DDGS
+from langchain_core.tools import tool
+
+from open_deep_research.utils import (
+    SCRAPE_MAX_CONCURRENCY,
+    AsyncRateLimiter,
+    fetch_pages,
+    format_scraped_pages,
+    get_search_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# DuckDuckGo has no published limit; keep all queries in the process under one request every 2 seconds on average
+DUCKDUCKGO_RATE = 0.5
+DUCKDUCKGO_MAX_RETRIES = 3
+DUCKDUCKGO_BACKOFF_FACTOR = 2.0
+DUCKDUCKGO_QUERY_TIMEOUT = 45.0
+_duckduckgo_rate_limiter = AsyncRateLimiter(rate=DUCKDUCKGO_RATE, capacity=2)
+_duckduckgo_executor = None
+
+def get_duckduckgo_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the bounded thread pool that runs single blocking DDGS requests."""
+    global _duckduckgo_executor
+    if _duckduckgo_executor is None:
+        _duckduckgo_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="duckduckgo")
+    return _duckduckgo_executor
+
+async def duckduckgo_search_async(query: str, max_results: int = 5, max_retries: int = DUCKDUCKGO_MAX_RETRIES) -> dict:
+    """Search DuckDuckGo for one query with retry logic to handle rate limits.
+
+    Every attempt waits for the shared DuckDuckGo rate limiter, and only the DDGS request itself runs
+    in a thread. Backoff after a rate-limit error sleeps on the event loop and holds back all other
+    DuckDuckGo queries too, so no thread is held while waiting.
+
+    Args:
+        query (str): The search query
+        max_results (int): Maximum number of results to return
+        max_retries (int): Retries after rate-limit errors
+
+    Returns:
+        dict: Search response in the same format as the other search APIs, with an 'error' key if all attempts failed
+    """
+    loop = asyncio.get_running_loop()
+    last_exception = None
+
+
+    def perform_search(search_query):
+        with DDGS() as ddgs:
+            return list(ddgs.text(search_query, max_results=max_results))
+
+    for retry_count in range(max_retries + 1):
+        if retry_count > 0:
+            # Add a random element to the query to bypass caching/rate limits
+            modifiers = ['about', 'info', 'guide', 'overview', 'details', 'explained']
+            modified_query = f"{query} {random.choice(modifiers)}"
+        else:
+            modified_query = query
+
+        await _duckduckgo_rate_limiter.acquire()
+        try:
+            ddg_results = await loop.run_in_executor(get_duckduckgo_executor(), perform_search, modified_query)
+        except Exception as e:
+            last_exception = e
+            # If not a rate limit error, don't retry
+            if "Ratelimit" not in str(e) or retry_count == max_retries:
+                break
+
+            # Random delay with exponential backoff, applied to every DuckDuckGo query
+            delay = DUCKDUCKGO_BACKOFF_FACTOR ** (retry_count + 1) + random.random()
+            logger.info("DuckDuckGo rate limited query %r, retrying in %.2fs (%d/%d)", query, delay,
+                        retry_count + 1, max_retries)
+            _duckduckgo_rate_limiter.pause(delay)
+            continue
+
+        # Format results
+        results = []
+        for i, result in enumerate(ddg_results):
+            results.append({
+                'title': result.get('title', ''),
+                'url': result.get('href', ''),
+                'content': result.get('body', ''),
+                'score': 1.0 - (i * 0.1),  # Simple scoring mechanism
+                'raw_content': result.get('body', '')
+            })
+
+        return {
+            'query': query,
+            'follow_up_questions': None,
+            'answer': None,
+            'images': [],
+            'results': results
+        }
+
+    # If we reach here, all retries failed
+    logger.warning("DuckDuckGo query %r failed: %s", query, last_exception)
+    # Return empty results but with query info preserved
+    return {
+        'query': query,
+        'follow_up_questions': None,
+        'answer': None,
+        'images': [],
+        'results': [],
+        'error': str(last_exception)
+    }
+
+@tool(response_format="content_and_artifact")
+async def duckduckgo_search(search_queries: List[str]):
+    """Perform searches using DuckDuckGo with retry logic to handle rate limits.
+    
+    Args:
+        search_queries (List[str]): List of search queries to process
+        
+    Returns:
+        Tuple[str, List[dict]]: The formatted scraped pages, and the pages as sources (see search_sources)
+    """
+    # Queries run concurrently under the shared rate limiter, and each query's pages
+    # are scraped as soon as its results arrive
+    cache = get_search_cache()
+    scrape_semaphore = asyncio.Semaphore(SCRAPE_MAX_CONCURRENCY)
+
+    async def search_and_scrape(query):
+        # Serve repeated queries from the cache without touching DuckDuckGo
+        result = cache.get("duckduckgo", query, {}) if cache else None
+        if result is None:
+            try:
+                result = await asyncio.wait_for(duckduckgo_search_async(query), timeout=DUCKDUCKGO_QUERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("DuckDuckGo query %r did not finish within %ss", query, DUCKDUCKGO_QUERY_TIMEOUT)
+                result = {'query': query, 'follow_up_questions': None, 'answer': None, 'images': [], 'results': [],
+                          'error': f"Timed out after {DUCKDUCKGO_QUERY_TIMEOUT}s"}
+            if cache and result['results'] and not result.get('error'):
+                cache.set("duckduckgo", query, {}, result)
+
+        # Safely extract URLs and titles from results, handling empty result cases
+        sources = [(res['title'], res['url']) for res in result['results'] if 'url' in res and 'title' in res]
+        pages = await fetch_pages([url for _, url in sources], semaphore=scrape_semaphore)
+        return [(title, url, page) for (title, url), page in zip(sources, pages)]
+
+    scraped = [source for sources in await asyncio.gather(*(search_and_scrape(query) for query in search_queries))
+               for source in sources]
+
+    # If we got any valid URLs, format the scraped pages
+    if scraped:
+        titles, urls, pages = zip(*scraped)
+        sources = [{"url": url, "title": title, "summary": None, "content": page} for title, url, page in scraped]
+        return format_scraped_pages(titles, urls, pages), sources
+    else:
+        # Return a formatted error message if no valid URLs were found
+        return "No valid search results found. Please try different search queries or use a different search API.", []
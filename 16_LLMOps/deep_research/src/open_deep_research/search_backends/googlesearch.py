@@ -0,0 +1,274 @@
+"""Google search, through the Custom Search API when configured and by scraping otherwise."""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import random
+import time
+from typing import List, Union
+from urllib.parse import unquote
+
+import httpx
+import requests
+from bs4 import BeautifulSoup
+from langsmith import traceable
+
+from open_deep_research.utils import (
+    fetch_page_content,
+    get_host_semaphore,
+    get_http_client,
+    is_text_content_type,
+)
+
+logger = logging.getLogger(__name__)
+
+@traceable
+async def google_search_async(search_queries: Union[str, List[str]], max_results: int = 5, include_raw_content: bool = True):
+    """Perform concurrent web searches using Google.
+
+    Uses Google Custom Search API if environment variables are set, otherwise falls back to web scraping.
+
+    Args:
+        search_queries (List[str]): List of search queries to process
+        max_results (int): Maximum number of results to return per query
+        include_raw_content (bool): Whether to fetch full page content
+
+    Returns:
+        List[dict]: List of search responses from Google, one per query
+    """
+    # Check for API credentials from environment variables
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    cx = os.environ.get("GOOGLE_CX")
+    use_api = bool(api_key and cx)
+    
+    # Handle case where search_queries is a single string
+    if isinstance(search_queries, str):
+        search_queries = [search_queries]
+    
+    # Define user agent generator
+    def get_useragent():
+        """Generate a random user agent string."""
+        lynx_version = f"Lynx/{random.randint(2, 3)}.{random.randint(8, 9)}.{random.randint(0, 2)}"
+        libwww_version = f"libwww-FM/{random.randint(2, 3)}.{random.randint(13, 15)}"
+        ssl_mm_version = f"SSL-MM/{random.randint(1, 2)}.{random.randint(3, 5)}"
+        openssl_version = f"OpenSSL/{random.randint(1, 3)}.{random.randint(0, 4)}.{random.randint(0, 9)}"
+        return f"{lynx_version} {libwww_version} {ssl_mm_version} {openssl_version}"
+    
+    # Create executor for running synchronous operations
+    executor = None if use_api else concurrent.futures.ThreadPoolExecutor(max_workers=5)
+    
+    # Use a semaphore to limit concurrent requests
+    semaphore = asyncio.Semaphore(5 if use_api else 2)
+
+    # API calls and page fetches share the pooled HTTP client
+    http_client = get_http_client()
+    
+    async def search_single_query(query):
+        async with semaphore:
+            try:
+                results = []
+                
+                # API-based search
+                if use_api:
+                    # The API returns up to 10 results per request
+                    for start_index in range(1, max_results + 1, 10):
+                        # Calculate how many results to request in this batch
+                        num = min(10, max_results - (start_index - 1))
+                        
+                        # Make request to Google Custom Search API
+                        params = {
+                            'q': query,
+                            'key': api_key,
+                            'cx': cx,
+                            'start': start_index,
+                            'num': num
+                        }
+                        logger.info("Requesting %d results for %r from the Google API", num, query)
+
+                        response = await http_client.get('https://www.googleapis.com/customsearch/v1', params=params)
+                        if response.status_code != 200:
+                            logger.warning("Google API error: %s, %s", response.status_code, response.text)
+                            break
+                            
+                        data = response.json()
+                        
+                        # Process search results
+                        for item in data.get('items', []):
+                            result = {
+                                "title": item.get('title', ''),
+                                "url": item.get('link', ''),
+                                "content": item.get('snippet', ''),
+                                "score": None,
+                                "raw_content": item.get('snippet', '')
+                            }
+                            results.append(result)
+                        
+                        # Respect API quota with a small delay
+                        await asyncio.sleep(0.2)
+                        
+                        # If we didn't get a full page of results, no need to request more
+                        if not data.get('items') or len(data.get('items', [])) < num:
+                            break
+                
+                # Web scraping based search
+                else:
+                    # Add delay between requests
+                    await asyncio.sleep(0.5 + random.random() * 1.5)
+                    logger.info("Scraping Google for %r", query)
+
+                    # Define scraping function
+                    def google_search(query, max_results):
+                        try:
+                            lang = "en"
+                            safe = "active"
+                            start = 0
+                            fetched_results = 0
+                            fetched_links = set()
+                            search_results = []
+                            
+                            while fetched_results < max_results:
+                                # Send request to Google
+                                resp = requests.get(
+                                    url="https://www.google.com/search",
+                                    headers={
+                                        "User-Agent": get_useragent(),
+                                        "Accept": "*/*"
+                                    },
+                                    params={
+                                        "q": query,
+                                        "num": max_results + 2,
+                                        "hl": lang,
+                                        "start": start,
+                                        "safe": safe,
+                                    },
+                                    cookies = {
+                                        'CONSENT': 'PENDING+987',  # Bypasses the consent page
+                                        'SOCS': 'CAESHAgBEhIaAB',
+                                    }
+                                )
+                                resp.raise_for_status()
+                                
+                                # Parse results
+                                soup = BeautifulSoup(resp.text, "html.parser")
+                                result_block = soup.find_all("div", class_="ezO2md")
+                                new_results = 0
+                                
+                                for result in result_block:
+                                    link_tag = result.find("a", href=True)
+                                    title_tag = link_tag.find("span", class_="CVA68e") if link_tag else None
+                                    description_tag = result.find("span", class_="FrIlee")
+                                    
+                                    if link_tag and title_tag and description_tag:
+                                        link = unquote(link_tag["href"].split("&")[0].replace("/url?q=", ""))
+                                        
+                                        if link in fetched_links:
+                                            continue
+                                        
+                                        fetched_links.add(link)
+                                        title = title_tag.text
+                                        description = description_tag.text
+                                        
+                                        # Store result in the same format as the API results
+                                        search_results.append({
+                                            "title": title,
+                                            "url": link,
+                                            "content": description,
+                                            "score": None,
+                                            "raw_content": description
+                                        })
+                                        
+                                        fetched_results += 1
+                                        new_results += 1
+                                        
+                                        if fetched_results >= max_results:
+                                            break
+                                
+                                if new_results == 0:
+                                    break
+                                    
+                                start += 10
+                                time.sleep(1)  # Delay between pages
+                            
+                            return search_results
+                                
+                        except Exception as e:
+                            logger.warning("Error in Google search for %r: %s", query, e)
+                            return []
+                    
+                    # Execute search in thread pool
+                    loop = asyncio.get_running_loop()
+                    search_results = await loop.run_in_executor(
+                        executor, 
+                        lambda: google_search(query, max_results)
+                    )
+                    
+                    # Process the results
+                    results = search_results
+                
+                # If requested, fetch full page content asynchronously (for both API and web scraping)
+                if include_raw_content and results:
+                    content_semaphore = asyncio.Semaphore(3)
+                    fetch_tasks = []
+                    
+                    async def fetch_full_content(result):
+                        async with content_semaphore:
+                            url = result['url']
+                            headers = {
+                                'User-Agent': get_useragent(),
+                                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+                            }
+                            
+                            try:
+                                await asyncio.sleep(0.2 + random.random() * 0.6)
+                                async with get_host_semaphore(url):
+                                    content_type, content, _ = await fetch_page_content(http_client, url, "text", headers=headers, timeout=10)
+                                if is_text_content_type(content_type):
+                                    result['raw_content'] = content
+                                else:
+                                    # For PDFs and other non-HTML files, indicate that content is not parsed
+                                    result['raw_content'] = f"[Binary content: {content_type}. Content extraction not supported for this file type.]"
+                            except httpx.HTTPStatusError:
+                                # Keep the snippet for pages that did not return 200
+                                pass
+                            except Exception as e:
+                                logger.warning("Failed to fetch content for %s: %s", url, e)
+                                result['raw_content'] = f"[Error fetching content: {str(e)}]"
+                            return result
+                    
+                    for result in results:
+                        fetch_tasks.append(fetch_full_content(result))
+                    
+                    updated_results = await asyncio.gather(*fetch_tasks)
+                    results = updated_results
+                    logger.info("Fetched full content for %d results", len(results))
+                
+                return {
+                    "query": query,
+                    "follow_up_questions": None,
+                    "answer": None,
+                    "images": [],
+                    "results": results
+                }
+            except Exception as e:
+                logger.warning("Error in Google search for query %r: %s", query, e)
+                return {
+                    "query": query,
+                    "follow_up_questions": None,
+                    "answer": None,
+                    "images": [],
+                    "results": []
+                }
+    
+    try:
+        # Create tasks for all search queries
+        search_tasks = [search_single_query(query) for query in search_queries]
+        
+        # Execute all searches concurrently
+        search_results = await asyncio.gather(*search_tasks)
+        
+        return search_results
+    finally:
+        # Only shut down executor if it was created
+        if executor:
+            executor.shutdown(wait=False)
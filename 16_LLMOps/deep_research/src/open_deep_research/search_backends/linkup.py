@@ -0,0 +1,60 @@
+"""Linkup web search."""
+
+import asyncio
+import functools
+import os
+
+from langsmith import traceable
+from linkup import LinkupClient
+
+
+@functools.cache
+def get_linkup_client(api_key: str | None) -> LinkupClient:
+    """Return the process-wide Linkup client for an API key (None reads LINKUP_API_KEY)."""
+    return LinkupClient(api_key=api_key)
+
+
+@traceable
+async def linkup_search(search_queries, depth: str | None = "standard"):
+    """Perform concurrent web searches using the Linkup API.
+
+    Args:
+        search_queries (List[SearchQuery]): List of search queries to process
+        depth (str, optional): "standard" (default)  or "deep". More details here https://docs.linkup.so/pages/documentation/get-started/concepts
+
+    Returns:
+        List[dict]: List of search responses from Linkup API, one per query. Each response has format:
+            {
+                'results': [            # List of search results
+                    {
+                        'title': str,   # Title of the search result
+                        'url': str,     # URL of the result
+                        'content': str, # Summary/snippet of content
+                    },
+                    ...
+                ]
+            }
+    """
+    client = get_linkup_client(os.getenv("LINKUP_API_KEY"))
+    search_tasks = []
+    for query in search_queries:
+        search_tasks.append(
+                client.async_search(
+                    query,
+                    depth,
+                    output_type="searchResults",
+                )
+            )
+
+    search_results = []
+    for response in await asyncio.gather(*search_tasks):
+        search_results.append(
+            {
+                "results": [
+                    {"title": result.name, "url": result.url, "content": result.content}
+                    for result in response.results
+                ],
+            }
+        )
+
+    return search_results
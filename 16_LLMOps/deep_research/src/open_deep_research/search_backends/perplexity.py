@@ -0,0 +1,155 @@
+"""Perplexity search, returning an answer with its cited sources."""
+
+import asyncio
+import logging
+import os
+import random
+import weakref
+
+import httpx
+from langsmith import traceable
+
+from open_deep_research.utils import get_http_client, get_retry_after
+
+logger = logging.getLogger(__name__)
+
+PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+PERPLEXITY_MAX_CONCURRENCY = 4
+PERPLEXITY_MAX_RETRIES = 3
+PERPLEXITY_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+_perplexity_semaphores = weakref.WeakKeyDictionary()  # event loop -> Semaphore shared by every Perplexity search
+
+@traceable
+async def perplexity_search(search_queries, model: str = "sonar-pro"):
+    """Search the web using the Perplexity API.
+
+    Queries run concurrently over the pooled httpx client, at most PERPLEXITY_MAX_CONCURRENCY at a
+    time across every search in the process. Rate-limit, server and connection errors are retried with backoff,
+    honouring Retry-After.
+    
+    Args:
+        search_queries (List[SearchQuery]): List of search queries to process
+        model (str, optional): Perplexity model answering the queries, e.g. "sonar" or "sonar-reasoning-pro".
+            Defaults to "sonar-pro".
+  
+    Returns:
+        List[dict]: List of search responses from Perplexity API, one per query. Each response has format:
+            {
+                'query': str,                    # The original search query
+                'follow_up_questions': None,      
+                'answer': None,
+                'images': list,
+                'results': [                     # List of search results
+                    {
+                        'title': str,            # Title of the search result
+                        'url': str,              # URL of the result
+                        'content': str,          # Summary/snippet of content
+                        'score': float,          # Relevance score
+                        'raw_content': str|None  # Full content or None for secondary citations
+                    },
+                    ...
+                ]
+            }
+    """
+    headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "Authorization": f"Bearer {os.getenv('PERPLEXITY_API_KEY')}"
+    }
+    loop = asyncio.get_running_loop()
+    semaphore = _perplexity_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _perplexity_semaphores[loop] = asyncio.Semaphore(PERPLEXITY_MAX_CONCURRENCY)
+
+    async def post_with_retries(client, payload):
+        """POST a query and return the parsed response body."""
+        for attempt in range(PERPLEXITY_MAX_RETRIES + 1):
+            try:
+                response = await client.post(PERPLEXITY_API_URL, headers=headers, json=payload, timeout=PERPLEXITY_TIMEOUT)
+            except httpx.TransportError as e:
+                if attempt == PERPLEXITY_MAX_RETRIES:
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning("Perplexity connection error: %s. Retrying in %.1fs", e, delay)
+            else:
+                if response.status_code != 429 and response.status_code < 500 or attempt == PERPLEXITY_MAX_RETRIES:
+                    response.raise_for_status()  # Raise exception for bad status codes
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        # A truncated or malformed body is retried like a connection error
+                        if attempt == PERPLEXITY_MAX_RETRIES:
+                            raise
+                        delay = 2 ** attempt + random.random()
+                        logger.warning("Perplexity returned an unreadable response: %s. Retrying in %.1fs", e, delay)
+                else:
+                    delay = get_retry_after(response, default=2 ** attempt + random.random())
+                    logger.warning("Perplexity returned %s. Retrying in %.1fs", response.status_code, delay)
+            await asyncio.sleep(delay)
+
+    async def process_single_query(client, query):
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Search the web and provide factual information with sources."
+                },
+                {
+                    "role": "user",
+                    "content": query
+                }
+            ]
+        }
+
+        try:
+            async with semaphore:
+                data = await post_with_retries(client, payload)
+            content = data["choices"][0]["message"]["content"]
+            citations = data.get("citations") or ["https://perplexity.ai"]
+        except Exception as e:
+            logger.warning("Error processing Perplexity query %r: %s", query, e)
+            return {
+                "query": query,
+                "follow_up_questions": None,
+                "answer": None,
+                "images": [],
+                "results": [],
+                "error": str(e)
+            }
+
+        # Create results list for this query
+        results = []
+        
+        # First citation gets the full content
+        results.append({
+            "title": "Perplexity Search, Source 1",
+            "url": citations[0],
+            "content": content,
+            "raw_content": content,
+            "score": 1.0  # Adding score to match Tavily format
+        })
+        
+        # Add additional citations without duplicating content
+        for i, citation in enumerate(citations[1:], start=2):
+            results.append({
+                "title": f"Perplexity Search, Source {i}",
+                "url": citation,
+                "content": "See primary source for full content",
+                "raw_content": None,
+                "score": 0.5  # Lower score for secondary sources
+            })
+        
+        # Format response to match Tavily structure
+        return {
+            "query": query,
+            "follow_up_questions": None,
+            "answer": None,
+            "images": [],
+            "results": results
+        }
+
+    client = get_http_client()
+    search_docs = await asyncio.gather(*(process_single_query(client, query) for query in search_queries))
+
+    return list(search_docs)
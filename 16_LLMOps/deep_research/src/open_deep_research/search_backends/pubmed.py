@@ -0,0 +1,219 @@
+"""PubMed search through the NCBI E-utilities."""
+
+import asyncio
+import logging
+import re
+from typing import Dict
+
+import xmltodict
+from langsmith import traceable
+
+from open_deep_research.utils import AsyncRateLimiter, get_http_client, get_retry_after
+
+logger = logging.getLogger(__name__)
+
+# NCBI E-utilities allow 3 requests/second without an API key and 10 with one
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+PUBMED_EFETCH_BATCH_SIZE = 200
+_pubmed_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+
+def get_pubmed_rate_limiter(api_key: str | None = None) -> AsyncRateLimiter:
+    """Return the process-wide E-utilities rate limiter for an API key (or for keyless access)."""
+    key = api_key or ""
+    if key not in _pubmed_rate_limiters:
+        _pubmed_rate_limiters[key] = AsyncRateLimiter(rate=10.0 if api_key else 3.0)
+    return _pubmed_rate_limiters[key]
+
+def _xml_text(value) -> str:
+    """Flatten an xmltodict value (str, dict with '#text', or list of those) into plain text."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return str(value.get("#text", ""))
+    if isinstance(value, list):
+        return " ".join(_xml_text(item) for item in value)
+    return str(value)
+
+# Inline formatting NCBI allows in titles and abstracts; xmltodict would split the text around it
+PUBMED_INLINE_TAGS = re.compile(r"</?(?:i|b|u|sup|sub|mml:[a-z]+)(?:\s[^>]*)?/?>")
+
+def _parse_pubmed_xml(text: str) -> dict:
+    """Parse an efetch response into an xmltodict tree, dropping inline formatting tags but keeping their text."""
+    return xmltodict.parse(PUBMED_INLINE_TAGS.sub("", text))
+
+def _parse_pubmed_article(article: dict, doc_content_chars_max: int) -> dict:
+    """Extract uid, title, publication date, copyright and abstract from an efetch PubmedArticle or PubmedBookArticle."""
+    if "MedlineCitation" in article:
+        uid = _xml_text(article["MedlineCitation"].get("PMID"))
+        ar = article["MedlineCitation"].get("Article", {})
+    else:
+        uid = _xml_text(article.get("BookDocument", {}).get("PMID"))
+        ar = article.get("BookDocument", {})
+
+    abstract = ar.get("Abstract") or {}
+    abstract_text = abstract.get("AbstractText", [])
+    if not isinstance(abstract_text, list):
+        abstract_text = [abstract_text]
+
+    # Structured abstracts come as labelled parts
+    parts = []
+    for part in abstract_text:
+        if isinstance(part, dict) and "@Label" in part and "#text" in part:
+            parts.append(f"{part['@Label']}: {part['#text']}")
+        elif part:
+            parts.append(_xml_text(part))
+    summary = "\n".join(parts) if parts else "No abstract available"
+
+    article_date = ar.get("ArticleDate") or {}
+    if isinstance(article_date, list):
+        article_date = article_date[0] if article_date else {}
+    published = "-".join([article_date.get("Year", ""), article_date.get("Month", ""), article_date.get("Day", "")])
+
+    return {
+        "uid": uid,
+        "Title": _xml_text(ar.get("ArticleTitle") or ar.get("BookTitle")),
+        "Published": published if published.strip("-") else "",
+        "Copyright Information": _xml_text(abstract.get("CopyrightInformation")),
+        "Summary": summary[:doc_content_chars_max],
+    }
+
+
+@traceable
+async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_key=None, doc_content_chars_max=4000):
+    """Perform concurrent searches on PubMed using the NCBI E-utilities API.
+
+    All queries share one HTTP client and a token-bucket rate limiter set to NCBI's limits
+    (3 requests/second without an API key, 10 with one). The esearch calls for all queries run
+    concurrently within that budget, and the article IDs they return are fetched together in
+    batched efetch calls.
+
+    Args:
+        search_queries (List[str]): List of search queries
+        top_k_results (int, optional): Maximum number of documents to return per query. Default is 5.
+        email (str, optional): Email address for PubMed API. Required by NCBI.
+        api_key (str, optional): API key for PubMed API for higher rate limits.
+        doc_content_chars_max (int, optional): Maximum characters for document content. Default is 4000.
+
+    Returns:
+        List[dict]: List of search responses from PubMed, one per query. Each response has format:
+            {
+                'query': str,                    # The original search query
+                'follow_up_questions': None,      
+                'answer': None,
+                'images': [],
+                'results': [                     # List of search results
+                    {
+                        'title': str,            # Title of the paper
+                        'url': str,              # URL to the paper on PubMed
+                        'content': str,          # Formatted summary with metadata
+                        'score': float,          # Relevance score (approximated)
+                        'raw_content': str       # Full abstract content
+                    },
+                    ...
+                ]
+            }
+    """
+    rate_limiter = get_pubmed_rate_limiter(api_key)
+    base_params = {"db": "pubmed", "email": email if email else "your_email@example.com"}
+    if api_key:
+        base_params["api_key"] = api_key
+
+    client = get_http_client()
+
+    async def eutils_get(endpoint, params, max_retries=3):
+        for attempt in range(max_retries + 1):
+            await rate_limiter.acquire()
+            response = await client.get(EUTILS_BASE_URL + endpoint, params={**base_params, **params})
+            if (response.status_code == 429 or response.status_code >= 500) and attempt < max_retries:
+                # Back off every caller sharing the limiter, not just this one
+                delay = get_retry_after(response, default=0.5 * 2 ** attempt)
+                logger.warning("PubMed %s returned %s. Retrying in %.1fs", endpoint, response.status_code, delay)
+                rate_limiter.pause(delay)
+                continue
+            response.raise_for_status()
+            return response
+
+    async def search_ids(query):
+        response = await eutils_get("esearch.fcgi", {"term": query, "retmode": "json", "retmax": top_k_results})
+        return response.json()["esearchresult"].get("idlist", [])
+
+    # Run all esearch calls concurrently; the rate limiter spaces them out
+    id_lists = await asyncio.gather(*(search_ids(query) for query in search_queries), return_exceptions=True)
+
+    # Fetch the articles for every query in as few efetch calls as possible
+    unique_ids = list(dict.fromkeys(uid for ids in id_lists if not isinstance(ids, BaseException) for uid in ids))
+    articles = {}
+    fetch_error = None
+    try:
+        batches = [unique_ids[i:i + PUBMED_EFETCH_BATCH_SIZE] for i in range(0, len(unique_ids), PUBMED_EFETCH_BATCH_SIZE)]
+        responses = await asyncio.gather(*(eutils_get("efetch.fcgi", {"id": ",".join(batch), "retmode": "xml"}) for batch in batches))
+        for response in responses:
+            article_set = _parse_pubmed_xml(response.text).get("PubmedArticleSet") or {}
+            for tag in ("PubmedArticle", "PubmedBookArticle"):
+                entries = article_set.get(tag) or []
+                for entry in entries if isinstance(entries, list) else [entries]:
+                    doc = _parse_pubmed_article(entry, doc_content_chars_max)
+                    articles[doc["uid"]] = doc
+    except Exception as e:
+        fetch_error = e
+        logger.warning("Error fetching PubMed articles: %s", e)
+
+    search_docs = []
+    for query, ids in zip(search_queries, id_lists):
+        error = ids if isinstance(ids, BaseException) else fetch_error
+        if error is not None:
+            logger.warning("Error processing PubMed query %r: %s", query, error)
+            search_docs.append({
+                'query': query,
+                'follow_up_questions': None,
+                'answer': None,
+                'images': [],
+                'results': [],
+                'error': str(error)
+            })
+            continue
+
+        docs = [articles[uid] for uid in ids if uid in articles]
+        logger.info("PubMed query %r returned %d results", query, len(docs))
+
+        results = []
+        # Assign decreasing scores based on the order
+        base_score = 1.0
+        score_decrement = 1.0 / (len(docs) + 1) if docs else 0
+
+        for i, doc in enumerate(docs):
+            # Format content with metadata
+            content_parts = []
+
+            if doc.get('Published'):
+                content_parts.append(f"Published: {doc['Published']}")
+
+            if doc.get('Copyright Information'):
+                content_parts.append(f"Copyright Information: {doc['Copyright Information']}")
+
+            if doc.get('Summary'):
+                content_parts.append(f"Summary: {doc['Summary']}")
+
+            # Generate PubMed URL from the article UID
+            uid = doc.get('uid', '')
+            url = f"https://pubmed.ncbi.nlm.nih.gov/{uid}/" if uid else ""
+
+            results.append({
+                'title': doc.get('Title', ''),
+                'url': url,
+                'content': "\n".join(content_parts),
+                'score': base_score - (i * score_decrement),
+                'raw_content': doc.get('Summary', '')
+            })
+
+        search_docs.append({
+            'query': query,
+            'follow_up_questions': None,
+            'answer': None,
+            'images': [],
+            'results': results
+        })
+
+    return search_docs
@@ -0,0 +1,102 @@
+"""Tavily web search."""
+
+import asyncio
+import inspect
+from typing import List, Literal, Tuple
+
+from langchain_core.tools import tool
+from langsmith import traceable
+from tavily import AsyncTavilyClient
+
+from open_deep_research.utils import (
+    cached_search,
+    deduplicate_sources,
+    format_unique_results,
+    get_http_client,
+    get_pooled_client,
+    search_sources,
+)
+
+
+def get_tavily_client() -> AsyncTavilyClient:
+    """Return the running loop's AsyncTavilyClient, sending its requests over a pooled httpx client where supported."""
+
+    def create():
+        # Only some tavily-python versions accept an httpx client; the others pool their own connections
+        if "client" in inspect.signature(AsyncTavilyClient.__init__).parameters:
+            return AsyncTavilyClient(client=get_http_client("tavily-http"))
+        return AsyncTavilyClient()
+
+    return get_pooled_client("tavily", create)
+
+
+@traceable
+async def tavily_search_async(search_queries, max_results: int = 5, topic: Literal["general", "news", "finance"] = "general", include_raw_content: bool = True):
+    """Perform concurrent web searches with the Tavily API.
+
+    Args:
+        search_queries (List[str]): List of search queries to process
+        max_results (int): Maximum number of results to return
+        topic (Literal["general", "news", "finance"]): Topic to filter results by
+        include_raw_content (bool): Whether to include raw content in the results
+
+    Returns:
+            List[dict]: List of search responses from Tavily API:
+                {
+                    'query': str,
+                    'follow_up_questions': None,      
+                    'answer': None,
+                    'images': list,
+                    'results': [                     # List of search results
+                        {
+                            'title': str,            # Title of the webpage
+                            'url': str,              # URL of the result
+                            'content': str,          # Summary/snippet of content
+                            'score': float,          # Relevance score
+                            'raw_content': str|None  # Full page content if available
+                        },
+                        ...
+                    ]
+                }
+    """
+    tavily_async_client = get_tavily_client()
+    search_tasks = []
+    for query in search_queries:
+            search_tasks.append(
+                tavily_async_client.search(
+                    query,
+                    max_results=max_results,
+                    include_raw_content=include_raw_content,
+                    topic=topic
+                )
+            )
+
+    # Execute all searches concurrently
+    search_docs = await asyncio.gather(*search_tasks)
+    return search_docs
+
+
+@tool(response_format="content_and_artifact")
+async def tavily_search(queries: List[str], max_results: int = 5, topic: Literal["general", "news", "finance"] = "general") -> Tuple[str, List[dict]]:
+    """Fetch results from Tavily search API.
+    
+    Args:
+        queries (List[str]): List of search queries
+        max_results (int): Maximum number of results to return
+        topic (Literal["general", "news", "finance"]): Topic to filter results by
+        
+    Returns:
+        Tuple[str, List[dict]]: A formatted string of search results, and the results as sources (see search_sources)
+    """
+    # Use tavily_search_async with include_raw_content=True to get content directly
+    search_results = await cached_search(
+        "tavily",
+        tavily_search_async,
+        queries,
+        max_results=5,
+        topic="general",
+        include_raw_content=True
+    )
+
+    unique_results = deduplicate_sources([result for response in search_results for result in response['results']])
+    return format_unique_results(unique_results), search_sources(unique_results)
@@ -15,6 +15,10 @@ class Section(BaseModel):
     content: str = Field(
         description="The content of the section."
     )   
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="For sections without research, the names of the research sections this section draws on. Empty means all of them.",
+    )
 
 class Sections(BaseModel):
     sections: List[Section] = Field(
@@ -0,0 +1,193 @@
+"""Typed event stream of the report as it is written.
+
+Consume it with stream_report(graph, input, config), or graph.astream(..., stream_mode="custom",
+subgraphs=True) and keep the chunks that have an "event" key. Events arrive in plan order:
+
+- {"event": "section_started", "section": name, "index": i}
+- {"event": "token", "section": name, "index": i, "text": text}
+- {"event": "section_completed", "section": name, "index": i, "content": content}
+
+A section starts once every section before it has completed, so concatenating the section_completed
+contents yields the report as it grows. Tokens of a section written while an earlier one is still in
+progress are buffered and emitted when the section starts; if it has finished by then, its
+section_completed event carries the whole content instead. Only a section's final write streams tokens
+as they are generated; a draft that may still be rewritten after grading is sent as one token event
+once it passes.
+
+Custom stream events require Python 3.11+ in async nodes; on older versions the stream is silent.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    TypedDict,
+)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Command
+
+from open_deep_research.state import Section
+
+# Report streams of in-progress runs, keyed by thread_id (bounded in case runs never finish)
+MAX_REPORT_STREAMS = 64
+
+class ReportEvent(TypedDict, total=False):
+    """An event of the report stream; see the module docstring for the fields each event has."""
+
+    event: Literal["section_started", "token", "section_completed"]
+    section: str
+    index: int
+    text: str
+    content: str
+
+def _stream_writer() -> Callable[[Any], None]:
+    """Return the running node's custom stream writer, or a no-op outside a graph run."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except (ImportError, RuntimeError):
+        return lambda chunk: None
+
+class ReportStream:
+    """Orders section events of one run by the report plan.
+
+    Args:
+        section_names (list[str]): Section names in plan order
+    """
+
+    def __init__(self, section_names: List[str]):
+        """Create the stream with no section started yet."""
+        self.section_names = list(section_names)
+        self._index = {name: i for i, name in enumerate(self.section_names)}
+        self._completed: Dict[int, str] = {}
+        self._buffered: Dict[int, List[str]] = {}
+        self._next = 0  # The section currently streaming
+        self._lock = threading.Lock()
+
+    def _event(self, event: str, index: int, **fields) -> ReportEvent:
+        return {"event": event, "section": self.section_names[index], "index": index, **fields}
+
+    def _start_next(self) -> List[ReportEvent]:
+        """Events starting the section at self._next, with the tokens it buffered so far."""
+        if self._next >= len(self.section_names):
+            return []
+        events = [self._event("section_started", self._next)]
+        buffered = self._buffered.pop(self._next, None)
+        if buffered:
+            events.append(self._event("token", self._next, text="".join(buffered)))
+        return events
+
+    def start(self):
+        """Emit section_started for the first section."""
+        with self._lock:
+            events = self._start_next()
+        self._emit(events)
+
+    def token(self, section_name: str, text: str):
+        """Stream text of a section's final write, or buffer it until the section starts."""
+        index = self._index.get(section_name)
+        if index is None or not text:
+            return
+        with self._lock:
+            if index in self._completed:
+                return
+            if index != self._next:
+                self._buffered.setdefault(index, []).append(text)
+                return
+        self._emit([self._event("token", index, text=text)])
+
+    def complete(self, section_name: str, content: str):
+        """Mark a section as completed, emitting it and any later completed sections that were waiting on it."""
+        index = self._index.get(section_name)
+        if index is None:
+            return
+        events = []
+        with self._lock:
+            if index in self._completed:
+                return
+            self._completed[index] = content
+            self._buffered.pop(index, None)
+            while self._next in self._completed:
+                events.append(self._event("section_completed", self._next, content=self._completed[self._next]))
+                self._next += 1
+                events.extend(self._start_next())
+        self._emit(events)
+
+    @staticmethod
+    def _emit(events: List[ReportEvent]):
+        if events:
+            writer = _stream_writer()
+            for event in events:
+                writer(event)
+
+_report_streams: OrderedDict = OrderedDict()
+_report_streams_lock = threading.Lock()
+
+def _thread_id(config: RunnableConfig | None) -> str | None:
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    return None if thread_id is None else str(thread_id)
+
+def start_report_stream(config: RunnableConfig | None, sections: List[Section]) -> ReportStream | None:
+    """Create the run's ReportStream for an approved plan and start its first section."""
+    run_id = _thread_id(config)
+    if run_id is None:
+        return None
+    stream = ReportStream([section.name for section in sections])
+    with _report_streams_lock:
+        _report_streams[run_id] = stream
+        _report_streams.move_to_end(run_id)
+        while len(_report_streams) > MAX_REPORT_STREAMS:
+            _report_streams.popitem(last=False)
+    stream.start()
+    return stream
+
+def get_report_stream(config: RunnableConfig | None) -> ReportStream | None:
+    """Return the run's ReportStream, if its plan has been approved."""
+    with _report_streams_lock:
+        return _report_streams.get(_thread_id(config))
+
+def release_report_stream(config: RunnableConfig | None):
+    """Drop a finished run's ReportStream."""
+    with _report_streams_lock:
+        _report_streams.pop(_thread_id(config), None)
+
+def reports_completed_sections(fn: Callable) -> Callable:
+    """Pass the completed_sections a node returns (as a dict or a Command update) to the run's ReportStream.
+
+    The decorator sits outside memoized_node, so sections replayed from a checkpoint are reported too.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(state, config: RunnableConfig):
+        output = await fn(state, config)
+        stream = get_report_stream(config)
+        if stream is not None:
+            update = output.update if isinstance(output, Command) else output
+            if isinstance(update, dict):
+                for section in update.get("completed_sections", []):
+                    stream.complete(section.name, section.content)
+        return output
+
+    return wrapper
+
+async def stream_report(graph, graph_input: Any, config: RunnableConfig) -> AsyncIterator[ReportEvent]:
+    """Run the report graph and yield its report events.
+
+    Args:
+        graph: The compiled report graph
+        graph_input: The graph input, e.g. {"topic": ...} or Command(resume=True) after plan review
+        config: The run's config, including its thread_id
+
+    Yields:
+        ReportEvent: section_started, token and section_completed events in plan order
+    """
+    async for _, chunk in graph.astream(graph_input, config, stream_mode="custom", subgraphs=True):
+        if isinstance(chunk, dict) and "event" in chunk:
+            yield chunk
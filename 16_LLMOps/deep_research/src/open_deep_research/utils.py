@@ -1,33 +1,46 @@
 import os
 import asyncio
-import requests
-import random 
 import concurrent
-import aiohttp
+import concurrent.futures.process
+import multiprocessing
 import httpx
+import re
+import math
 import time
-from typing import List, Optional, Dict, Any, Union, Literal
-from urllib.parse import unquote
-
-from exa_py import Exa
-from linkup import LinkupClient
-from tavily import AsyncTavilyClient
-from azure.core.credentials import AzureKeyCredential
-from azure.search.documents.aio import SearchClient as AsyncAzureAISearchClient
-import asyncio
-import os
-from duckduckgo_search import DDGS 
-from bs4 import BeautifulSoup
-from markdownify import markdownify
+import logging
+import copy
+import json
+import hashlib
+import functools
+import heapq
+import inspect
+import sqlite3
+import zlib
+import threading
+import weakref
+import contextlib
+import importlib
+import importlib.util
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple, Literal, Callable
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import numpy as np
+import tiktoken
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config
+from langchain_core.tools import BaseTool, StructuredTool
 
-from langchain_community.retrievers import ArxivRetriever
-from langchain_community.utilities.pubmed import PubMedAPIWrapper
-from langchain_core.tools import tool
+from open_deep_research.state import Section
+from open_deep_research.html_extraction import extract_main_content
+from open_deep_research.metrics import llm_metrics_handler, record_cache_event, record_llm_queue, record_search
 
-from langsmith import traceable
+logger = logging.getLogger(__name__)
 
-from open_deep_research.state import Section
-    
 def get_config_value(value):
     """
     Helper function to handle string, dict, and enum cases of configuration values
@@ -50,19 +63,9 @@ def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any
     Returns:
         Dict[str, Any]: A dictionary of parameters to pass to the search function.
     """
-    # Define accepted parameters for each search API
-    SEARCH_API_PARAMS = {
-        "exa": ["max_characters", "num_results", "include_domains", "exclude_domains", "subpages"],
-        "tavily": ["max_results", "topic"],
-        "perplexity": [],  # Perplexity accepts no additional parameters
-        "arxiv": ["load_max_docs", "get_full_documents", "load_all_available_meta"],
-        "pubmed": ["top_k_results", "email", "api_key", "doc_content_chars_max"],
-        "linkup": ["depth"],
-        "googlesearch": ["max_results"],
-    }
-
     # Get the list of accepted parameters for the given search API
-    accepted_params = SEARCH_API_PARAMS.get(search_api, [])
+    backend = SEARCH_BACKENDS.get(search_api)
+    accepted_params = backend.params if backend else ()
 
     # If no config provided, return an empty dict
     if not search_api_config:
@@ -71,10 +74,235 @@ def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any
     # Filter the config to only include accepted parameters
     return {k: v for k, v in search_api_config.items() if k in accepted_params}
 
-def deduplicate_and_format_sources(search_response, max_tokens_per_source=5000, include_raw_content=True):
+# Budget for the sources section of a prompt; the writer and planner prompts add a few thousand tokens on top
+SOURCES_MAX_TOTAL_TOKENS = 16000
+SOURCE_PASSAGE_WORDS = 120
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the their this to was were what "
+    "when where which who why will with about into than then there these those does do did can".split()
+)
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding():
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file is downloaded on first use and may be unavailable offline
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken's cl100k_base encoding, or estimate 4 characters per token if it cannot be loaded."""
+    encoding = _token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def _terms(text: str) -> List[str]:
+    return [term for term in re.findall(r"\w+", text.lower()) if len(term) > 2 and term not in STOPWORDS]
+
+def _split_passages(text: str, max_words: int = SOURCE_PASSAGE_WORDS) -> List[str]:
+    """Split text into paragraphs, breaking long paragraphs into windows of at most max_words words."""
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        for start in range(0, len(words), max_words):
+            passages.append(" ".join(words[start:start + max_words]))
+    return [passage for passage in passages if passage]
+
+def select_passages(text: str, query_terms: set, max_tokens: int) -> tuple[str, bool]:
     """
-    Takes a list of search responses and formats them into a readable string.
-    Limits the raw_content to approximately max_tokens_per_source tokens.
+    Keep the passages of text most relevant to the query terms, up to max_tokens.
+
+    Passages are scored by query-term frequency weighted by how rare each term is across the
+    document's passages, with a small bonus for appearing early. The chosen passages are returned in
+    their original order, with gaps marked by "[...]".
+
+    Returns:
+        tuple: (selected text, whether anything was left out)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text, False
+
+    passages = _split_passages(text)
+    passage_terms = [_terms(passage) for passage in passages]
+    document_frequency = {}
+    for terms in passage_terms:
+        for term in set(terms) & query_terms:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    def score(index):
+        terms = passage_terms[index]
+        if not terms:
+            return 0.0
+        relevance = sum(
+            (1 + math.log(len(passages) / document_frequency[term])) * count / (count + 1.0)
+            for term, count in ((term, terms.count(term)) for term in set(terms) & query_terms)
+        )
+        return relevance + 0.5 / (1 + index)
+
+    chosen, used = [], 0
+    for index in sorted(range(len(passages)), key=score, reverse=True):
+        tokens = count_tokens(passages[index])
+        if used + tokens > max_tokens:
+            if not chosen and max_tokens > 0:
+                # Nothing fits yet: keep the start of the best passage
+                words = passages[index].split()
+                chosen.append((index, " ".join(words[:max(1, max_tokens * 3 // 4)])))
+            break
+        chosen.append((index, passages[index]))
+        used += tokens
+
+    parts, previous = [], -1
+    for index, passage in sorted(chosen):
+        if index != previous + 1:
+            parts.append("[...]")
+        parts.append(passage)
+        previous = index
+    if previous != len(passages) - 1:
+        parts.append("[...]")
+    return "\n\n".join(parts), True
+
+def rank_sources(sources: List[dict], queries: List[str]) -> List[dict]:
+    """
+    Order sources by search score and query coverage, most relevant first.
+
+    Query coverage is the average, over the queries, of the fraction of each query's terms that
+    appear in the source's title, snippet and content. Scores are divided by the highest score
+    because each search API uses its own scale; sources without a score count as 0.5.
+    """
+    query_term_sets = [set(_terms(query)) for query in queries if _terms(query)]
+    scores = [source.get('score') for source in sources]
+    known = [score for score in scores if isinstance(score, (int, float))]
+    high = max(known) if known else 0.0
+
+    def relevance(item):
+        source, score = item
+        normalized = 0.5 if not isinstance(score, (int, float)) else max(0.0, score / high) if high > 0 else 1.0
+        if not query_term_sets:
+            return normalized
+        text_terms = set(_terms(f"{source.get('title') or ''} {source.get('content') or ''} {source.get('raw_content') or ''}"))
+        coverage = sum(len(terms & text_terms) / len(terms) for terms in query_term_sets) / len(query_term_sets)
+        return 0.5 * normalized + 0.5 * coverage
+
+    return [source for source, _ in sorted(zip(sources, scores), key=relevance, reverse=True)]
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({"gclid", "fbclid", "msclkid", "yclid", "dclid", "igshid", "mc_cid", "mc_eid",
+                             "ref_src", "ref_url", "_ga", "_gl", "spm", "cmpid", "s_cid", "trk"})
+# Texts sharing 64-bit SimHash fingerprints within this Hamming distance count as near-duplicates
+SIMHASH_MAX_DISTANCE = 6
+SIMHASH_MIN_WORDS = 50
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so variants of the same page compare equal.
+
+    Lowercases the host, ignores the scheme, "www." and default ports, drops the fragment,
+    tracking parameters (utm_*, gclid, fbclid, ...) and trailing slashes, and sorts the
+    remaining query parameters.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = f":{parts.port}" if parts.port and parts.port not in (80, 443) else ""
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{host}{port}{path}{query}"
+
+def simhash_fingerprints(texts: List[str], shingle_size: int = 3) -> np.ndarray:
+    """
+    Compute a 64-bit SimHash fingerprint for each text from its word shingles.
+
+    Each distinct word across all texts is hashed once; shingle hashes and fingerprints are then
+    computed with numpy.
+    """
+    documents = [re.findall(r"\w+", text.lower()) for text in texts]
+    # Stable word hashes (Python's hash() is salted per process)
+    vocabulary = {word: i for i, word in enumerate(dict.fromkeys(word for words in documents for word in words))}
+    word_hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little") for word in vocabulary],
+        dtype=np.uint64,
+    )
+
+    fingerprints = np.zeros(len(texts), dtype=np.uint64)
+    bit_positions = np.arange(64, dtype=np.uint64)
+    for i, words in enumerate(documents):
+        if not words:
+            continue
+        hashes = word_hashes[np.fromiter((vocabulary[word] for word in words), dtype=np.int64, count=len(words))]
+        if len(hashes) >= shingle_size:
+            # Rotate-and-xor each word hash by its position in the shingle
+            shingles = hashes[:len(hashes) - shingle_size + 1].copy()
+            for offset in range(1, shingle_size):
+                shifted = hashes[offset:len(hashes) - shingle_size + 1 + offset]
+                shingles ^= (shifted << np.uint64(offset * 7)) | (shifted >> np.uint64(64 - offset * 7))
+            hashes = shingles
+        bits = ((hashes[:, None] >> bit_positions) & np.uint64(1)).astype(np.int32)
+        votes = (2 * bits - 1).sum(axis=0)
+        fingerprints[i] = np.sum(np.uint64(1) << bit_positions[votes > 0], dtype=np.uint64)
+    return fingerprints
+
+def hamming_distances(fingerprints: np.ndarray) -> np.ndarray:
+    """Pairwise Hamming distances between 64-bit fingerprints."""
+    xor = fingerprints[:, None] ^ fingerprints[None, :]
+    return np.unpackbits(xor.view(np.uint8).reshape(len(fingerprints), len(fingerprints), 8), axis=-1).sum(axis=-1)
+
+def deduplicate_sources(sources: List[dict], max_distance: int = SIMHASH_MAX_DISTANCE) -> List[dict]:
+    """
+    Drop duplicate sources by canonical URL and by near-duplicate content.
+
+    Of each group of duplicates the source with the highest score (then the longest content) is kept.
+    Content near-duplicates (mirrors, syndicated copies) are detected with SimHash over raw_content,
+    falling back to content; texts shorter than SIMHASH_MIN_WORDS words are only deduplicated by URL.
+    """
+    def quality(source):
+        score = source.get('score')
+        text = source.get('raw_content') or source.get('content') or ''
+        return (score if isinstance(score, (int, float)) else 0.0, len(text))
+
+    # Exact duplicates by canonical URL
+    best = {}
+    for source in sources:
+        key = canonicalize_url(source.get('url') or '')
+        if key not in best or quality(source) > quality(best[key]):
+            best[key] = source
+    unique = list(best.values())
+
+    # Near-duplicates by content
+    texts = [source.get('raw_content') or source.get('content') or '' for source in unique]
+    eligible = [i for i, text in enumerate(texts) if len(text.split()) >= SIMHASH_MIN_WORDS]
+    if len(eligible) < 2:
+        return unique
+    distances = hamming_distances(simhash_fingerprints([texts[i] for i in eligible]))
+
+    dropped = set()
+    for a in range(len(eligible)):
+        for b in np.nonzero(distances[a, a + 1:] <= max_distance)[0] + a + 1:
+            i, j = eligible[a], eligible[b]
+            if i in dropped or j in dropped:
+                continue
+            dropped.add(j if quality(unique[i]) >= quality(unique[j]) else i)
+    if dropped:
+        logger.debug("Dropped %d near-duplicate sources", len(dropped))
+    return [source for i, source in enumerate(unique) if i not in dropped]
+
+def deduplicate_and_format_sources(search_response, max_tokens_per_source=5000, include_raw_content=True,
+                                   max_total_tokens: Optional[int] = None):
+    """
+    Takes a list of search responses and formats them into a readable string, most relevant sources first.
+
+    Sources are deduplicated by canonical URL and near-duplicate content, and ranked by search score and query coverage. Each source's raw
+    content is reduced to its passages most relevant to the queries, within max_tokens_per_source
+    tokens. When max_total_tokens is set, sources are packed in rank order until the budget is used
+    up and the rest are left out.
  
     Args:
         search_responses: List of search response dicts, each containing:
@@ -87,40 +315,66 @@ def deduplicate_and_format_sources(search_response, max_tokens_per_source=5000,
                 - raw_content: str|None
         max_tokens_per_source: int
         include_raw_content: bool
+        max_total_tokens: Optional[int], token budget for the whole formatted string
             
     Returns:
         str: Formatted string with deduplicated sources
     """
      # Collect all results
     sources_list = []
+    queries = []
     for response in search_response:
         sources_list.extend(response['results'])
+        if response.get('query'):
+            queries.append(response['query'])
     
-    # Deduplicate by URL
-    unique_sources = {source['url']: source for source in sources_list}
+    # Deduplicate by canonical URL and near-duplicate content
+    unique_sources = deduplicate_sources(sources_list)
+    ranked_sources = rank_sources(unique_sources, queries)
+    query_terms = {term for query in queries for term in _terms(query)}
 
     # Format output
-    formatted_text = "Content from sources:\n"
-    for i, source in enumerate(unique_sources.values(), 1):
-        formatted_text += f"{'='*80}\n"  # Clear section separator
-        formatted_text += f"Source: {source['title']}\n"
-        formatted_text += f"{'-'*80}\n"  # Subsection separator
-        formatted_text += f"URL: {source['url']}\n===\n"
-        formatted_text += f"Most relevant content from source: {source['content']}\n===\n"
+    parts = ["Content from sources:\n"]
+    footer = f"{'='*80}\n\n"  # End section separator
+    # Leave room for the note about left-out sources
+    remaining = max_total_tokens - count_tokens(parts[0]) - 20 if max_total_tokens is not None else None
+    omitted = 0
+    for source in ranked_sources:
+        header = (
+            f"{'='*80}\n"  # Clear section separator
+            f"Source: {source['title']}\n"
+            f"{'-'*80}\n"  # Subsection separator
+            f"URL: {source['url']}\n===\n"
+            f"Most relevant content from source: {source['content']}\n===\n"
+        )
+        cost = count_tokens(header) + count_tokens(footer)
+        if remaining is not None and cost > remaining:
+            omitted += 1
+            continue
+        if remaining is not None:
+            remaining -= cost
+        parts.append(header)
+
         if include_raw_content:
-            # Using rough estimate of 4 characters per token
-            char_limit = max_tokens_per_source * 4
             # Handle None raw_content
             raw_content = source.get('raw_content', '')
             if raw_content is None:
                 raw_content = ''
                 print(f"Warning: No raw_content found for source {source['url']}")
-            if len(raw_content) > char_limit:
-                raw_content = raw_content[:char_limit] + "... [truncated]"
-            formatted_text += f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
-        formatted_text += f"{'='*80}\n\n" # End section separator
+            label = f"Full source content limited to {max_tokens_per_source} tokens: "
+            budget = max_tokens_per_source if remaining is None else min(max_tokens_per_source, remaining - count_tokens(label) - 10)
+            if budget > 0:
+                raw_content, _ = select_passages(raw_content, query_terms, budget)
+                section = f"{label}{raw_content}\n\n"
+                parts.append(section)
+                if remaining is not None:
+                    remaining -= count_tokens(section)
+        parts.append(footer)
+
+    if omitted:
+        parts.append(f"[{omitted} lower-ranked sources left out to fit the {max_total_tokens}-token budget]\n")
                 
-    return formatted_text.strip()
+    return "".join(parts).strip()
 
 def format_sections(sections: list[Section]) -> str:
     """ Format a list of sections into a string """
@@ -141,1229 +395,797 @@ Content:
 """
     return formatted_str
 
-@traceable
-async def tavily_search_async(search_queries, max_results: int = 5, topic: Literal["general", "news", "finance"] = "general", include_raw_content: bool = True):
-    """
-    Performs concurrent web searches with the Tavily API
+# Pooled HTTP clients shared by every search backend
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+HTTP_MAX_CONNECTIONS_PER_HOST = 6
+HTTP_DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # pip install "httpx[http2]" to enable HTTP/2
+
+async def _close_client(client):
+    """Close an httpx or SDK client, whether its close method is sync or async."""
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        print(f"Warning: Failed to close {type(client).__name__}: {str(e)}")
 
-    Args:
-        search_queries (List[str]): List of search queries to process
-        max_results (int): Maximum number of results to return
-        topic (Literal["general", "news", "finance"]): Topic to filter results by
-        include_raw_content (bool): Whether to include raw content in the results
+class HTTPClientRegistry:
+    """
+    Process-wide registry of pooled HTTP and search SDK clients.
 
-    Returns:
-            List[dict]: List of search responses from Tavily API:
-                {
-                    'query': str,
-                    'follow_up_questions': None,      
-                    'answer': None,
-                    'images': list,
-                    'results': [                     # List of search results
-                        {
-                            'title': str,            # Title of the webpage
-                            'url': str,              # URL of the result
-                            'content': str,          # Summary/snippet of content
-                            'score': float,          # Relevance score
-                            'raw_content': str|None  # Full page content if available
-                        },
-                        ...
-                    ]
-                }
-    """
-    tavily_async_client = AsyncTavilyClient()
-    search_tasks = []
-    for query in search_queries:
-            search_tasks.append(
-                tavily_async_client.search(
-                    query,
-                    max_results=max_results,
-                    include_raw_content=include_raw_content,
-                    topic=topic
-                )
-            )
+    httpx clients (and the async SDK clients built on them) are bound to the event loop that first uses
+    them, so the registry keeps one set of clients per loop. Connections are kept alive between searches,
+    sections and runs instead of paying a TCP/TLS handshake per call. Close a loop's clients with
+    aclose() (aclose_http_clients() for the default registry) before the loop shuts down.
+    """
 
-    # Execute all searches concurrently
-    search_docs = await asyncio.gather(*search_tasks)
-    return search_docs
+    def __init__(self, limits: httpx.Limits = HTTP_POOL_LIMITS, max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST):
+        self.limits = limits
+        self.max_connections_per_host = max_connections_per_host
+        self._loops = weakref.WeakKeyDictionary()  # event loop -> {"clients", "host_semaphores"}
+
+    def _state(self) -> dict:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = {"clients": {}, "host_semaphores": {}}
+        return state
+
+    def get(self, name: str, factory: Callable):
+        """Return the client registered under name for the running loop, creating it with factory if needed."""
+        clients = self._state()["clients"]
+        client = clients.get(name)
+        if client is None or getattr(client, "is_closed", False):
+            client = clients[name] = factory()
+        return client
+
+    def http_client(self, name: str = "default") -> httpx.AsyncClient:
+        """Return a pooled httpx.AsyncClient (HTTP/2 when h2 is installed) that follows redirects."""
+        return self.get(name, lambda: httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=self.limits,
+            timeout=HTTP_DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        ))
+
+    def host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Return the semaphore capping concurrent requests to the host of url."""
+        semaphores = self._state()["host_semaphores"]
+        host = httpx.URL(url).host
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return semaphores[host]
+
+    async def aclose(self):
+        """Close every client of the running loop. Later calls to get() create fresh ones."""
+        state = self._state()
+        clients, state["clients"] = state["clients"], {}
+        await asyncio.gather(*(_close_client(client) for client in clients.values()))
+
+_http_clients = HTTPClientRegistry()
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """Return the pooled httpx.AsyncClient registered under name for the running event loop."""
+    return _http_clients.http_client(name)
+
+def get_host_semaphore(url: str) -> asyncio.Semaphore:
+    """Return the per-host concurrency limit for url (HTTP_MAX_CONNECTIONS_PER_HOST requests at a time)."""
+    return _http_clients.host_semaphore(url)
+
+def get_pooled_client(name: str, factory: Callable):
+    """Return the SDK client registered under name for the running event loop, creating it with factory if needed."""
+    return _http_clients.get(name, factory)
+
+def _run_id(config: Optional[Dict[str, Any]]) -> Optional[str]:
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    return None if thread_id is None else str(thread_id)
+
+async def aclose_http_clients():
+    """
+    Close every pooled client of the running event loop.
 
-@traceable
-async def azureaisearch_search_async(search_queries: list[str], max_results: int = 5, topic: str = "general", include_raw_content: bool = True) -> list[dict]:
+    Call this on application shutdown, before the event loop closes; clients left open are only dropped
+    with their loop, without closing their connections.
+    """
+    await _http_clients.aclose()
+
+# LLM call scheduling. Every chat model call waits for its provider's request, token and concurrency
+# budgets. Lower priority values are served first.
+LLM_PRIORITY_CRITICAL = 0  # Calls everything else waits on: report planning, the supervisor, final sections
+LLM_PRIORITY_HIGH = 1  # Writing and grading sections already in progress
+LLM_PRIORITY_NORMAL = 2  # Query generation
+LLM_PRIORITY_LOW = 3  # Speculative work whose result may be discarded
+LLM_DEFAULT_MAX_CONCURRENCY = 8  # Concurrent calls per provider when llm_rate_limits sets no max_concurrency
+LLM_BURST_SECONDS = 10.0  # Request and token budgets allow bursts of this many seconds' worth
+LLM_OUTPUT_TOKEN_ESTIMATE = 1024  # Output tokens reserved per call, reconciled with actual usage afterwards
+LLM_MAX_RETRIES = 3
+LLM_RETRY_BACKOFF = 5.0  # Seconds to pause a provider after a rate limit error without Retry-After
+MAX_LLM_GOVERNORS = 64
+
+class LLMGovernor:
     """
-    Performs concurrent web searches using the Azure AI Search API.
+    Priority scheduler for one provider's LLM calls.
 
-    Args:
-        search_queries (List[str]): list of search queries to process
-        max_results (int): maximum number of results to return for each query
-        topic (str): semantic topic filter for the search.
-        include_raw_content (bool)
+    Calls wait in a priority queue (FIFO within a priority) until the provider's requests-per-minute and
+    tokens-per-minute budgets and its concurrency limit allow them, so throughput stays at the configured
+    limits instead of overshooting into 429s. Budgets refill continuously, like AsyncRateLimiter. A rate
+    limit error pauses the whole provider for its Retry-After, not just the call that hit it.
 
-    Returns:
-        List[dict]: list of search responses from Azure AI Search API, one per query.
-    """
-    # configure and create the Azure Search client
-    # ensure all environment variables are set
-    if not all(var in os.environ for var in ["AZURE_AI_SEARCH_ENDPOINT", "AZURE_AI_SEARCH_INDEX_NAME", "AZURE_AI_SEARCH_API_KEY"]):
-        raise ValueError("Missing required environment variables for Azure Search API which are: AZURE_AI_SEARCH_ENDPOINT, AZURE_AI_SEARCH_INDEX_NAME, AZURE_AI_SEARCH_API_KEY")
-    endpoint = os.getenv("AZURE_AI_SEARCH_ENDPOINT")
-    index_name = os.getenv("AZURE_AI_SEARCH_INDEX_NAME")
-    credential = AzureKeyCredential(os.getenv("AZURE_AI_SEARCH_API_KEY"))
-
-    reranker_key = '@search.reranker_score'
-
-    async with AsyncAzureAISearchClient(endpoint, index_name, credential) as client:
-        async def do_search(query: str) -> dict:
-            # search query 
-            paged = await client.search(
-                search_text=query,
-                vector_queries=[{
-                    "fields": "vector",
-                    "kind": "text",
-                    "text": query,
-                    "exhaustive": True
-                }],
-                semantic_configuration_name="fraunhofer-rag-semantic-config",
-                query_type="semantic",
-                select=["url", "title", "chunk", "creationTime", "lastModifiedTime"],
-                top=max_results,
-            )
-            # async iterator to get all results
-            items = [doc async for doc in paged]
-            # Umwandlung in einfaches Dict-Format
-            results = [
-                {
-                    "title": doc.get("title"),
-                    "url": doc.get("url"),
-                    "content": doc.get("chunk"),
-                    "score": doc.get(reranker_key),
-                    "raw_content": doc.get("chunk") if include_raw_content else None
-                }
-                for doc in items
-            ]
-            return {"query": query, "results": results}
-
-        # parallelize the search queries
-        tasks = [do_search(q) for q in search_queries]
-        return await asyncio.gather(*tasks)
-
-
-@traceable
-def perplexity_search(search_queries):
-    """Search the web using the Perplexity API.
-    
     Args:
-        search_queries (List[SearchQuery]): List of search queries to process
-  
-    Returns:
-        List[dict]: List of search responses from Perplexity API, one per query. Each response has format:
-            {
-                'query': str,                    # The original search query
-                'follow_up_questions': None,      
-                'answer': None,
-                'images': list,
-                'results': [                     # List of search results
-                    {
-                        'title': str,            # Title of the search result
-                        'url': str,              # URL of the result
-                        'content': str,          # Summary/snippet of content
-                        'score': float,          # Relevance score
-                        'raw_content': str|None  # Full content or None for secondary citations
-                    },
-                    ...
-                ]
-            }
-    """
-
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {os.getenv('PERPLEXITY_API_KEY')}"
-    }
-    
-    search_docs = []
-    for query in search_queries:
-
-        payload = {
-            "model": "sonar-pro",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Search the web and provide factual information with sources."
-                },
-                {
-                    "role": "user",
-                    "content": query
-                }
-            ]
-        }
-        
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Parse the response
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        citations = data.get("citations", ["https://perplexity.ai"])
-        
-        # Create results list for this query
-        results = []
-        
-        # First citation gets the full content
-        results.append({
-            "title": f"Perplexity Search, Source 1",
-            "url": citations[0],
-            "content": content,
-            "raw_content": content,
-            "score": 1.0  # Adding score to match Tavily format
-        })
-        
-        # Add additional citations without duplicating content
-        for i, citation in enumerate(citations[1:], start=2):
-            results.append({
-                "title": f"Perplexity Search, Source {i}",
-                "url": citation,
-                "content": "See primary source for full content",
-                "raw_content": None,
-                "score": 0.5  # Lower score for secondary sources
-            })
-        
-        # Format response to match Tavily structure
-        search_docs.append({
-            "query": query,
-            "follow_up_questions": None,
-            "answer": None,
-            "images": [],
-            "results": results
-        })
-    
-    return search_docs
-
-@traceable
-async def exa_search(search_queries, max_characters: Optional[int] = None, num_results=5, 
-                     include_domains: Optional[List[str]] = None, 
-                     exclude_domains: Optional[List[str]] = None,
-                     subpages: Optional[int] = None):
-    """Search the web using the Exa API.
-    
-    Args:
-        search_queries (List[SearchQuery]): List of search queries to process
-        max_characters (int, optional): Maximum number of characters to retrieve for each result's raw content.
-                                       If None, the text parameter will be set to True instead of an object.
-        num_results (int): Number of search results per query. Defaults to 5.
-        include_domains (List[str], optional): List of domains to include in search results. 
-            When specified, only results from these domains will be returned.
-        exclude_domains (List[str], optional): List of domains to exclude from search results.
-            Cannot be used together with include_domains.
-        subpages (int, optional): Number of subpages to retrieve per result. If None, subpages are not retrieved.
-        
-    Returns:
-        List[dict]: List of search responses from Exa API, one per query. Each response has format:
-            {
-                'query': str,                    # The original search query
-                'follow_up_questions': None,      
-                'answer': None,
-                'images': list,
-                'results': [                     # List of search results
-                    {
-                        'title': str,            # Title of the search result
-                        'url': str,              # URL of the result
-                        'content': str,          # Summary/snippet of content
-                        'score': float,          # Relevance score
-                        'raw_content': str|None  # Full content or None for secondary citations
-                    },
-                    ...
-                ]
-            }
-    """
-    # Check that include_domains and exclude_domains are not both specified
-    if include_domains and exclude_domains:
-        raise ValueError("Cannot specify both include_domains and exclude_domains")
-    
-    # Initialize Exa client (API key should be configured in your .env file)
-    exa = Exa(api_key = f"{os.getenv('EXA_API_KEY')}")
-    
-    # Define the function to process a single query
-    async def process_query(query):
-        # Use run_in_executor to make the synchronous exa call in a non-blocking way
-        loop = asyncio.get_event_loop()
-        
-        # Define the function for the executor with all parameters
-        def exa_search_fn():
-            # Build parameters dictionary
-            kwargs = {
-                # Set text to True if max_characters is None, otherwise use an object with max_characters
-                "text": True if max_characters is None else {"max_characters": max_characters},
-                "summary": True,  # This is an amazing feature by EXA. It provides an AI generated summary of the content based on the query
-                "num_results": num_results
-            }
-            
-            # Add optional parameters only if they are provided
-            if subpages is not None:
-                kwargs["subpages"] = subpages
-                
-            if include_domains:
-                kwargs["include_domains"] = include_domains
-            elif exclude_domains:
-                kwargs["exclude_domains"] = exclude_domains
-                
-            return exa.search_and_contents(query, **kwargs)
-        
-        response = await loop.run_in_executor(None, exa_search_fn)
-        
-        # Format the response to match the expected output structure
-        formatted_results = []
-        seen_urls = set()  # Track URLs to avoid duplicates
-        
-        # Helper function to safely get value regardless of if item is dict or object
-        def get_value(item, key, default=None):
-            if isinstance(item, dict):
-                return item.get(key, default)
-            else:
-                return getattr(item, key, default) if hasattr(item, key) else default
-        
-        # Access the results from the SearchResponse object
-        results_list = get_value(response, 'results', [])
-        
-        # First process all main results
-        for result in results_list:
-            # Get the score with a default of 0.0 if it's None or not present
-            score = get_value(result, 'score', 0.0)
-            
-            # Combine summary and text for content if both are available
-            text_content = get_value(result, 'text', '')
-            summary_content = get_value(result, 'summary', '')
-            
-            content = text_content
-            if summary_content:
-                if content:
-                    content = f"{summary_content}\n\n{content}"
-                else:
-                    content = summary_content
-            
-            title = get_value(result, 'title', '')
-            url = get_value(result, 'url', '')
-            
-            # Skip if we've seen this URL before (removes duplicate entries)
-            if url in seen_urls:
+        requests_per_minute (float, optional): Request budget; None means unlimited
+        tokens_per_minute (float, optional): Input plus output token budget; None means unlimited
+        max_concurrency (int, optional): Calls in flight at once
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_concurrency: Optional[int] = LLM_DEFAULT_MAX_CONCURRENCY):
+        self.requests = (AsyncRateLimiter(rate=requests_per_minute / 60, capacity=max(1.0, requests_per_minute / 60 * LLM_BURST_SECONDS))
+                         if requests_per_minute else None)
+        self.tokens = (AsyncRateLimiter(rate=tokens_per_minute / 60, capacity=tokens_per_minute / 60 * LLM_BURST_SECONDS)
+                       if tokens_per_minute else None)
+        self.max_concurrency = max_concurrency or None
+        self.running = 0
+        self._waiters = []  # heap of (priority, sequence, tokens, future)
+        self._sequence = 0
+        self._timer = None
+        self._paused_until = 0.0
+
+    def _cost(self, tokens: float) -> float:
+        # A call larger than the whole burst budget would never fit, so it waits for a full bucket instead
+        return min(tokens, self.tokens.capacity) if self.tokens else 0.0
+
+    def _dispatch(self):
+        """Start queued calls in priority order while the budgets allow, then wake up when they next will."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            priority, sequence, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
                 continue
-                
-            seen_urls.add(url)
-            
-            # Main result entry
-            result_entry = {
-                "title": title,
-                "url": url,
-                "content": content,
-                "score": score,
-                "raw_content": text_content
-            }
-            
-            # Add the main result to the formatted results
-            formatted_results.append(result_entry)
-        
-        # Now process subpages only if the subpages parameter was provided
-        if subpages is not None:
-            for result in results_list:
-                subpages_list = get_value(result, 'subpages', [])
-                for subpage in subpages_list:
-                    # Get subpage score
-                    subpage_score = get_value(subpage, 'score', 0.0)
-                    
-                    # Combine summary and text for subpage content
-                    subpage_text = get_value(subpage, 'text', '')
-                    subpage_summary = get_value(subpage, 'summary', '')
-                    
-                    subpage_content = subpage_text
-                    if subpage_summary:
-                        if subpage_content:
-                            subpage_content = f"{subpage_summary}\n\n{subpage_content}"
-                        else:
-                            subpage_content = subpage_summary
-                    
-                    subpage_url = get_value(subpage, 'url', '')
-                    
-                    # Skip if we've seen this URL before
-                    if subpage_url in seen_urls:
-                        continue
-                        
-                    seen_urls.add(subpage_url)
-                    
-                    formatted_results.append({
-                        "title": get_value(subpage, 'title', ''),
-                        "url": subpage_url,
-                        "content": subpage_content,
-                        "score": subpage_score,
-                        "raw_content": subpage_text
-                    })
-        
-        # Collect images if available (only from main results to avoid duplication)
-        images = []
-        for result in results_list:
-            image = get_value(result, 'image')
-            if image and image not in images:  # Avoid duplicate images
-                images.append(image)
-                
-        return {
-            "query": query,
-            "follow_up_questions": None,
-            "answer": None,
-            "images": images,
-            "results": formatted_results
-        }
-    
-    # Process all queries sequentially with delay to respect rate limit
-    search_docs = []
-    for i, query in enumerate(search_queries):
+            if self.max_concurrency and self.running >= self.max_concurrency:
+                return  # release() dispatches again
+            wait = max(self._paused_until - time.monotonic(),
+                       self.requests.wait_time(1) if self.requests else 0.0,
+                       self.tokens.wait_time(self._cost(tokens)) if self.tokens else 0.0)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            if self.requests:
+                self.requests.reserve(1)
+            if self.tokens:
+                self.tokens.reserve(self._cost(tokens))
+            self.running += 1
+            future.set_result(None)
+
+    async def acquire(self, tokens: float, priority: int = LLM_PRIORITY_NORMAL):
+        """Wait until a call expected to use `tokens` tokens may start."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, self._sequence, tokens, future))
+        self._sequence += 1
+        self._dispatch()
         try:
-            # Add delay between requests (0.25s = 4 requests per second, well within the 5/s limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(0.25)
-            
-            result = await process_query(query)
-            search_docs.append(result)
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing query '{query}': {str(e)}")
-            # Add a placeholder result for failed queries to maintain index alignment
-            search_docs.append({
-                "query": query,
-                "follow_up_questions": None,
-                "answer": None,
-                "images": [],
-                "results": [],
-                "error": str(e)
-            })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e):
-                print("Rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(1.0)  # Add a longer delay if we hit a rate limit
-    
-    return search_docs
-
-@traceable
-async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents=True, load_all_available_meta=True):
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the caller was cancelled
+            if future.done() and not future.cancelled():
+                self.release(tokens)
+            raise
+
+    def release(self, tokens: float, actual_tokens: Optional[float] = None):
+        """Mark a call as finished, charging or refunding the difference between its estimated and actual tokens."""
+        self.running -= 1
+        if self.tokens and actual_tokens is not None:
+            self.tokens.reserve(actual_tokens - self._cost(tokens))
+        self._dispatch()
+
+    def pause(self, seconds: float):
+        """Hold back every queued call for at least `seconds`, e.g. after a 429 with Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # Empty the budgets too, so calls resume at the budgeted rate rather than in a burst; they refill
+        # during the pause, so the pause itself is not waited out twice
+        for limiter in (self.requests, self.tokens):
+            if limiter:
+                limiter.drain()
+        self._dispatch()
+
+_llm_governors = weakref.WeakKeyDictionary()  # event loop -> OrderedDict of (run id, provider) -> LLMGovernor
+
+def infer_model_provider(model: str, model_provider: Optional[str] = None) -> str:
+    """Provider of a chat model, from model_provider, a "provider:model" name, or the model name itself."""
+    if model_provider:
+        return model_provider
+    if ":" in model:
+        return model.split(":", 1)[0]
+    if model.startswith("claude"):
+        return "anthropic"
+    if model.startswith(("gpt-", "o1", "o3", "o4", "chatgpt")):
+        return "openai"
+    return "default"
+
+def get_llm_governor(provider: str, config: Optional[Dict[str, Any]] = None) -> LLMGovernor:
     """
-    Performs concurrent searches on arXiv using the ArxivRetriever.
+    Return the LLMGovernor scheduling a provider's calls for the current run.
+
+    With llm_governor_scope "run" (the default), each run (thread_id) gets its own budgets; with
+    "process", all runs in the process share them. Budgets come from the llm_rate_limits configuration
+    when the governor is created.
 
     Args:
-        search_queries (List[str]): List of search queries or article IDs
-        load_max_docs (int, optional): Maximum number of documents to return per query. Default is 5.
-        get_full_documents (bool, optional): Whether to fetch full text of documents. Default is True.
-        load_all_available_meta (bool, optional): Whether to load all available metadata. Default is True.
+        provider: The model provider
+        config: The run's config; defaults to the config of the runnable being executed
 
     Returns:
-        List[dict]: List of search responses from arXiv, one per query. Each response has format:
-            {
-                'query': str,                    # The original search query
-                'follow_up_questions': None,      
-                'answer': None,
-                'images': [],
-                'results': [                     # List of search results
-                    {
-                        'title': str,            # Title of the paper
-                        'url': str,              # URL (Entry ID) of the paper
-                        'content': str,          # Formatted summary with metadata
-                        'score': float,          # Relevance score (approximated)
-                        'raw_content': str|None  # Full paper content if available
-                    },
-                    ...
-                ]
-            }
+        LLMGovernor: The provider's governor
     """
-    
-    async def process_single_query(query):
-        try:
-            # Create retriever for each query
-            retriever = ArxivRetriever(
-                load_max_docs=load_max_docs,
-                get_full_documents=get_full_documents,
-                load_all_available_meta=load_all_available_meta
-            )
-            
-            # Run the synchronous retriever in a thread pool
-            loop = asyncio.get_event_loop()
-            docs = await loop.run_in_executor(None, lambda: retriever.invoke(query))
-            
-            results = []
-            # Assign decreasing scores based on the order
-            base_score = 1.0
-            score_decrement = 1.0 / (len(docs) + 1) if docs else 0
-            
-            for i, doc in enumerate(docs):
-                # Extract metadata
-                metadata = doc.metadata
-                
-                # Use entry_id as the URL (this is the actual arxiv link)
-                url = metadata.get('entry_id', '')
-                
-                # Format content with all useful metadata
-                content_parts = []
+    from open_deep_research.configuration import Configuration
+
+    config = config if config is not None else ensure_config()
+    configurable = Configuration.from_runnable_config(config)
+    run_id = _run_id(config) if configurable.llm_governor_scope == "run" else None
+
+    governors = _llm_governors.setdefault(asyncio.get_running_loop(), OrderedDict())
+    key = (run_id, provider)
+    governor = governors.get(key)
+    if governor is None:
+        limits = (configurable.llm_rate_limits or {}).get(provider, {})
+        governor = governors[key] = LLMGovernor(
+            requests_per_minute=limits.get("requests_per_minute"),
+            tokens_per_minute=limits.get("tokens_per_minute"),
+            max_concurrency=limits.get("max_concurrency", LLM_DEFAULT_MAX_CONCURRENCY),
+        )
+        while len(governors) > MAX_LLM_GOVERNORS:
+            governors.popitem(last=False)
+    else:
+        governors.move_to_end(key)
+    return governor
+
+def release_llm_governors(config: Optional[Dict[str, Any]]):
+    """Drop the run-scoped governors of a finished run."""
+    run_id = _run_id(config)
+    if run_id is None:
+        return
+    for governors in list(_llm_governors.values()):
+        for key in [key for key in governors if key[0] == run_id]:
+            del governors[key]
+
+def _rate_limit_retry_after(error: Exception, default: float) -> Optional[float]:
+    """Retry-After of a provider rate limit (429) or overload (529) error, or None for any other error."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status not in (429, 529):
+        return None
+    return get_retry_after(response, default) if response is not None else default
+
+def _estimate_input_tokens(model_input) -> int:
+    if isinstance(model_input, str):
+        return count_tokens(model_input)
+    if isinstance(model_input, list):
+        return sum(count_tokens(str(message.get("content", "") if isinstance(message, dict) else getattr(message, "content", message)))
+                   for message in model_input)
+    return count_tokens(str(model_input))
+
+def _usage_tokens(message) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return None
+    return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+class GovernedChatModel(Runnable):
+    """
+    A chat model (or its structured-output / tool-calling wrapper) whose calls go through the provider's
+    LLMGovernor, retrying rate limit errors after pausing the provider.
 
-                # Primary information
-                if 'Summary' in metadata:
-                    content_parts.append(f"Summary: {metadata['Summary']}")
+    It is a Runnable, so with_config, bind, abatch and `|` compositions still call through ainvoke and
+    astream and stay governed. The governor belongs to an event loop, so the synchronous invoke (and with
+    it batch and stream) calls the wrapped runnable directly, only retrying rate limit errors after
+    sleeping for their Retry-After.
 
-                if 'Authors' in metadata:
-                    content_parts.append(f"Authors: {metadata['Authors']}")
+    Args:
+        runnable: The model or wrapper to call
+        provider (str): The model provider, which picks the governor
+        priority (int): Scheduling priority of the calls, e.g. LLM_PRIORITY_CRITICAL
+    """
 
-                # Add publication information
-                published = metadata.get('Published')
-                published_str = published.isoformat() if hasattr(published, 'isoformat') else str(published) if published else ''
-                if published_str:
-                    content_parts.append(f"Published: {published_str}")
+    def __init__(self, runnable: Runnable, provider: str, priority: int = LLM_PRIORITY_NORMAL):
+        self.runnable = runnable
+        self.provider = provider
+        self.priority = priority
 
-                # Add additional metadata if available
-                if 'primary_category' in metadata:
-                    content_parts.append(f"Primary Category: {metadata['primary_category']}")
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
 
-                if 'categories' in metadata and metadata['categories']:
-                    content_parts.append(f"Categories: {', '.join(metadata['categories'])}")
+    @property
+    def InputType(self):  # noqa: N802
+        return self.runnable.InputType
 
-                if 'comment' in metadata and metadata['comment']:
-                    content_parts.append(f"Comment: {metadata['comment']}")
+    @property
+    def OutputType(self):  # noqa: N802
+        return self.runnable.OutputType
 
-                if 'journal_ref' in metadata and metadata['journal_ref']:
-                    content_parts.append(f"Journal Reference: {metadata['journal_ref']}")
+    def get_input_schema(self, config: Optional[RunnableConfig] = None):
+        return self.runnable.get_input_schema(config)
 
-                if 'doi' in metadata and metadata['doi']:
-                    content_parts.append(f"DOI: {metadata['doi']}")
+    def get_output_schema(self, config: Optional[RunnableConfig] = None):
+        return self.runnable.get_output_schema(config)
 
-                # Get PDF link if available in the links
-                pdf_link = ""
-                if 'links' in metadata and metadata['links']:
-                    for link in metadata['links']:
-                        if 'pdf' in link:
-                            pdf_link = link
-                            content_parts.append(f"PDF: {pdf_link}")
-                            break
+    def invoke(self, model_input, config: Optional[RunnableConfig] = None, **kwargs):
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                return self.runnable.invoke(model_input, config, **kwargs)
+            except Exception as e:
+                retry_after = _rate_limit_retry_after(e, LLM_RETRY_BACKOFF * 2 ** attempt)
+                if retry_after is None or attempt == LLM_MAX_RETRIES:
+                    raise
+                logger.warning("%s rate limit hit, retrying in %.1fs", self.provider, retry_after)
+                time.sleep(retry_after)
+
+    async def _acquire(self, tokens: int) -> LLMGovernor:
+        governor = get_llm_governor(self.provider)
+        queued_at = time.perf_counter()
+        await governor.acquire(tokens, self.priority)
+        record_llm_queue(self.provider, self.priority, time.perf_counter() - queued_at)
+        return governor
+
+    def _should_retry(self, governor: LLMGovernor, error: Exception, attempt: int) -> bool:
+        retry_after = _rate_limit_retry_after(error, LLM_RETRY_BACKOFF * 2 ** attempt)
+        if retry_after is None or attempt == LLM_MAX_RETRIES:
+            return False
+        logger.warning("%s rate limit hit, pausing its calls for %.1fs before retrying", self.provider, retry_after)
+        governor.pause(retry_after)
+        return True
+
+    async def ainvoke(self, model_input, config: Optional[RunnableConfig] = None, **kwargs):
+        tokens = _estimate_input_tokens(model_input) + LLM_OUTPUT_TOKEN_ESTIMATE
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            governor = await self._acquire(tokens)
+            result = None
+            try:
+                result = await self.runnable.ainvoke(model_input, config, **kwargs)
+                return result
+            except Exception as e:
+                if not self._should_retry(governor, e, attempt):
+                    raise
+            finally:
+                governor.release(tokens, _usage_tokens(result))
+
+    async def astream(self, model_input, config: Optional[RunnableConfig] = None, **kwargs):
+        tokens = _estimate_input_tokens(model_input) + LLM_OUTPUT_TOKEN_ESTIMATE
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            governor = await self._acquire(tokens)
+            streamed = False
+            actual_tokens = None
+            try:
+                async for chunk in self.runnable.astream(model_input, config, **kwargs):
+                    streamed = True
+                    actual_tokens = _usage_tokens(chunk) or actual_tokens
+                    yield chunk
+                return
+            except Exception as e:
+                # Only retry if nothing was streamed yet
+                if streamed or not self._should_retry(governor, e, attempt):
+                    raise
+            finally:
+                governor.release(tokens, actual_tokens)
+
+# Configured chat models, reused across nodes, sections and search iterations
+MAX_CHAT_MODELS = 32
+_chat_models = weakref.WeakKeyDictionary()  # event loop -> OrderedDict of chat models and their wrappers
+_sync_chat_models = OrderedDict()  # chat models created outside an event loop
+
+def _freeze(value: Optional[Dict[str, Any]]) -> str:
+    """Stable, hashable form of a kwargs dict for use in a cache key."""
+    return json.dumps(value or {}, sort_keys=True, default=repr)
+
+def _cached_chat_model(key: tuple, factory: Callable):
+    """
+    Return the chat model (or wrapper) cached under key for the running loop, creating it with factory if needed.
 
-                # Join all content parts with newlines 
-                content = "\n".join(content_parts)
-                
-                result = {
-                    'title': metadata.get('Title', ''),
-                    'url': url,  # Using entry_id as the URL
-                    'content': content,
-                    'score': base_score - (i * score_decrement),
-                    'raw_content': doc.page_content if get_full_documents else None
-                }
-                results.append(result)
-                
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': results
-            }
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing arXiv query '{query}': {str(e)}")
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            }
-    
-    # Process queries sequentially with delay to respect arXiv rate limit (1 request per 3 seconds)
-    search_docs = []
-    for i, query in enumerate(search_queries):
-        try:
-            # Add delay between requests (3 seconds per ArXiv's rate limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(3.0)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing arXiv query '{query}': {str(e)}")
-            search_docs.append({
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                print("ArXiv rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(5.0)  # Add a longer delay if we hit a rate limit
-    
-    return search_docs
+    Like the pooled HTTP clients, a chat model's async client keeps connections that belong to the event
+    loop that opened them, so models are cached per loop. The least recently used entries are dropped
+    once a loop holds more than MAX_CHAT_MODELS.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        cache = _sync_chat_models
+    else:
+        cache = _chat_models.get(loop)
+        if cache is None:
+            cache = _chat_models[loop] = OrderedDict()
+
+    chat_model = cache.get(key)
+    if chat_model is None:
+        chat_model = cache[key] = factory()
+        if len(cache) > MAX_CHAT_MODELS:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return chat_model
 
-@traceable
-async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_key=None, doc_content_chars_max=4000):
+def _init_chat_model(model: str, model_provider: Optional[str], model_kwargs: Optional[Dict[str, Any]],
+                     kwargs: Dict[str, Any]) -> BaseChatModel:
+    """Return the cached, ungoverned chat model for a configuration."""
+    key = ("model", model, model_provider, _freeze(model_kwargs), _freeze(kwargs))
+
+    def create():
+        # Record latency and token usage of every call
+        init_kwargs = {"callbacks": [llm_metrics_handler], **kwargs}
+        if model_kwargs:
+            init_kwargs["model_kwargs"] = model_kwargs
+        return init_chat_model(model=model, model_provider=model_provider, **init_kwargs)
+
+    return _cached_chat_model(key, create)
+
+def get_chat_model(model: str, model_provider: Optional[str] = None, model_kwargs: Optional[Dict[str, Any]] = None,
+                   priority: int = LLM_PRIORITY_NORMAL, **kwargs) -> GovernedChatModel:
     """
-    Performs concurrent searches on PubMed using the PubMedAPIWrapper.
+    Return a configured chat model, reusing the instance and its connection pool instead of calling
+    init_chat_model on every node invocation. Its calls are scheduled by the provider's LLMGovernor.
 
     Args:
-        search_queries (List[str]): List of search queries
-        top_k_results (int, optional): Maximum number of documents to return per query. Default is 5.
-        email (str, optional): Email address for PubMed API. Required by NCBI.
-        api_key (str, optional): API key for PubMed API for higher rate limits.
-        doc_content_chars_max (int, optional): Maximum characters for document content. Default is 4000.
+        model (str): The model name
+        model_provider (str, optional): The model provider; inferred from the model name when omitted
+        model_kwargs (dict, optional): Passed through to init_chat_model as model_kwargs
+        priority (int, optional): Scheduling priority of the model's calls
+        **kwargs: Other init_chat_model arguments, e.g. max_tokens and thinking
 
     Returns:
-        List[dict]: List of search responses from PubMed, one per query. Each response has format:
-            {
-                'query': str,                    # The original search query
-                'follow_up_questions': None,      
-                'answer': None,
-                'images': [],
-                'results': [                     # List of search results
-                    {
-                        'title': str,            # Title of the paper
-                        'url': str,              # URL to the paper on PubMed
-                        'content': str,          # Formatted summary with metadata
-                        'score': float,          # Relevance score (approximated)
-                        'raw_content': str       # Full abstract content
-                    },
-                    ...
-                ]
-            }
+        GovernedChatModel: The cached chat model
     """
-    
-    async def process_single_query(query):
-        try:
-            # print(f"Processing PubMed query: '{query}'")
-            
-            # Create PubMed wrapper for the query
-            wrapper = PubMedAPIWrapper(
-                top_k_results=top_k_results,
-                doc_content_chars_max=doc_content_chars_max,
-                email=email if email else "your_email@example.com",
-                api_key=api_key if api_key else ""
-            )
-            
-            # Run the synchronous wrapper in a thread pool
-            loop = asyncio.get_event_loop()
-            
-            # Use wrapper.lazy_load instead of load to get better visibility
-            docs = await loop.run_in_executor(None, lambda: list(wrapper.lazy_load(query)))
-            
-            print(f"Query '{query}' returned {len(docs)} results")
-            
-            results = []
-            # Assign decreasing scores based on the order
-            base_score = 1.0
-            score_decrement = 1.0 / (len(docs) + 1) if docs else 0
-            
-            for i, doc in enumerate(docs):
-                # Format content with metadata
-                content_parts = []
-                
-                if doc.get('Published'):
-                    content_parts.append(f"Published: {doc['Published']}")
-                
-                if doc.get('Copyright Information'):
-                    content_parts.append(f"Copyright Information: {doc['Copyright Information']}")
-                
-                if doc.get('Summary'):
-                    content_parts.append(f"Summary: {doc['Summary']}")
-                
-                # Generate PubMed URL from the article UID
-                uid = doc.get('uid', '')
-                url = f"https://pubmed.ncbi.nlm.nih.gov/{uid}/" if uid else ""
-                
-                # Join all content parts with newlines
-                content = "\n".join(content_parts)
-                
-                result = {
-                    'title': doc.get('Title', ''),
-                    'url': url,
-                    'content': content,
-                    'score': base_score - (i * score_decrement),
-                    'raw_content': doc.get('Summary', '')
-                }
-                results.append(result)
-            
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': results
-            }
-        except Exception as e:
-            # Handle exceptions with more detailed information
-            error_msg = f"Error processing PubMed query '{query}': {str(e)}"
-            print(error_msg)
-            import traceback
-            print(traceback.format_exc())  # Print full traceback for debugging
-            
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            }
-    
-    # Process all queries with a reasonable delay between them
-    search_docs = []
-    
-    # Start with a small delay that increases if we encounter rate limiting
-    delay = 1.0  # Start with a more conservative delay
-    
-    for i, query in enumerate(search_queries):
-        try:
-            # Add delay between requests
-            if i > 0:  # Don't delay the first request
-                # print(f"Waiting {delay} seconds before next query...")
-                await asyncio.sleep(delay)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-            
-            # If query was successful with results, we can slightly reduce delay (but not below minimum)
-            if result.get('results') and len(result['results']) > 0:
-                delay = max(0.5, delay * 0.9)  # Don't go below 0.5 seconds
-            
-        except Exception as e:
-            # Handle exceptions gracefully
-            error_msg = f"Error in main loop processing PubMed query '{query}': {str(e)}"
-            print(error_msg)
-            
-            search_docs.append({
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            })
-            
-            # If we hit an exception, increase delay for next query
-            delay = min(5.0, delay * 1.5)  # Don't exceed 5 seconds
-    
-    return search_docs
+    key = ("governed", priority, model, model_provider, _freeze(model_kwargs), _freeze(kwargs))
+    return _cached_chat_model(key, lambda: GovernedChatModel(
+        _init_chat_model(model, model_provider, model_kwargs, kwargs),
+        infer_model_provider(model, model_provider), priority))
+
+def get_structured_chat_model(model: str, schema: type, model_provider: Optional[str] = None,
+                              model_kwargs: Optional[Dict[str, Any]] = None, priority: int = LLM_PRIORITY_NORMAL,
+                              **kwargs) -> GovernedChatModel:
+    """
+    Return the chat model's with_structured_output(schema) wrapper, cached so it is only built once.
 
-@traceable
-async def linkup_search(search_queries, depth: Optional[str] = "standard"):
+    Args:
+        model (str): The model name
+        schema (type): The Pydantic model the output is parsed into
+        model_provider (str, optional): The model provider
+        model_kwargs (dict, optional): Passed through to init_chat_model as model_kwargs
+        priority (int, optional): Scheduling priority of the model's calls
+        **kwargs: Other init_chat_model arguments, e.g. max_tokens and thinking
+
+    Returns:
+        GovernedChatModel: The cached structured-output model
     """
-    Performs concurrent web searches using the Linkup API.
+    key = ("structured", schema, priority, model, model_provider, _freeze(model_kwargs), _freeze(kwargs))
+    return _cached_chat_model(key, lambda: GovernedChatModel(
+        _init_chat_model(model, model_provider, model_kwargs, kwargs).with_structured_output(schema),
+        infer_model_provider(model, model_provider), priority))
+
+def get_tool_calling_model(model: str, tools: List[Any], model_provider: Optional[str] = None,
+                           model_kwargs: Optional[Dict[str, Any]] = None, bind_kwargs: Optional[Dict[str, Any]] = None,
+                           priority: int = LLM_PRIORITY_NORMAL, **kwargs) -> GovernedChatModel:
+    """
+    Return the chat model's bind_tools(tools, **bind_kwargs) wrapper, cached by tool name so the tool schemas
+    are only converted once.
 
     Args:
-        search_queries (List[SearchQuery]): List of search queries to process
-        depth (str, optional): "standard" (default)  or "deep". More details here https://docs.linkup.so/pages/documentation/get-started/concepts
+        model (str): The model name
+        tools (list): The tools to bind; tools with the same names are assumed to have the same schemas
+        model_provider (str, optional): The model provider
+        model_kwargs (dict, optional): Passed through to init_chat_model as model_kwargs
+        bind_kwargs (dict, optional): Passed through to bind_tools, e.g. parallel_tool_calls
+        priority (int, optional): Scheduling priority of the model's calls
+        **kwargs: Other init_chat_model arguments, e.g. max_tokens and thinking
 
     Returns:
-        List[dict]: List of search responses from Linkup API, one per query. Each response has format:
-            {
-                'results': [            # List of search results
-                    {
-                        'title': str,   # Title of the search result
-                        'url': str,     # URL of the result
-                        'content': str, # Summary/snippet of content
-                    },
-                    ...
-                ]
-            }
-    """
-    client = LinkupClient()
-    search_tasks = []
-    for query in search_queries:
-        search_tasks.append(
-                client.async_search(
-                    query,
-                    depth,
-                    output_type="searchResults",
-                )
-            )
+        GovernedChatModel: The cached tool-calling model
+    """
+    tool_names = tuple(getattr(t, "name", None) or getattr(t, "__name__", repr(t)) for t in tools)
+    key = ("tools", tool_names, _freeze(bind_kwargs), priority, model, model_provider, _freeze(model_kwargs), _freeze(kwargs))
+    return _cached_chat_model(key, lambda: GovernedChatModel(
+        _init_chat_model(model, model_provider, model_kwargs, kwargs).bind_tools(tools, **(bind_kwargs or {})),
+        infer_model_provider(model, model_provider), priority))
 
-    search_results = []
-    for response in await asyncio.gather(*search_tasks):
-        search_results.append(
-            {
-                "results": [
-                    {"title": result.name, "url": result.url, "content": result.content}
-                    for result in response.results
-                ],
-            }
+class AsyncRateLimiter:
+    """
+    Token-bucket rate limiter for coroutines.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers reserve a token and
+    sleep off any deficit, so waiting callers are served in arrival order. State is guarded by a
+    thread lock rather than an asyncio primitive so one limiter can be shared process-wide.
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (float, optional): Maximum burst size. Defaults to max(1, rate).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket and return how many seconds the caller must wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until the requested number of tokens will be available, without taking them."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until the requested number of tokens is available."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back all callers for at least `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def drain(self):
+        """Empty the bucket without a deficit, so callers continue at `rate` with no burst."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+def get_retry_after(response, default: float) -> float:
+    """Return the Retry-After delay of an HTTP response in seconds, or default if it has none."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return default
+
+# HTML extraction is CPU-bound, so it runs in worker processes instead of on the event loop
+HTML_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+_html_executor = None
+
+def get_html_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the process pool used to convert scraped HTML to markdown or text."""
+    global _html_executor
+    if _html_executor is None:
+        # spawn rather than fork: the parent process runs threads (executors, SDK clients)
+        _html_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=HTML_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
         )
+    return _html_executor
 
-    return search_results
+async def extract_html(html: str, output: Literal["markdown", "text"] = "markdown") -> str:
+    """
+    Extract the main content of a page off the event loop.
 
-@traceable
-async def google_search_async(search_queries: Union[str, List[str]], max_results: int = 5, include_raw_content: bool = True):
+    Runs html_extraction.extract_main_content in the process pool, falling back to a thread if the pool has broken.
     """
-    Performs concurrent web searches using Google.
-    Uses Google Custom Search API if environment variables are set, otherwise falls back to web scraping.
+    global _html_executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_html_executor(), extract_main_content, html, output)
+    except concurrent.futures.process.BrokenProcessPool:
+        print("Warning: HTML extraction process pool broke, restarting it")
+        _html_executor = None
+        return await loop.run_in_executor(None, extract_main_content, html, output)
+
+# Limits for fetching full pages in scrape_pages
+SCRAPE_MAX_CONCURRENCY = 8
+SCRAPE_PAGE_TIMEOUT = 30.0
+SCRAPE_DEADLINE = 60.0
+SCRAPE_MAX_BYTES = 2_000_000
+
+def is_text_content_type(content_type: str) -> bool:
+    """Whether a Content-Type is readable text (text/*, XML, XHTML or JSON) rather than binary content."""
+    content_type = content_type.lower()
+    return content_type.startswith("text/") or any(kind in content_type for kind in ("xml", "json"))
+
+async def fetch_page_content(client: httpx.AsyncClient, url: str, output: Literal["markdown", "text"] = "markdown",
+                             max_bytes: int = SCRAPE_MAX_BYTES, timeout: float = SCRAPE_PAGE_TIMEOUT,
+                             headers: Optional[Dict[str, str]] = None) -> tuple[str, str, bool]:
+    """
+    Fetch a page and extract its main content, going through the page cache.
 
-    Args:
-        search_queries (List[str]): List of search queries to process
-        max_results (int): Maximum number of results to return per query
-        include_raw_content (bool): Whether to fetch full page content
+    Cached pages fetched or revalidated within the cache's fresh_for window are returned without a request.
+    Older ones are revalidated with If-None-Match / If-Modified-Since, and a 304 reuses the cached content.
+    Otherwise the page is streamed, stopping once max_bytes have been read. HTML and XHTML pages are
+    extracted in the process pool, other text (plain text, JSON, XML) is returned as is, and the body of
+    binary content types is never read.
 
     Returns:
-        List[dict]: List of search responses from Google, one per query
+        tuple: (content_type, content, truncated). content is empty for binary content.
     """
+    cache = get_page_cache()
+    cached = cache.get(url, output) if cache is not None else None
+    if cached is not None and time.time() - cached["validated_at"] < cache.fresh_for:
+        cache.record("hits")
+        return cached["content_type"], cached["content"], cached["truncated"]
+
+    request_headers = dict(headers or {})
+    if cached is not None:
+        if cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    async with client.stream("GET", url, timeout=timeout, headers=request_headers) as response:
+        if response.status_code == 304 and cached is not None:
+            cache.record("revalidated")
+            cache.touch(url, output, cached)
+            return cached["content_type"], cached["content"], cached["truncated"]
+
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if not is_text_content_type(content_type):
+            return content_type, "", False
+
+        chunks = []
+        size = 0
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                truncated = True
+                break
+
+        body = b"".join(chunks)[:max_bytes]
+        text = body.decode(response.charset_encoding or "utf-8", errors="replace")
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+    is_html = any(kind in content_type.lower() for kind in ("text/html", "application/xhtml+xml"))
+    content = await extract_html(text, output) if is_html else text
+    if cache is not None:
+        cache.record("misses")
+        cache.set(url, output, {
+            "content_type": content_type,
+            "content": content,
+            "truncated": truncated,
+            "etag": etag,
+            "last_modified": last_modified,
+            "validated_at": time.time(),
+        })
+    return content_type, content, truncated
 
+async def fetch_pages(urls: List[str], max_concurrency: int = SCRAPE_MAX_CONCURRENCY, deadline: float = SCRAPE_DEADLINE,
+                      max_bytes: int = SCRAPE_MAX_BYTES, semaphore: Optional[asyncio.Semaphore] = None) -> List[str]:
+    """
+    Fetch pages concurrently and return their main content as markdown, in the order of urls.
 
-    # Check for API credentials from environment variables
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    cx = os.environ.get("GOOGLE_CX")
-    use_api = bool(api_key and cx)
-    
-    # Handle case where search_queries is a single string
-    if isinstance(search_queries, str):
-        search_queries = [search_queries]
-    
-    # Define user agent generator
-    def get_useragent():
-        """Generates a random user agent string."""
-        lynx_version = f"Lynx/{random.randint(2, 3)}.{random.randint(8, 9)}.{random.randint(0, 2)}"
-        libwww_version = f"libwww-FM/{random.randint(2, 3)}.{random.randint(13, 15)}"
-        ssl_mm_version = f"SSL-MM/{random.randint(1, 2)}.{random.randint(3, 5)}"
-        openssl_version = f"OpenSSL/{random.randint(1, 3)}.{random.randint(0, 4)}.{random.randint(0, 9)}"
-        return f"{lynx_version} {libwww_version} {ssl_mm_version} {openssl_version}"
-    
-    # Create executor for running synchronous operations
-    executor = None if use_api else concurrent.futures.ThreadPoolExecutor(max_workers=5)
-    
-    # Use a semaphore to limit concurrent requests
-    semaphore = asyncio.Semaphore(5 if use_api else 2)
-    
-    async def search_single_query(query):
-        async with semaphore:
-            try:
-                results = []
-                
-                # API-based search
-                if use_api:
-                    # The API returns up to 10 results per request
-                    for start_index in range(1, max_results + 1, 10):
-                        # Calculate how many results to request in this batch
-                        num = min(10, max_results - (start_index - 1))
-                        
-                        # Make request to Google Custom Search API
-                        params = {
-                            'q': query,
-                            'key': api_key,
-                            'cx': cx,
-                            'start': start_index,
-                            'num': num
-                        }
-                        print(f"Requesting {num} results for '{query}' from Google API...")
-
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get('https://www.googleapis.com/customsearch/v1', params=params) as response:
-                                if response.status != 200:
-                                    error_text = await response.text()
-                                    print(f"API error: {response.status}, {error_text}")
-                                    break
-                                    
-                                data = await response.json()
-                                
-                                # Process search results
-                                for item in data.get('items', []):
-                                    result = {
-                                        "title": item.get('title', ''),
-                                        "url": item.get('link', ''),
-                                        "content": item.get('snippet', ''),
-                                        "score": None,
-                                        "raw_content": item.get('snippet', '')
-                                    }
-                                    results.append(result)
-                        
-                        # Respect API quota with a small delay
-                        await asyncio.sleep(0.2)
-                        
-                        # If we didn't get a full page of results, no need to request more
-                        if not data.get('items') or len(data.get('items', [])) < num:
-                            break
-                
-                # Web scraping based search
-                else:
-                    # Add delay between requests
-                    await asyncio.sleep(0.5 + random.random() * 1.5)
-                    print(f"Scraping Google for '{query}'...")
-
-                    # Define scraping function
-                    def google_search(query, max_results):
-                        try:
-                            lang = "en"
-                            safe = "active"
-                            start = 0
-                            fetched_results = 0
-                            fetched_links = set()
-                            search_results = []
-                            
-                            while fetched_results < max_results:
-                                # Send request to Google
-                                resp = requests.get(
-                                    url="https://www.google.com/search",
-                                    headers={
-                                        "User-Agent": get_useragent(),
-                                        "Accept": "*/*"
-                                    },
-                                    params={
-                                        "q": query,
-                                        "num": max_results + 2,
-                                        "hl": lang,
-                                        "start": start,
-                                        "safe": safe,
-                                    },
-                                    cookies = {
-                                        'CONSENT': 'PENDING+987',  # Bypasses the consent page
-                                        'SOCS': 'CAESHAgBEhIaAB',
-                                    }
-                                )
-                                resp.raise_for_status()
-                                
-                                # Parse results
-                                soup = BeautifulSoup(resp.text, "html.parser")
-                                result_block = soup.find_all("div", class_="ezO2md")
-                                new_results = 0
-                                
-                                for result in result_block:
-                                    link_tag = result.find("a", href=True)
-                                    title_tag = link_tag.find("span", class_="CVA68e") if link_tag else None
-                                    description_tag = result.find("span", class_="FrIlee")
-                                    
-                                    if link_tag and title_tag and description_tag:
-                                        link = unquote(link_tag["href"].split("&")[0].replace("/url?q=", ""))
-                                        
-                                        if link in fetched_links:
-                                            continue
-                                        
-                                        fetched_links.add(link)
-                                        title = title_tag.text
-                                        description = description_tag.text
-                                        
-                                        # Store result in the same format as the API results
-                                        search_results.append({
-                                            "title": title,
-                                            "url": link,
-                                            "content": description,
-                                            "score": None,
-                                            "raw_content": description
-                                        })
-                                        
-                                        fetched_results += 1
-                                        new_results += 1
-                                        
-                                        if fetched_results >= max_results:
-                                            break
-                                
-                                if new_results == 0:
-                                    break
-                                    
-                                start += 10
-                                time.sleep(1)  # Delay between pages
-                            
-                            return search_results
-                                
-                        except Exception as e:
-                            print(f"Error in Google search for '{query}': {str(e)}")
-                            return []
-                    
-                    # Execute search in thread pool
-                    loop = asyncio.get_running_loop()
-                    search_results = await loop.run_in_executor(
-                        executor, 
-                        lambda: google_search(query, max_results)
-                    )
-                    
-                    # Process the results
-                    results = search_results
-                
-                # If requested, fetch full page content asynchronously (for both API and web scraping)
-                if include_raw_content and results:
-                    content_semaphore = asyncio.Semaphore(3)
-                    
-                    async with aiohttp.ClientSession() as session:
-                        fetch_tasks = []
-                        
-                        async def fetch_full_content(result):
-                            async with content_semaphore:
-                                url = result['url']
-                                headers = {
-                                    'User-Agent': get_useragent(),
-                                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-                                }
-                                
-                                try:
-                                    await asyncio.sleep(0.2 + random.random() * 0.6)
-                                    async with session.get(url, headers=headers, timeout=10) as response:
-                                        if response.status == 200:
-                                            # Check content type to handle binary files
-                                            content_type = response.headers.get('Content-Type', '').lower()
-                                            
-                                            # Handle PDFs and other binary files
-                                            if 'application/pdf' in content_type or 'application/octet-stream' in content_type:
-                                                # For PDFs, indicate that content is binary and not parsed
-                                                result['raw_content'] = f"[Binary content: {content_type}. Content extraction not supported for this file type.]"
-                                            else:
-                                                try:
-                                                    # Try to decode as UTF-8 with replacements for non-UTF8 characters
-                                                    html = await response.text(errors='replace')
-                                                    soup = BeautifulSoup(html, 'html.parser')
-                                                    result['raw_content'] = soup.get_text()
-                                                except UnicodeDecodeError as ude:
-                                                    # Fallback if we still have decoding issues
-                                                    result['raw_content'] = f"[Could not decode content: {str(ude)}]"
-                                except Exception as e:
-                                    print(f"Warning: Failed to fetch content for {url}: {str(e)}")
-                                    result['raw_content'] = f"[Error fetching content: {str(e)}]"
-                                return result
-                        
-                        for result in results:
-                            fetch_tasks.append(fetch_full_content(result))
-                        
-                        updated_results = await asyncio.gather(*fetch_tasks)
-                        results = updated_results
-                        print(f"Fetched full content for {len(results)} results")
-                
-                return {
-                    "query": query,
-                    "follow_up_questions": None,
-                    "answer": None,
-                    "images": [],
-                    "results": results
-                }
-            except Exception as e:
-                print(f"Error in Google search for query '{query}': {str(e)}")
-                return {
-                    "query": query,
-                    "follow_up_questions": None,
-                    "answer": None,
-                    "images": [],
-                    "results": []
-                }
-    
-    try:
-        # Create tasks for all search queries
-        search_tasks = [search_single_query(query) for query in search_queries]
-        
-        # Execute all searches concurrently
-        search_results = await asyncio.gather(*search_tasks)
-        
-        return search_results
-    finally:
-        # Only shut down executor if it was created
-        if executor:
-            executor.shutdown(wait=False)
+    Fetches run at most max_concurrency at a time (or under a semaphore shared with other callers)
+    and HTTP_MAX_CONNECTIONS_PER_HOST per host. Pages that have not finished when the deadline
+    expires are cancelled and reported as such, so the result covers whatever was fetched in time.
+    """
+    # Reuse the pooled HTTP client
+    client = get_http_client()
+    semaphore = semaphore or asyncio.Semaphore(max_concurrency)
 
-async def scrape_pages(titles: List[str], urls: List[str]) -> str:
+    async def fetch_page(url):
+        try:
+            async with semaphore, get_host_semaphore(url):
+                # Fetch (or revalidate) the page and convert its main content to markdown
+                content_type, markdown_content, truncated = await fetch_page_content(client, url, "markdown", max_bytes)
+        except Exception as e:
+            # Handle any exceptions during fetch
+            return f"Error fetching URL: {str(e)}"
+
+        if not is_text_content_type(content_type):
+            # For binary content, just mention the content type
+            return f"Content type: {content_type} (not converted to markdown)"
+
+        if truncated:
+            markdown_content += f"\n\n[Page truncated at {max_bytes} bytes]"
+        return markdown_content
+
+    tasks = [asyncio.create_task(fetch_page(url)) for url in urls]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            print(f"Warning: {len(pending)} of {len(tasks)} pages were not fetched within {deadline}s")
+
+    return [
+        task.result() if task.done() and not task.cancelled()
+        else f"Error fetching URL: not fetched within the {deadline}s deadline"
+        for task in tasks
+    ]
+
+def format_scraped_pages(titles: List[str], urls: List[str], pages: List[str]) -> str:
+    """Format scraped pages with clear section dividers and source attribution."""
+    parts = ["Search results: \n\n"]
+    for i, (title, url, page) in enumerate(zip(titles, urls, pages)):
+        parts.append(f"\n\n--- SOURCE {i+1}: {title} ---\n")
+        parts.append(f"URL: {url}\n\n")
+        parts.append(f"FULL CONTENT:\n {page}")
+        parts.append("\n\n" + "-" * 80 + "\n")
+    return "".join(parts)
+
+async def scrape_pages(titles: List[str], urls: List[str], max_concurrency: int = SCRAPE_MAX_CONCURRENCY,
+                       deadline: float = SCRAPE_DEADLINE, max_bytes: int = SCRAPE_MAX_BYTES) -> str:
     """
     Scrapes content from a list of URLs and formats it into a readable markdown document.
     
     This function:
     1. Takes a list of page titles and URLs
-    2. Makes asynchronous HTTP requests to each URL
-    3. Converts HTML content to markdown
+    2. Fetches the pages concurrently, at most max_concurrency at a time and
+       HTTP_MAX_CONNECTIONS_PER_HOST per host, streaming at most max_bytes of each page
+    3. Converts each page's main content to markdown in a worker process, reusing
+       cached pages that the server reports as unchanged
     4. Formats all content with clear source attribution
     
+    Pages that have not finished when the deadline expires are cancelled and reported as such,
+    so the result covers whatever was fetched in time.
+    
     Args:
         titles (List[str]): A list of page titles corresponding to each URL
         urls (List[str]): A list of URLs to scrape content from
+        max_concurrency (int): Maximum number of pages fetched at the same time
+        deadline (float): Total time budget in seconds for fetching all pages
+        max_bytes (int): Maximum number of bytes read from each page
         
     Returns:
         str: A formatted string containing the full content of each page in markdown format,
              with clear section dividers and source attribution
     """
-    
-    # Create an async HTTP client
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        pages = []
-        
-        # Fetch each URL and convert to markdown
-        for url in urls:
-            try:
-                # Fetch the content
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                # Convert HTML to markdown if successful
-                if response.status_code == 200:
-                    # Handle different content types
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'text/html' in content_type:
-                        # Convert HTML to markdown
-                        markdown_content = markdownify(response.text)
-                        pages.append(markdown_content)
-                    else:
-                        # For non-HTML content, just mention the content type
-                        pages.append(f"Content type: {content_type} (not converted to markdown)")
-                else:
-                    pages.append(f"Error: Received status code {response.status_code}")
-        
-            except Exception as e:
-                # Handle any exceptions during fetch
-                pages.append(f"Error fetching URL: {str(e)}")
-        
-        # Create formatted output 
-        formatted_output = f"Search results: \n\n"
-        
-        for i, (title, url, page) in enumerate(zip(titles, urls, pages)):
-            formatted_output += f"\n\n--- SOURCE {i+1}: {title} ---\n"
-            formatted_output += f"URL: {url}\n\n"
-            formatted_output += f"FULL CONTENT:\n {page}"
-            formatted_output += "\n\n" + "-" * 80 + "\n"
-        
-    return  formatted_output
+    pages = await fetch_pages(urls, max_concurrency, deadline, max_bytes)
+    return format_scraped_pages(titles, urls, pages)
+
+def format_search_results(search_results: list[dict]) -> str:
+    """
+    Formats search responses into the string returned by the search tools, without duplicate or near-duplicate sources.
 
-@tool
-async def duckduckgo_search(search_queries: List[str]):
-    """Perform searches using DuckDuckGo with retry logic to handle rate limits
-    
     Args:
-        search_queries (List[str]): List of search queries to process
-        
+        search_results (List[dict]): List of search responses, each with a 'results' list of
+            dicts with 'title', 'url', 'content' and optional 'raw_content'
+
     Returns:
-        List[dict]: List of search results
+        str: A formatted string of search results
     """
-    
-    async def process_single_query(query):
-        # Execute synchronous search in the event loop's thread pool
-        loop = asyncio.get_event_loop()
-        
-        def perform_search():
-            max_retries = 3
-            retry_count = 0
-            backoff_factor = 2.0
-            last_exception = None
-            
-            while retry_count <= max_retries:
-                try:
-                    results = []
-                    with DDGS() as ddgs:
-                        # Change query slightly and add delay between retries
-                        if retry_count > 0:
-                            # Random delay with exponential backoff
-                            delay = backoff_factor ** retry_count + random.random()
-                            print(f"Retry {retry_count}/{max_retries} for query '{query}' after {delay:.2f}s delay")
-                            time.sleep(delay)
-                            
-                            # Add a random element to the query to bypass caching/rate limits
-                            modifiers = ['about', 'info', 'guide', 'overview', 'details', 'explained']
-                            modified_query = f"{query} {random.choice(modifiers)}"
-                        else:
-                            modified_query = query
-                        
-                        # Execute search
-                        ddg_results = list(ddgs.text(modified_query, max_results=5))
-                        
-                        # Format results
-                        for i, result in enumerate(ddg_results):
-                            results.append({
-                                'title': result.get('title', ''),
-                                'url': result.get('href', ''),
-                                'content': result.get('body', ''),
-                                'score': 1.0 - (i * 0.1),  # Simple scoring mechanism
-                                'raw_content': result.get('body', '')
-                            })
-                        
-                        # Return successful results
-                        return {
-                            'query': query,
-                            'follow_up_questions': None,
-                            'answer': None,
-                            'images': [],
-                            'results': results
-                        }
-                except Exception as e:
-                    # Store the exception and retry
-                    last_exception = e
-                    retry_count += 1
-                    print(f"DuckDuckGo search error: {str(e)}. Retrying {retry_count}/{max_retries}")
-                    
-                    # If not a rate limit error, don't retry
-                    if "Ratelimit" not in str(e) and retry_count >= 1:
-                        print(f"Non-rate limit error, stopping retries: {str(e)}")
-                        break
-            
-            # If we reach here, all retries failed
-            print(f"All retries failed for query '{query}': {str(last_exception)}")
-            # Return empty results but with query info preserved
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(last_exception)
-            }
-            
-        return await loop.run_in_executor(None, perform_search)
-
-    # Process queries with delay between them to reduce rate limiting
-    search_docs = []
-    urls = []
-    titles = []
-    for i, query in enumerate(search_queries):
-        # Add delay between queries (except first one)
-        if i > 0:
-            delay = 2.0 + random.random() * 2.0  # Random delay 2-4 seconds
-            await asyncio.sleep(delay)
-        
-        # Process the query
-        result = await process_single_query(query)
-        search_docs.append(result)
-        
-        # Safely extract URLs and titles from results, handling empty result cases
-        if result['results'] and len(result['results']) > 0:
-            for res in result['results']:
-                if 'url' in res and 'title' in res:
-                    urls.append(res['url'])
-                    titles.append(res['title'])
-    
-    # If we got any valid URLs, scrape the pages
-    if urls:
-        return await scrape_pages(titles, urls)
-    else:
-        # Return a formatted error message if no valid URLs were found
-        return "No valid search results found. Please try different search queries or use a different search API."
+    # Deduplicate results by canonical URL and near-duplicate content
+    unique_results = deduplicate_sources([result for response in search_results for result in response['results']])
+    return format_unique_results(unique_results)
 
-@tool
-async def tavily_search(queries: List[str], max_results: int = 5, topic: Literal["general", "news", "finance"] = "general") -> str:
+def search_sources(unique_results: list[dict]) -> list[dict]:
     """
-    Fetches results from Tavily search API.
-    
+    Sources of deduplicated search results, as returned alongside the formatted results by the agent search tools.
+
     Args:
-        queries (List[str]): List of search queries
-        max_results (int): Maximum number of results to return
-        topic (Literal["general", "news", "finance"]): Topic to filter results by
-        
+        unique_results (List[dict]): Deduplicated results with 'title', 'url', 'content' and optional 'raw_content'
+
     Returns:
-        str: A formatted string of search results
+        List[dict]: One dict per source with 'url', 'title', 'summary' and the full 'content'
     """
-    # Use tavily_search_async with include_raw_content=True to get content directly
-    search_results = await tavily_search_async(
-        queries,
-        max_results=5,
-        topic="general",
-        include_raw_content=True
-    )
+    return [{"url": result['url'], "title": result['title'], "summary": result['content'],
+             "content": result.get('raw_content') or result['content']} for result in unique_results]
 
-    # Format the search results directly using the raw_content already provided
-    formatted_output = f"Search results: \n\n"
-    
-    # Deduplicate results by URL
-    unique_results = {}
-    for response in search_results:
-        for result in response['results']:
-            url = result['url']
-            if url not in unique_results:
-                unique_results[url] = result
+def format_unique_results(unique_results: list[dict]) -> str:
+    """Format already deduplicated search results, numbering each source."""
+    formatted_output = "Search results: \n\n"
     
     # Format the unique results
-    for i, (url, result) in enumerate(unique_results.items()):
+    for i, result in enumerate(unique_results):
         formatted_output += f"\n\n--- SOURCE {i+1}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
+        formatted_output += f"URL: {result['url']}\n\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         if result.get('raw_content'):
             formatted_output += f"FULL CONTENT:\n{result['raw_content'][:30000]}"  # Limit content size
@@ -1374,62 +1196,714 @@ async def tavily_search(queries: List[str], max_results: int = 5, topic: Literal
     else:
         return "No valid search results found. Please try different search queries or use a different search API."
 
+# Time-to-live (seconds) for cached search responses, per search API.
+# Academic indexes change slowly; general web search results go stale faster.
+SEARCH_CACHE_TTLS = {
+    "tavily": 24 * 3600,
+    "perplexity": 12 * 3600,
+    "exa": 24 * 3600,
+    "linkup": 24 * 3600,
+    "googlesearch": 24 * 3600,
+    "duckduckgo": 24 * 3600,
+    "azureaisearch": 3600,
+    "arxiv": 7 * 24 * 3600,
+    "pubmed": 7 * 24 * 3600,
+}
+
+class SearchCache:
+    """
+    Cache for per-query search responses, keyed by (search_api, normalized query, params).
+
+    Entries live in a size-bounded in-memory LRU and, when a path is given, in a size-bounded
+    SQLite file so they survive across runs. Each search API has its own TTL.
 
-@tool
-async def azureaisearch_search(queries: List[str], max_results: int = 5, topic: str = "general") -> str:
+    Args:
+        path (str, optional): SQLite file used to persist entries. If None, the cache is memory-only.
+        max_entries (int): Maximum number of entries kept in memory.
+        max_disk_entries (int): Maximum number of entries kept on disk.
+        ttls (Dict[str, int], optional): TTL in seconds per search API. Defaults to SEARCH_CACHE_TTLS.
+        default_ttl (int): TTL for search APIs not listed in ttls. A TTL <= 0 disables caching for that API.
     """
-    Fetches results from Azure AI Search API.
-    
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1000, max_disk_entries: int = 20000,
+                 ttls: Optional[Dict[str, int]] = None, default_ttl: int = 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = ttls if ttls is not None else dict(SEARCH_CACHE_TTLS)
+        self.default_ttl = default_ttl
+        self._memory: OrderedDict = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._db = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, search_api TEXT, response TEXT, expires_at REAL, accessed_at REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize case, whitespace and surrounding punctuation so trivially different queries share an entry."""
+        return " ".join(query.lower().split()).strip(" ?.!,;:\"'")
+
+    def make_key(self, search_api: str, query: str, params: Optional[Dict[str, Any]]) -> str:
+        payload = json.dumps([search_api, self.normalize_query(query), params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, search_api: str, event: str):
+        counters = self._stats.setdefault(search_api, {"hits": 0, "misses": 0, "evictions": 0})
+        counters[event] += 1
+        record_cache_event("search", event, search_api)
+
+    def get(self, search_api: str, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[dict]:
+        """Return a cached response for the query, or None if it is missing or expired."""
+        key = self.make_key(search_api, query, params)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._record(search_api, "hits")
+                    return copy.deepcopy(response)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        response = json.loads(row[0])
+                        self._db.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._store_in_memory(search_api, key, row[1], response)
+                        self._record(search_api, "hits")
+                        return copy.deepcopy(response)
+                    self._db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._record(search_api, "misses")
+            return None
+
+    def set(self, search_api: str, query: str, params: Optional[Dict[str, Any]], response: dict):
+        """Store a response for the query using the TTL of its search API."""
+        ttl = self.ttls.get(search_api, self.default_ttl)
+        if ttl <= 0:
+            return
+
+        key = self.make_key(search_api, query, params)
+        now = time.time()
+        expires_at = now + ttl
+
+        with self._lock:
+            self._store_in_memory(search_api, key, expires_at, copy.deepcopy(response))
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, search_api, response, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, search_api, json.dumps(response, default=str), expires_at, now),
+                )
+                # Evict the least recently used rows once the file grows past its bound
+                (count,) = self._db.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+                if count > self.max_disk_entries:
+                    self._db.execute(
+                        "DELETE FROM search_cache WHERE key IN (SELECT key FROM search_cache ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_disk_entries,),
+                    )
+                self._db.commit()
+
+    def _store_in_memory(self, search_api: str, key: str, expires_at: float, response: dict):
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._record(search_api, "evictions")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return hits, misses, evictions and hit rate per search API, plus a 'total' entry."""
+        with self._lock:
+            stats = {api: dict(counters) for api, counters in self._stats.items()}
+        total = {"hits": 0, "misses": 0, "evictions": 0}
+        for counters in stats.values():
+            for name in total:
+                total[name] += counters[name]
+        stats["total"] = total
+        for counters in stats.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop all cached entries from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_initialized = False
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Return the process-wide search cache, creating it on first use.
+
+    The cache is persisted to $SEARCH_CACHE_DIR/search_cache.sqlite when SEARCH_CACHE_DIR is set,
+    and kept in memory only otherwise. Set SEARCH_CACHE=false to disable it.
+    """
+    global _search_cache, _search_cache_initialized
+    if not _search_cache_initialized:
+        _search_cache_initialized = True
+        if os.environ.get("SEARCH_CACHE", "true").lower() not in ("false", "0", "off", "no"):
+            cache_dir = os.environ.get("SEARCH_CACHE_DIR")
+            _search_cache = SearchCache(path=os.path.join(cache_dir, "search_cache.sqlite") if cache_dir else None)
+    return _search_cache
+
+def set_search_cache(cache: Optional[SearchCache]):
+    """Install a custom search cache (any object with SearchCache's get/set interface), or None to disable caching."""
+    global _search_cache, _search_cache_initialized
+    _search_cache = cache
+    _search_cache_initialized = True
+
+# Scraped pages are cached for a week; within PAGE_CACHE_FRESH_SECONDS they are served without asking the server
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PAGE_CACHE_FRESH_SECONDS = 3600
+PAGE_CACHE_TTL = 7 * 24 * 3600
+
+class PageCache:
+    """
+    Cache for content extracted from scraped pages, keyed by URL and output format.
+
+    Each entry stores the extracted content together with the page's ETag and Last-Modified headers,
+    so stale entries can be revalidated with a conditional GET instead of being downloaded and parsed
+    again. Entries are zlib-compressed and evicted least-recently-used once their total compressed
+    size exceeds max_bytes. They are kept in memory, or in a SQLite file when a path is given.
+
     Args:
-        queries (List[str]): List of search queries
-        
+        path (str, optional): SQLite file used to persist entries. If None, the cache is memory-only.
+        max_bytes (int): Maximum total compressed size of the cached entries.
+        fresh_for (int): Seconds after a fetch or revalidation during which an entry is used without revalidating.
+        ttl (int): Seconds after which an entry that cannot be revalidated (no ETag or Last-Modified) is dropped.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = PAGE_CACHE_MAX_BYTES,
+                 fresh_for: int = PAGE_CACHE_FRESH_SECONDS, ttl: int = PAGE_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self.ttl = ttl
+        self._memory: OrderedDict = OrderedDict()  # key -> compressed entry
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+        self._db = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS page_cache ("
+                "key TEXT PRIMARY KEY, data BLOB, size INTEGER, accessed_at REAL)"
+            )
+            self._db.commit()
+            (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()
+            self._total_bytes = total
+
+    @staticmethod
+    def make_key(url: str, output: str) -> str:
+        return f"{output}:{url}"
+
+    def record(self, event: str):
+        """Count a cache event ("hits", "revalidated", "misses" or "evictions")."""
+        with self._lock:
+            self._stats[event] += 1
+        record_cache_event("page", event)
+
+    def get(self, url: str, output: str) -> Optional[dict]:
+        """
+        Return the cached entry for a URL, or None.
+
+        The entry is a dict with content_type, content, truncated, etag, last_modified and validated_at.
+        Callers decide whether it is fresh enough to use as is or needs revalidating.
+        """
+        key = self.make_key(url, output)
+        with self._lock:
+            if self._db is not None:
+                row = self._db.execute("SELECT data FROM page_cache WHERE key = ?", (key,)).fetchone()
+                data = row[0] if row is not None else None
+                if data is not None:
+                    self._db.execute("UPDATE page_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+            else:
+                data = self._memory.get(key)
+                if data is not None:
+                    self._memory.move_to_end(key)
+
+        if data is None:
+            return None
+        entry = json.loads(zlib.decompress(data))
+        if not (entry.get("etag") or entry.get("last_modified")) and time.time() - entry["validated_at"] > self.ttl:
+            return None
+        return entry
+
+    def set(self, url: str, output: str, entry: dict):
+        """Store an entry (see get) for a URL, evicting the least recently used entries if the cache is full."""
+        key = self.make_key(url, output)
+        data = zlib.compress(json.dumps(entry).encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if self._db is not None:
+                row = self._db.execute("SELECT size FROM page_cache WHERE key = ?", (key,)).fetchone()
+                self._total_bytes -= row[0] if row is not None else 0
+                self._db.execute(
+                    "INSERT OR REPLACE INTO page_cache (key, data, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time()),
+                )
+                self._total_bytes += len(data)
+                while self._total_bytes > self.max_bytes:
+                    rows = self._db.execute("SELECT key, size FROM page_cache ORDER BY accessed_at LIMIT 32").fetchall()
+                    for old_key, size in rows:
+                        if self._total_bytes <= self.max_bytes:
+                            break
+                        self._db.execute("DELETE FROM page_cache WHERE key = ?", (old_key,))
+                        self._total_bytes -= size
+                        self._stats["evictions"] += 1
+                self._db.commit()
+            else:
+                old = self._memory.pop(key, None)
+                self._total_bytes -= len(old) if old is not None else 0
+                self._memory[key] = data
+                self._total_bytes += len(data)
+                while self._total_bytes > self.max_bytes:
+                    _, old = self._memory.popitem(last=False)
+                    self._total_bytes -= len(old)
+                    self._stats["evictions"] += 1
+
+    def touch(self, url: str, output: str, entry: dict):
+        """Mark an entry as just revalidated (the server answered 304 Not Modified)."""
+        self.set(url, output, {**entry, "validated_at": time.time()})
+
+    def stats(self) -> Dict[str, float]:
+        """Return hits, revalidations, misses, evictions, hit rate and total cached bytes."""
+        with self._lock:
+            stats = dict(self._stats, bytes=self._total_bytes)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop all cached pages."""
+        with self._lock:
+            self._memory.clear()
+            self._total_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM page_cache")
+                self._db.commit()
+
+_page_cache: Optional[PageCache] = None
+_page_cache_initialized = False
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    Return the process-wide page cache, creating it on first use.
+
+    Like the search cache, it is persisted to $SEARCH_CACHE_DIR/page_cache.sqlite when SEARCH_CACHE_DIR
+    is set, kept in memory otherwise, and disabled by SEARCH_CACHE=false.
+    """
+    global _page_cache, _page_cache_initialized
+    if not _page_cache_initialized:
+        _page_cache_initialized = True
+        if os.environ.get("SEARCH_CACHE", "true").lower() not in ("false", "0", "off", "no"):
+            cache_dir = os.environ.get("SEARCH_CACHE_DIR")
+            _page_cache = PageCache(path=os.path.join(cache_dir, "page_cache.sqlite") if cache_dir else None)
+    return _page_cache
+
+def set_page_cache(cache: Optional[PageCache]):
+    """Install a custom page cache, or None to disable page caching."""
+    global _page_cache, _page_cache_initialized
+    _page_cache = cache
+    _page_cache_initialized = True
+
+async def cached_search(search_api: str, search_fn: Callable, query_list: list[str], **params) -> list[dict]:
+    """
+    Run search_fn for the queries that are not already cached and merge the results with the cached ones.
+
+    Args:
+        search_api: Name of the search API, used in the cache key and to pick the TTL
+        search_fn: Search function taking a list of queries plus params and returning one response per query
+        query_list: List of search queries
+        **params: Parameters passed to search_fn, also part of the cache key
+
     Returns:
-        str: A formatted string of search results
+        List of search responses, one per query, in the order of query_list
+
+    Raises:
+        ValueError: If search_fn does not return exactly one response per query
     """
-    # Use azureaisearch_search_async with include_raw_content=True to get content directly
-    search_results = await azureaisearch_search_async(
-        queries,
-        max_results=max_results,
-        topic=topic,
-        include_raw_content=True
-    )
+    async def run_search(queries: list[str]) -> list[dict]:
+        search_results = search_fn(queries, **params)
+        if inspect.isawaitable(search_results):
+            search_results = await search_results
+        if len(search_results) != len(queries):
+            raise ValueError(f"{search_api} returned {len(search_results)} responses for {len(queries)} queries")
+        return search_results
 
-    # Format the search results directly using the raw_content already provided
-    formatted_output = f"Search results: \n\n"
-    
-    # Deduplicate results by URL
-    unique_results = {}
-    for response in search_results:
-        for result in response['results']:
-            url = result['url']
-            if url not in unique_results:
-                unique_results[url] = result
-    
-    # Format the unique results
-    for i, (url, result) in enumerate(unique_results.items()):
-        formatted_output += f"\n\n--- SOURCE {i+1}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
-        formatted_output += f"SUMMARY:\n{result['content']}\n\n"
-        if result.get('raw_content'):
-            formatted_output += f"FULL CONTENT:\n{result['raw_content'][:30000]}"  # Limit content size
-        formatted_output += "\n\n" + "-" * 80 + "\n"
-    
-    if unique_results:
-        return formatted_output
-    else:
-        return "No valid search results found. Please try different search queries or use a different search API."
+    cache = get_search_cache()
+    if cache is None:
+        return await run_search(query_list)
+
+    # Queries that only differ in case, spacing or punctuation are fetched once
+    queries_by_key = {}
+    for query in query_list:
+        queries_by_key.setdefault(SearchCache.normalize_query(query), query)
+    responses = {key: cache.get(search_api, query, params) for key, query in queries_by_key.items()}
+    missing = [key for key, response in responses.items() if response is None]
+
+    if missing:
+        search_results = await run_search([queries_by_key[key] for key in missing])
+
+        for key, response in zip(missing, search_results):
+            responses[key] = response
+            # Never cache failures or empty result sets
+            if response.get("results") and not response.get("error"):
+                cache.set(search_api, queries_by_key[key], params, response)
+
+    return [responses[SearchCache.normalize_query(query)] for query in query_list]
+
+class SearchCoordinator:
+    """
+    Run-scoped, single-flight coordinator for search queries.
+
+    All sections of a report share one coordinator. A query that another section already has in
+    flight is awaited instead of re-issued, and completed responses are reused by every section and
+    search iteration for the rest of the run. Misses go through cached_search, so the process-wide
+    search cache still applies.
+    """
+
+    def __init__(self):
+        self._responses: Dict[tuple, asyncio.Future] = {}
+        self.issued = 0
+        self.reused = 0
+        self._tasks = set()
+
+    @staticmethod
+    def _key(search_api: str, query: str, params: Dict[str, Any]) -> tuple:
+        return (search_api, SearchCache.normalize_query(query), json.dumps(params, sort_keys=True, default=str))
+
+    async def search(self, search_api: str, search_fn: Callable, query_list: list[str], **params) -> list[dict]:
+        """Same contract as cached_search, but de-duplicated against every other search in the run."""
+        loop = asyncio.get_running_loop()
+        keys = [self._key(search_api, query, params) for query in query_list]
+
+        # Claim the queries nobody has issued yet; everything else is awaited
+        owned = {}
+        for key, query in zip(keys, query_list):
+            if key in self._responses:
+                self.reused += 1
+            elif key not in owned:
+                self._responses[key] = loop.create_future()
+                owned[key] = query
+        futures = [self._responses[key] for key in keys]
+
+        if owned:
+            self.issued += len(owned)
+            # Issue the queries in their own task, so a caller that stops waiting (e.g. a discarded
+            # speculative search) does not cancel queries other sections are waiting on
+            task = asyncio.ensure_future(self._issue(search_api, search_fn, owned, params))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Shielded, so cancelling this caller does not cancel futures that other callers share
+        return [copy.deepcopy(await asyncio.shield(future)) for future in futures]
+
+    async def _issue(self, search_api: str, search_fn: Callable, owned: Dict[tuple, str], params: Dict[str, Any]):
+        """Search the claimed queries and resolve their futures."""
+        try:
+            responses = await cached_search(search_api, search_fn, list(owned.values()), **params)
+            if len(responses) != len(owned):
+                raise ValueError(f"{search_api} returned {len(responses)} responses for {len(owned)} queries")
+        except BaseException as e:
+            for key in owned:
+                future = self._responses.pop(key)
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Mark as retrieved; waiters still receive the exception
+            return
+
+        for key, response in zip(owned, responses):
+            self._responses[key].set_result(response)
+            # Let later iterations retry queries that failed or came back empty
+            if response.get("error") or not response.get("results"):
+                del self._responses[key]
+
+# Coordinators for in-progress runs, keyed by thread_id (bounded in case runs never finish)
+_search_coordinators: OrderedDict = OrderedDict()
+MAX_SEARCH_COORDINATORS = 64
+
+def get_search_coordinator(config: Optional[Dict[str, Any]]) -> Optional[SearchCoordinator]:
+    """
+    Return the search coordinator for the run identified by the config's thread_id.
 
+    Returns None when the run has no thread_id, in which case searches are not coordinated across sections.
+    """
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    if thread_id is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    key = (str(thread_id), id(loop))
+    coordinator = _search_coordinators.get(key)
+    if coordinator is None:
+        coordinator = _search_coordinators[key] = SearchCoordinator()
+        while len(_search_coordinators) > MAX_SEARCH_COORDINATORS:
+            _search_coordinators.popitem(last=False)
+    else:
+        _search_coordinators.move_to_end(key)
+    return coordinator
+
+def release_search_coordinator(config: Optional[Dict[str, Any]]):
+    """Drop the search coordinator of a finished run."""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    if thread_id is None:
+        return
+    for key in [key for key in _search_coordinators if key[0] == str(thread_id)]:
+        del _search_coordinators[key]
+
+@dataclass(frozen=True)
+class SearchBackend:
+    """
+    A search API the graphs can use, and how to run it.
+
+    Attributes:
+        name: Search API identifier used in the configuration (e.g. "tavily")
+        search_fn: "module:attribute" path of the search function, imported on first use together with
+            its SDK. It takes a list of queries plus params and returns one search response per query.
+            For output="tool" it is a LangChain tool taking search_queries instead.
+        params: Parameters accepted from search_api_config
+        default_params: Parameters always passed, unless overridden by search_api_config
+        max_concurrency: Maximum search_fn calls in flight at once across all runs, or None for no limit
+        rate_limit: Maximum queries per second sent through search_fn, or None for no limit
+        cacheable: Whether responses go through the search cache and run coordinator
+        output: How results are formatted: "sources" (deduplicate_and_format_sources),
+            "search_results" (format_search_results) or "tool" (the tool formats its own output)
+        max_tokens_per_source: Per-source token limit for output="sources"
+        description: What the backend searches, used as the description of its agent tool
+        tool: Optional "module:attribute" path of a ready-made agent tool, used by make_search_tool
+            instead of wrapping search_fn
+    """
+    name: str
+    search_fn: str
+    params: tuple = ()
+    default_params: Dict[str, Any] = field(default_factory=dict)
+    max_concurrency: Optional[int] = None
+    rate_limit: Optional[float] = None
+    cacheable: bool = True
+    output: Literal["sources", "search_results", "tool"] = "sources"
+    max_tokens_per_source: int = 4000
+    description: str = "Search the web."
+    tool: Optional[str] = None
+
+    def load(self) -> Callable:
+        """Import and return the search function."""
+        return _import_path(self.search_fn)
+
+def _import_path(path: str):
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+SEARCH_BACKENDS: Dict[str, SearchBackend] = {}
+_search_backend_limiters: Dict[str, AsyncRateLimiter] = {}
+_search_backend_semaphores = weakref.WeakKeyDictionary()  # event loop -> {backend name: Semaphore}
+
+def register_search_backend(backend: SearchBackend):
+    """Add a search backend, or replace the one with the same name."""
+    SEARCH_BACKENDS[backend.name] = backend
+    _search_backend_limiters.pop(backend.name, None)
+
+def get_search_backend(search_api: str) -> SearchBackend:
+    """Return the registered backend for a search API, raising ValueError if there is none."""
+    backend = SEARCH_BACKENDS.get(search_api)
+    if backend is None:
+        raise ValueError(f"Unsupported search API: {search_api}")
+    return backend
+
+def limit_search_backend(backend: SearchBackend, search_fn: Callable) -> Callable:
+    """Wrap a backend's search function so every call respects the backend's concurrency and rate limits."""
+
+    async def limited_search(query_list, **params):
+        queued_at = time.perf_counter()
+        if backend.rate_limit:
+            limiter = _search_backend_limiters.get(backend.name)
+            if limiter is None:
+                limiter = _search_backend_limiters[backend.name] = AsyncRateLimiter(rate=backend.rate_limit)
+            await limiter.acquire(len(query_list))
+
+        semaphore = None
+        if backend.max_concurrency:
+            semaphores = _search_backend_semaphores.setdefault(asyncio.get_running_loop(), {})
+            semaphore = semaphores.setdefault(backend.name, asyncio.Semaphore(backend.max_concurrency))
+
+        async with semaphore or contextlib.nullcontext():
+            started_at = time.perf_counter()
+            try:
+                search_results = search_fn(query_list, **params)
+                return await search_results if inspect.isawaitable(search_results) else search_results
+            finally:
+                record_search(backend.name, len(query_list), time.perf_counter() - started_at, started_at - queued_at)
+
+    return limited_search
+
+for _backend in [
+    SearchBackend(
+        name="tavily",
+        search_fn="open_deep_research.search_backends.tavily:tavily_search_async",
+        tool="open_deep_research.search_backends.tavily:tavily_search",
+        params=("max_results", "topic"),
+        default_params={"max_results": 5, "topic": "general", "include_raw_content": True},
+        max_concurrency=8,
+        output="search_results",
+        description="Search the web with Tavily for comprehensive, accurate and trusted results.",
+    ),
+    SearchBackend(
+        name="duckduckgo",
+        search_fn="open_deep_research.search_backends.duckduckgo:duckduckgo_search",
+        # Rate limiting and caching happen inside the tool
+        cacheable=False,
+        output="tool",
+        description="Search the web with DuckDuckGo.",
+    ),
+    SearchBackend(
+        name="perplexity",
+        search_fn="open_deep_research.search_backends.perplexity:perplexity_search",
+        params=("model",),
+        max_concurrency=4,
+        description="Search the web with Perplexity, returning an answer with its cited sources.",
+    ),
+    SearchBackend(
+        name="exa",
+        search_fn="open_deep_research.search_backends.exa:exa_search",
+        params=("max_characters", "num_results", "include_domains", "exclude_domains", "subpages"),
+        rate_limit=5.0,
+        description="Search the web with Exa's neural search.",
+    ),
+    SearchBackend(
+        name="arxiv",
+        search_fn="open_deep_research.search_backends.arxiv:arxiv_search_async",
+        params=("load_max_docs", "get_full_documents", "load_all_available_meta", "doc_content_chars_max"),
+        # arxiv_search_async rate-limits itself to arXiv's one request every 3 seconds
+        description="Search arXiv for academic papers in physics, mathematics, computer science and related fields.",
+    ),
+    SearchBackend(
+        name="pubmed",
+        search_fn="open_deep_research.search_backends.pubmed:pubmed_search_async",
+        params=("top_k_results", "email", "api_key", "doc_content_chars_max"),
+        # pubmed_search_async rate-limits itself to NCBI's E-utilities limits
+        description="Search PubMed for biomedical and life sciences literature.",
+    ),
+    SearchBackend(
+        name="linkup",
+        search_fn="open_deep_research.search_backends.linkup:linkup_search",
+        params=("depth",),
+        max_concurrency=4,
+        description="Search the web with Linkup.",
+    ),
+    SearchBackend(
+        name="googlesearch",
+        search_fn="open_deep_research.search_backends.googlesearch:google_search_async",
+        params=("max_results",),
+        max_concurrency=2,
+        description="Search the web with Google.",
+    ),
+    SearchBackend(
+        name="azureaisearch",
+        search_fn="open_deep_research.search_backends.azureaisearch:azureaisearch_search_async",
+        params=("max_results", "topic"),
+        max_concurrency=4,
+        description="Search the Azure AI Search index of internal documents.",
+    ),
+]:
+    register_search_backend(_backend)
+
+def make_search_tool(search_api: str, params_to_pass: Optional[Dict[str, Any]] = None) -> BaseTool:
+    """
+    Build an agent tool for any registered search backend.
 
+    The tool takes a list of queries and returns the same formatted results select_and_execute_search
+    gives the workflow graph, with the deduplicated results as sources (see search_sources) in its
+    artifact. Backends with output="tool" are already tools and are returned as they are, as are
+    backends that name their own tool.
+    """
+    backend = get_search_backend(search_api)
+    if backend.tool:
+        return _import_path(backend.tool)
+    if backend.output == "tool":
+        return backend.load()
+
+    async def search(queries: List[str]) -> Tuple[str, List[dict]]:
+        search_results = await execute_search(search_api, queries, params_to_pass or {})
+        unique_results = deduplicate_sources([result for response in search_results for result in response['results']])
+        return format_backend_results(backend, search_results), search_sources(unique_results)
+
+    return StructuredTool.from_function(
+        coroutine=search,
+        name=f"{search_api}_search",
+        description=f"{backend.description} Takes a list of search queries and returns the formatted results.",
+        response_format="content_and_artifact",
+    )
 
+async def execute_search(search_api: str, query_list: list[str], params_to_pass: dict,
+                         coordinator: Optional[SearchCoordinator] = None) -> list[dict]:
+    """
+    Run a registered backend's search function with its default parameters, limits and caching.
 
+    Args:
+        search_api: Name of the search API; its backend must not have output="tool"
+        query_list: List of search queries to execute
+        params_to_pass: Parameters to pass to the search API
+        coordinator: Optional run-scoped SearchCoordinator used to share queries across sections
 
-async def select_and_execute_search(search_api: str, query_list: list[str], params_to_pass: dict) -> str:
+    Returns:
+        List of search responses, one per query
+    """
+    backend = get_search_backend(search_api)
+    search_fn = limit_search_backend(backend, backend.load())
+    params = {**backend.default_params, **params_to_pass}
+    if backend.cacheable:
+        run_search = coordinator.search if coordinator else cached_search
+        return await run_search(search_api, search_fn, query_list, **params)
+    return await search_fn(query_list, **params)
+
+def format_backend_results(backend: SearchBackend, search_results: list[dict]) -> str:
+    """Format a backend's search responses the way its output setting asks for."""
+    if backend.output == "search_results":
+        return format_search_results(search_results)
+    return deduplicate_and_format_sources(search_results, max_tokens_per_source=backend.max_tokens_per_source,
+                                          max_total_tokens=SOURCES_MAX_TOTAL_TOKENS)
+
+async def select_and_execute_search(search_api: str, query_list: list[str], params_to_pass: dict,
+                                    coordinator: Optional[SearchCoordinator] = None) -> str:
     """Select and execute the appropriate search API.
     
+    The backend comes from SEARCH_BACKENDS, which also sets its default parameters, concurrency
+    and rate limits, cacheability and output format.
+    
     Args:
         search_api: Name of the search API to use
         query_list: List of search queries to execute
         params_to_pass: Parameters to pass to the search API
+        coordinator: Optional run-scoped SearchCoordinator used to share queries across sections
         
     Returns:
         Formatted string containing search results
@@ -1437,34 +1911,38 @@ async def select_and_execute_search(search_api: str, query_list: list[str], para
     Raises:
         ValueError: If an unsupported search API is specified
     """
-    print(f"query_list: {query_list} params_to_pass: {params_to_pass}")
-    if search_api == "tavily":
-        # Tavily search tool used with both workflow and agent 
-        return await tavily_search.ainvoke({'queries': query_list}, **params_to_pass)
-    elif search_api == "duckduckgo":
-        # DuckDuckGo search tool used with both workflow and agent 
-        return await duckduckgo_search.ainvoke({'search_queries': query_list})
-    elif search_api == "perplexity":
-        search_results = perplexity_search(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "exa":
-        search_results = await exa_search(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "arxiv":
-        search_results = await arxiv_search_async(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "pubmed":
-        search_results = await pubmed_search_async(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "linkup":
-        search_results = await linkup_search(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "googlesearch":
-        search_results = await google_search_async(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    elif search_api == "azureaisearch":
-        #raise NotImplementedError("Azure AI Search is not implemented yet.")
-        search_results = await azureaisearch_search_async(query_list, **params_to_pass)
-        return deduplicate_and_format_sources(search_results, max_tokens_per_source=4000)
-    else:
-        raise ValueError(f"Unsupported search API: {search_api}")
+    backend = get_search_backend(search_api)
+
+    if backend.output == "tool":
+        # Tools such as DuckDuckGo search, scrape and format on their own
+        started_at = time.perf_counter()
+        try:
+            return await backend.load().ainvoke({'search_queries': query_list})
+        finally:
+            record_search(backend.name, len(query_list), time.perf_counter() - started_at)
+
+    search_results = await execute_search(search_api, query_list, params_to_pass, coordinator)
+    return format_backend_results(backend, search_results)
+
+# Search functions and tools that moved to open_deep_research.search_backends, importable from here as before
+_MOVED_TO_SEARCH_BACKENDS = {
+    "tavily_search_async": "tavily",
+    "tavily_search": "tavily",
+    "get_tavily_client": "tavily",
+    "azureaisearch_search_async": "azureaisearch",
+    "azureaisearch_search": "azureaisearch",
+    "perplexity_search": "perplexity",
+    "exa_search": "exa",
+    "arxiv_search_async": "arxiv",
+    "pubmed_search_async": "pubmed",
+    "linkup_search": "linkup",
+    "google_search_async": "googlesearch",
+    "duckduckgo_search_async": "duckduckgo",
+    "duckduckgo_search": "duckduckgo",
+}
+
+def __getattr__(name: str):
+    backend_module = _MOVED_TO_SEARCH_BACKENDS.get(name)
+    if backend_module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _import_path(f"open_deep_research.search_backends.{backend_module}:{name}")
@@ -4,6 +4,9 @@ Pytest configuration for open_deep_research tests.
 
 import pytest
 
+from open_deep_research import utils
+
+
 def pytest_addoption(parser):
     """Add command-line options to pytest."""
     parser.addoption("--research-agent", action="store", help="Agent type: multi_agent or graph")
@@ -15,4 +18,23 @@ def pytest_addoption(parser):
     parser.addoption("--planner-model", action="store", help="Model for planning")
     parser.addoption("--writer-provider", action="store", help="Provider for writer model")
     parser.addoption("--writer-model", action="store", help="Model for writing")
-    parser.addoption("--max-search-depth", action="store", help="Maximum search depth")
\ No newline at end of file
+    parser.addoption("--max-search-depth", action="store", help="Maximum search depth")
+
+@pytest.fixture
+def restore_search_cache():
+    """Restore the process-wide search cache after a test that installs its own."""
+    cache, initialized = utils._search_cache, utils._search_cache_initialized
+    yield
+    utils._search_cache, utils._search_cache_initialized = cache, initialized
+
+@pytest.fixture
+def restore_page_cache():
+    """Restore the process-wide page cache after a test that installs its own."""
+    cache, initialized = utils._page_cache, utils._page_cache_initialized
+    yield
+    utils._page_cache, utils._page_cache_initialized = cache, initialized
+
+@pytest.fixture
+def no_page_cache(restore_page_cache):
+    """Run without the process-wide page cache."""
+    utils.set_page_cache(None)
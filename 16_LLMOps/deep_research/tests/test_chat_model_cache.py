@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Offline tests of the chat model cache. init_chat_model is replaced by a stub that counts its calls."""
+
+import asyncio
+import weakref
+from collections import OrderedDict
+
+import pytest
+
+from open_deep_research import utils
+from open_deep_research.utils import (
+    GovernedChatModel,
+    get_chat_model,
+    get_structured_chat_model,
+    get_tool_calling_model,
+)
+
+
+class StubChatModel:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def bind_tools(self, tools, **kwargs):
+        return ("tools", self, tuple(tools), kwargs)
+
+    def with_structured_output(self, schema):
+        return ("structured", self, schema)
+
+@pytest.fixture
+def created(monkeypatch):
+    """Start from empty caches and record every chat model init_chat_model creates."""
+    models = []
+
+    def init_chat_model(**kwargs):
+        models.append(StubChatModel(**kwargs))
+        return models[-1]
+
+    monkeypatch.setattr(utils, "init_chat_model", init_chat_model)
+    monkeypatch.setattr(utils, "_chat_models", weakref.WeakKeyDictionary())
+    monkeypatch.setattr(utils, "_sync_chat_models", OrderedDict())
+    return models
+
+def test_same_configuration_reuses_the_model(created):
+    first = get_chat_model("gpt-4.1", "openai", {"a": 1, "b": 2}, max_tokens=100)
+    second = get_chat_model("gpt-4.1", "openai", {"b": 2, "a": 1}, max_tokens=100)
+
+    assert first is second and isinstance(first, GovernedChatModel)
+    assert len(created) == 1
+    assert created[0].kwargs["model_kwargs"] == {"a": 1, "b": 2}
+    assert created[0].kwargs["max_tokens"] == 100
+    assert created[0].kwargs["callbacks"] == [utils.llm_metrics_handler]
+
+@pytest.mark.parametrize("changed", [
+    {"model": "gpt-4.1-mini"},
+    {"model_provider": "azure_openai"},
+    {"model_kwargs": {"a": 2}},
+    {"max_tokens": 200},
+])
+def test_any_configuration_change_creates_a_new_model(created, changed):
+    base = {"model": "gpt-4.1", "model_provider": "openai", "model_kwargs": {"a": 1}, "max_tokens": 100}
+    assert get_chat_model(**base) is not get_chat_model(**{**base, **changed})
+    assert len(created) == 2
+
+def test_wrappers_share_the_underlying_model(created):
+    plain = get_chat_model("gpt-4.1", "openai")
+    urgent = get_chat_model("gpt-4.1", "openai", priority=utils.LLM_PRIORITY_CRITICAL)
+    structured = get_structured_chat_model("gpt-4.1", dict, "openai")
+
+    assert len({id(plain), id(urgent), id(structured)}) == 3
+    assert (plain.priority, urgent.priority) == (utils.LLM_PRIORITY_NORMAL, utils.LLM_PRIORITY_CRITICAL)
+    assert structured.runnable == ("structured", created[0], dict)
+    assert get_structured_chat_model("gpt-4.1", dict, "openai") is structured
+    assert len(created) == 1
+
+def test_tool_calling_models_are_keyed_by_tool_names_and_bind_kwargs(created):
+    def search():
+        """Search."""
+
+    def answer():
+        """Answer."""
+
+    tools = get_tool_calling_model("gpt-4.1", [search, answer], "openai")
+    assert get_tool_calling_model("gpt-4.1", [search, answer], "openai") is tools
+    assert get_tool_calling_model("gpt-4.1", [answer, search], "openai") is not tools
+    sequential = get_tool_calling_model("gpt-4.1", [search, answer], "openai",
+                                        bind_kwargs={"parallel_tool_calls": False})
+    assert sequential is not tools
+    assert sequential.runnable[3] == {"parallel_tool_calls": False}
+    assert len(created) == 1
+
+def test_least_recently_used_models_are_evicted(created, monkeypatch):
+    monkeypatch.setattr(utils, "MAX_CHAT_MODELS", 2)
+    a = utils._cached_chat_model("a", object)
+    b = utils._cached_chat_model("b", object)
+    assert utils._cached_chat_model("a", object) is a
+    utils._cached_chat_model("c", object)
+
+    assert list(utils._sync_chat_models) == ["a", "c"]
+    assert utils._cached_chat_model("a", object) is a
+    assert utils._cached_chat_model("b", object) is not b
+
+def test_models_are_cached_per_event_loop(created):
+    async def create():
+        model = get_chat_model("gpt-4.1", "openai")
+        assert get_chat_model("gpt-4.1", "openai") is model
+        return model
+
+    first, second = asyncio.run(create()), asyncio.run(create())
+    outside_loop = get_chat_model("gpt-4.1", "openai")
+
+    assert len({id(first), id(second), id(outside_loop)}) == 3
+    assert len(created) == 3
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Offline tests of node memoization. They need no API keys or network access."""
+
+import asyncio
+import json
+import sqlite3
+import zlib
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.graph import END
+from langgraph.types import Command, Send
+from pydantic import BaseModel
+
+from open_deep_research.checkpoint import NodeMemo, get_node_memo, memoized_node
+from open_deep_research.state import SearchQuery, Section
+
+
+def test_node_memo_round_trip(tmp_path):
+    memo = NodeMemo(str(tmp_path / "memo.sqlite"))
+    section = Section(name="Intro", description="d", research=False, content="text")
+    memo.set("key", "node", {"completed_sections": [section]})
+
+    assert memo.get("key") == (True, {"completed_sections": [section]})
+    assert memo.get("other") == (False, None)
+    assert memo.stats() == {"hits": 1, "misses": 1, "stored": 1}
+
+def test_node_memo_round_trips_commands_and_messages(tmp_path):
+    memo = NodeMemo(str(tmp_path / "memo.sqlite"))
+    section = Section(name="Body", description="d", research=True, content="text")
+    outputs = {
+        "command": Command(update={"section": section, "search_queries": [SearchQuery(search_query="q")],
+                                   "search_iterations": 1}, goto=END),
+        "send": Command(goto=[Send("write_section", {"section": section, "tags": ("a", "b")})]),
+        "messages": {"messages": [
+            AIMessage(content="", tool_calls=[{"name": "Section", "args": {"name": "Body"}, "id": "call"}]),
+            ToolMessage(content="done", tool_call_id="call", name="Section"),
+        ]},
+        # Dicts that look like encoded values are stored as they are
+        "lookalike": {"__model__": "Section", "data": {}},
+    }
+    for key, output in outputs.items():
+        memo.set(key, "node", output)
+
+    command = memo.get("command")[1]
+    assert (command.update, command.goto) == (outputs["command"].update, END)
+    send = memo.get("send")[1].goto[0]
+    assert (send.node, send.arg) == ("write_section", {"section": section, "tags": ["a", "b"]})
+    messages = memo.get("messages")[1]["messages"]
+    assert messages[0].tool_calls[0]["args"] == {"name": "Body"}
+    assert isinstance(messages[1], ToolMessage) and messages[1].tool_call_id == "call"
+    assert memo.get("lookalike") == (True, outputs["lookalike"])
+
+def test_node_memo_skips_outputs_it_cannot_read_back(tmp_path):
+    class Other(BaseModel):
+        value: int
+
+    memo = NodeMemo(str(tmp_path / "memo.sqlite"))
+    for key, output in {"model": {"other": Other(value=1)}, "object": {"value": object()},
+                        "keys": {1: "int key"}}.items():
+        memo.set(key, "node", output)
+        assert memo.get(key) == (False, None)
+    assert memo.stats()["stored"] == 0
+
+def test_node_memo_never_unpickles_entries(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    memo = NodeMemo(path)
+    db = sqlite3.connect(path)
+    # A pickle that would run code, and an entry naming a model outside MEMO_MODELS
+    db.execute("INSERT INTO node_memo VALUES ('pickle', 'node', ?, 0)",
+               (zlib.compress(b"cos\nsystem\n(S'touch pwned'\ntR."),))
+    db.execute("INSERT INTO node_memo VALUES ('model', 'node', ?, 0)",
+               (zlib.compress(json.dumps({"__model__": "Configuration", "data": {}}).encode()),))
+    db.commit()
+
+    assert memo.get("pickle") == (False, None)
+    assert memo.get("model") == (False, None)
+    # Unreadable entries are dropped
+    assert db.execute("SELECT COUNT(*) FROM node_memo").fetchone()[0] == 0
+    assert not (tmp_path / "pwned").exists()
+
+def test_memoized_node_replays_outputs(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_DB", str(tmp_path / "memo.sqlite"))
+    calls = []
+
+    @memoized_node
+    async def node(state, config):
+        calls.append(state["topic"])
+        if state["topic"] == "fails":
+            raise RuntimeError("node failed")
+        return {"report": state["topic"].upper()}
+
+    async def run():
+        outputs = [await node({"topic": "x"}, {}), await node({"topic": "x"}, {"configurable": {"thread_id": "other"}}),
+                   await node({"topic": "y"}, {})]
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await node({"topic": "fails"}, {})
+        return outputs
+
+    assert asyncio.run(run()) == [{"report": "X"}, {"report": "X"}, {"report": "Y"}]
+    # Replayed under any thread_id; failures are never stored
+    assert calls == ["x", "y", "fails", "fails"]
+
+def test_report_planning_and_supervisor_are_not_memoized():
+    from open_deep_research import graph, multi_agent
+
+    # Nodes that answer user feedback must always run: timed_node wraps them directly
+    for node in (graph.generate_report_plan, multi_agent.supervisor):
+        assert not hasattr(node.__wrapped__, "__wrapped__")
+    assert hasattr(graph.generate_queries.__wrapped__, "__wrapped__")
+
+def test_node_memo_path_only_comes_from_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv("CHECKPOINT_DB", raising=False)
+    assert get_node_memo({"configurable": {"checkpoint_db": str(tmp_path / "memo.sqlite")}}) is None
+
+    monkeypatch.setenv("CHECKPOINT_DB", str(tmp_path / "memo.sqlite"))
+    assert get_node_memo({}).path == str(tmp_path / "memo.sqlite")
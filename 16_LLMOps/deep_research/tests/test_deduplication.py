@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+"""Offline tests of source deduplication by canonical URL and near-duplicate content."""
+
+import logging
+
+from open_deep_research.utils import deduplicate_sources
+
+ARTICLE = " ".join(f"word{i}" for i in range(120))
+
+def test_keeps_best_source_per_canonical_url():
+    sources = [
+        {"url": "https://www.example.com/page/?utm_source=feed", "content": "short", "score": 0.5},
+        {"url": "https://example.com/page", "content": "short", "score": 0.9},
+        {"url": "https://example.com/other", "content": "other", "score": 0.1},
+    ]
+    assert [source["score"] for source in deduplicate_sources(sources)] == [0.9, 0.1]
+
+def test_drops_near_duplicate_content(caplog):
+    sources = [
+        {"url": "https://example.com/original", "raw_content": ARTICLE, "score": 0.8},
+        {"url": "https://mirror.example.org/copy", "raw_content": ARTICLE + " syndicated", "score": 0.4},
+        {"url": "https://example.com/unrelated", "raw_content": ARTICLE.replace("word", "term"), "score": 0.2},
+    ]
+    with caplog.at_level(logging.DEBUG, logger="open_deep_research.utils"):
+        unique = deduplicate_sources(sources)
+
+    assert [source["url"] for source in unique] == ["https://example.com/original", "https://example.com/unrelated"]
+    assert "Dropped 1 near-duplicate sources" in caplog.text
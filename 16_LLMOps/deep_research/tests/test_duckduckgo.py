@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Offline tests of the DuckDuckGo search. DDGS and page fetching are replaced by stubs, so they need
+no network access.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from open_deep_research.search_backends import duckduckgo
+from open_deep_research.search_backends.duckduckgo import (
+    duckduckgo_search,
+    duckduckgo_search_async,
+)
+from open_deep_research.utils import AsyncRateLimiter, set_search_cache
+
+
+@pytest.fixture
+def fast_limiter(monkeypatch):
+    """Replace the shared DuckDuckGo limiter with a fast one and make backoff short and deterministic."""
+    limiter = AsyncRateLimiter(rate=1000.0, capacity=10)
+    monkeypatch.setattr(duckduckgo, "_duckduckgo_rate_limiter", limiter)
+    monkeypatch.setattr(duckduckgo, "DUCKDUCKGO_BACKOFF_FACTOR", 0.2)
+    monkeypatch.setattr(duckduckgo.random, "random", lambda: 0.0)
+    return limiter
+
+def stub_ddgs(monkeypatch, respond):
+    """Install a DDGS stand-in whose text() calls respond(query) and records (query, time)."""
+    calls = []
+
+    class DDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query, max_results=5):
+            calls.append((query, time.monotonic()))
+            return respond(query)
+
+    monkeypatch.setattr(duckduckgo, "DDGS", DDGS)
+    return calls
+
+def test_rate_limit_backoff_holds_back_every_query(monkeypatch, fast_limiter):
+    limited = set()
+
+    def respond(query):
+        if query == "first" and query not in limited:
+            limited.add(query)
+            raise Exception("https://duckduckgo.com 202 Ratelimit")
+        return [{"title": query, "href": f"https://example.com/{query.split()[0]}", "body": "text"}]
+
+    calls = stub_ddgs(monkeypatch, respond)
+
+    async def run():
+        first = asyncio.ensure_future(duckduckgo_search_async("first"))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        second = await duckduckgo_search_async("second")
+        return await first, second, started
+
+    first, second, started = asyncio.run(run())
+    assert [result["url"] for result in first["results"]] == ["https://example.com/first"]
+    assert second["results"] and "error" not in first
+    # The retry uses a modified query, and the pause after the rate limit delays the other query too
+    assert calls[1][0].startswith("first ")
+    assert calls[-1][0] == "second" and calls[-1][1] - started > 0.1
+
+def test_non_rate_limit_errors_are_not_retried(monkeypatch, fast_limiter):
+    def respond(query):
+        raise Exception("connection reset")
+
+    calls = stub_ddgs(monkeypatch, respond)
+    result = asyncio.run(duckduckgo_search_async("query"))
+    assert (result["results"], result["error"]) == ([], "connection reset")
+    assert len(calls) == 1
+
+def test_slow_queries_time_out_without_blocking_the_others(monkeypatch, restore_search_cache):
+    set_search_cache(None)
+
+    async def search(query):
+        if query == "slow":
+            await asyncio.sleep(5)
+        return {"query": query, "results": [{"title": query, "url": f"https://example.com/{query}"}]}
+
+    async def fetch_pages(urls, semaphore=None):
+        return [f"page of {url}" for url in urls]
+
+    monkeypatch.setattr(duckduckgo, "duckduckgo_search_async", search)
+    monkeypatch.setattr(duckduckgo, "fetch_pages", fetch_pages)
+    monkeypatch.setattr(duckduckgo, "DUCKDUCKGO_QUERY_TIMEOUT", 0.1)
+
+    started = time.monotonic()
+    output = asyncio.run(duckduckgo_search.ainvoke({"search_queries": ["slow", "fast"]}))
+    assert time.monotonic() - started < 2
+    # Called with plain arguments, the tool still returns the formatted pages as a string
+    assert isinstance(output, str)
+    assert "page of https://example.com/fast" in output and "example.com/slow" not in output
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Offline tests of main-content extraction from scraped HTML pages."""
+
+from open_deep_research.html_extraction import extract_main_content
+
+PARAGRAPH = ("LangGraph models agents as graphs of nodes, and each node reads and writes a shared state, "
+             "which makes long-running research workflows easy to checkpoint, inspect and resume.")
+
+def page(body: str) -> str:
+    return f"""<html><head><title>Page</title><style>body {{ color: red; }}</style>
+<script>trackVisitor();</script></head><body>{body}</body></html>"""
+
+NAVIGATION = """<nav><a href="/">Home</a> <a href="/blog">Blog</a> <a href="/about">About</a></nav>
+<div class="cookie-banner">We use cookies to improve your experience, please accept them all.</div>"""
+
+def test_prefers_article_element():
+    html = page(f"""{NAVIGATION}
+<div class="teaser"><p>{PARAGRAPH} Teaser.</p></div>
+<article><h1>Graphs for agents</h1><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p></article>
+<footer>Copyright and a long list of legal links that nobody reads at all.</footer>""")
+
+    markdown = extract_main_content(html)
+    assert markdown.startswith("Graphs for agents\n=")
+    assert markdown.count("LangGraph models agents") == 2
+    for boilerplate in ("Home", "cookies", "Teaser", "Copyright", "trackVisitor", "color: red"):
+        assert boilerplate not in markdown
+
+def test_scores_paragraph_containers_without_article_element():
+    links = " ".join(f'<a href="/{i}">Related story number {i}, with a long headline</a>' for i in range(10))
+    html = page(f"""{NAVIGATION}
+<div id="links"><p>{links}</p></div>
+<div id="story"><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p><p>Short.</p></div>""")
+
+    text = extract_main_content(html, output="text")
+    assert text.splitlines() == [PARAGRAPH, PARAGRAPH, "Short."]
+
+def test_falls_back_to_whole_page_without_main_content():
+    html = page("<div><p>Too short to be an article.</p><p>Still short.</p></div>")
+
+    assert "Too short to be an article." in extract_main_content(html, output="text")
+    assert "Still short." in extract_main_content(html, output="markdown")
+
+def test_caps_input_and_handles_empty_pages():
+    assert extract_main_content("   ") == ""
+    html = page(f"<article><p>{PARAGRAPH * 3}</p><p>TRAILING</p></article>")
+    assert "TRAILING" not in extract_main_content(html, output="text", max_chars=html.index("TRAILING"))
+    assert "TRAILING" in extract_main_content(html, output="text", max_chars=None)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Offline tests of the LLM governor and the governed chat models. They use stub models, so they need
+no API keys or network access.
+"""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from open_deep_research import utils
+from open_deep_research.utils import (
+    LLM_PRIORITY_CRITICAL,
+    LLM_PRIORITY_LOW,
+    GovernedChatModel,
+    LLMGovernor,
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider SDK's 429 error."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("rate limited")
+        self.response = httpx.Response(429, headers={"Retry-After": str(retry_after)})
+
+def rate_limited_once(attempts):
+    """Return a stub model function that is rate limited on its first call."""
+    def respond(model_input):
+        attempts.append(model_input)
+        if len(attempts) == 1:
+            raise RateLimitError(retry_after=0.05)
+        return "ok"
+    return respond
+
+def test_governor_serves_higher_priority_first():
+    async def run():
+        governor = LLMGovernor(max_concurrency=1)
+        await governor.acquire(10)
+        order = []
+
+        async def call(name, priority):
+            await governor.acquire(10, priority)
+            order.append(name)
+            governor.release(10)
+
+        low = asyncio.ensure_future(call("low", LLM_PRIORITY_LOW))
+        await asyncio.sleep(0)
+        critical = asyncio.ensure_future(call("critical", LLM_PRIORITY_CRITICAL))
+        await asyncio.sleep(0)
+        governor.release(10)
+        await asyncio.gather(low, critical)
+        return order
+
+    assert asyncio.run(run()) == ["critical", "low"]
+
+def test_governor_waits_for_token_budget():
+    async def run():
+        # 100 tokens per second with a 1000 token burst
+        governor = LLMGovernor(tokens_per_minute=6000, max_concurrency=None)
+        await governor.acquire(1000)
+        started = time.monotonic()
+        await governor.acquire(50)
+        return time.monotonic() - started
+
+    assert 0.4 < asyncio.run(run()) < 1.0
+
+def test_governor_refunds_unused_tokens():
+    async def run():
+        governor = LLMGovernor(tokens_per_minute=6000, max_concurrency=None)
+        await governor.acquire(1000)
+        # The call used far fewer tokens than estimated, so the difference goes back to the budget
+        governor.release(1000, actual_tokens=10)
+        started = time.monotonic()
+        await governor.acquire(500)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.1
+
+def test_governor_pause_is_not_waited_out_twice():
+    async def run():
+        # The request budget refills one call's worth during the pause
+        governor = LLMGovernor(requests_per_minute=60)
+        governor.pause(1.0)
+        started = time.monotonic()
+        await governor.acquire(10)
+        return time.monotonic() - started
+
+    assert 0.9 < asyncio.run(run()) < 1.3
+
+def test_governed_model_retries_rate_limits():
+    attempts = []
+    model = GovernedChatModel(RunnableLambda(rate_limited_once(attempts)), provider=f"stub-{uuid.uuid4()}")
+    assert asyncio.run(model.ainvoke("hello")) == "ok"
+    assert len(attempts) == 2
+
+def test_governed_model_invokes_synchronously():
+    attempts = []
+    model = GovernedChatModel(RunnableLambda(rate_limited_once(attempts)), provider=f"stub-{uuid.uuid4()}")
+    assert model.invoke("hello") == "ok"
+    assert len(attempts) == 2
+
+    model = GovernedChatModel(FakeListChatModel(responses=["a", "b", "c"]), provider=f"stub-{uuid.uuid4()}")
+    assert model.invoke("hello").content == "a"
+    # batch runs the inputs in threads, so the responses can come in either order
+    assert sorted(message.content for message in model.batch(["hello", "again"])) == ["b", "c"]
+
+def test_governed_model_derived_runnables_stay_governed(monkeypatch):
+    acquired = []
+    acquire = LLMGovernor.acquire
+
+    async def counting_acquire(self, tokens, priority=utils.LLM_PRIORITY_NORMAL):
+        acquired.append(priority)
+        await acquire(self, tokens, priority)
+
+    monkeypatch.setattr(LLMGovernor, "acquire", counting_acquire)
+    model = GovernedChatModel(FakeListChatModel(responses=["a"] * 5), provider=f"stub-{uuid.uuid4()}",
+                              priority=LLM_PRIORITY_CRITICAL)
+
+    async def run():
+        await model.with_config(tags=["test"]).ainvoke("hello")
+        await model.bind(stop=["z"]).ainvoke("hello")
+        await model.abatch(["hello", "again"])
+        return await (model | RunnableLambda(lambda message: message.content)).ainvoke("hello")
+
+    assert asyncio.run(run()) == "a"
+    assert acquired == [LLM_PRIORITY_CRITICAL] * 5
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Offline tests of the metrics registry, run summaries and the LLM metrics callback handler."""
+
+import json
+import uuid
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableLambda
+
+from open_deep_research import metrics
+from open_deep_research.metrics import (
+    LLMMetricsCallbackHandler,
+    MetricsRegistry,
+    get_run_summary,
+    record_llm_call,
+    record_search,
+    write_run_summary,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Record into a fresh registry and run summary store."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    monkeypatch.setattr(metrics, "_registry", registry)
+    monkeypatch.setattr(metrics, "_run_summaries", metrics.OrderedDict())
+    return registry
+
+def test_prometheus_text_renders_counters_and_histograms():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc("odr_llm_requests_total", model="gpt-4.1")
+    registry.inc("odr_llm_requests_total", 2, model="gpt-4.1")
+    registry.inc("custom_total", label='quote " and \\ backslash')
+    registry.observe("odr_search_duration_seconds", 0.05, backend="tavily")
+    registry.observe("odr_search_duration_seconds", 0.5, backend="tavily")
+
+    assert registry.prometheus_text() == "\n".join([
+        "# HELP custom_total custom_total",
+        "# TYPE custom_total counter",
+        'custom_total{label="quote \\" and \\\\ backslash"} 1.0',
+        "# HELP odr_llm_requests_total LLM calls",
+        "# TYPE odr_llm_requests_total counter",
+        'odr_llm_requests_total{model="gpt-4.1"} 3.0',
+        "# HELP odr_search_duration_seconds Latency of search backend calls",
+        "# TYPE odr_search_duration_seconds histogram",
+        'odr_search_duration_seconds_bucket{backend="tavily",le="0.1"} 1',
+        'odr_search_duration_seconds_bucket{backend="tavily",le="1.0"} 2',
+        'odr_search_duration_seconds_bucket{backend="tavily",le="+Inf"} 2',
+        'odr_search_duration_seconds_count{backend="tavily"} 2',
+        'odr_search_duration_seconds_sum{backend="tavily"} 0.55',
+    ]) + "\n"
+
+    assert registry.snapshot()["histograms"]["odr_search_duration_seconds"] == [
+        {"labels": {"backend": "tavily"}, "count": 2, "sum": 0.55}]
+    registry.clear()
+    assert registry.snapshot() == {"counters": {}, "histograms": {}}
+
+def test_run_summary_totals_and_costs(registry, tmp_path):
+    record_llm_call("gpt-4.1", 1.5, input_tokens=1_000_000, output_tokens=500_000, run_id="run")
+    record_llm_call("gpt-4.1-mini", 0.5, input_tokens=1_000_000, run_id="run", error=True)
+    record_search("tavily", 3, 2.0, queue_seconds=0.5, run_id="run")
+
+    summary = get_run_summary("run")
+    assert summary["llm"]["gpt-4.1"]["cost_usd"] == pytest.approx(6.0)
+    assert summary["llm"]["gpt-4.1-mini"]["errors"] == 1
+    assert summary["totals"]["llm_calls"] == 2
+    assert summary["totals"]["cost_usd"] == pytest.approx(6.4)
+    assert (summary["totals"]["search_calls"], summary["totals"]["search_queue_seconds"]) == (1, 0.5)
+    assert get_run_summary("other") is None
+
+    # A model without a price makes the total cost unknown
+    record_llm_call("local-model", 0.1, input_tokens=10, run_id="run")
+    assert get_run_summary("run")["totals"]["cost_usd"] is None
+
+    path = tmp_path / "summary.json"
+    write_run_summary("run", str(path))
+    assert json.loads(path.read_text())["totals"]["llm_calls"] == 3
+
+def test_callback_handler_records_usage_of_chat_model_calls(registry):
+    handler = LLMMetricsCallbackHandler()
+    model = FakeListChatModel(responses=["answer"], callbacks=[handler])
+
+    # The graph run's thread_id is picked up when the call starts
+    RunnableLambda(lambda text: model.invoke(text)).invoke("question", {"configurable": {"thread_id": "run"}})
+
+    assert get_run_summary("run")["llm"]["unknown"]["calls"] == 1
+    assert registry.snapshot()["counters"]["odr_llm_requests_total"] == [{"labels": {"model": "unknown"}, "value": 1.0}]
+
+def test_callback_handler_reads_token_usage(registry):
+    handler = LLMMetricsCallbackHandler()
+    with_usage = LLMResult(generations=[[ChatGeneration(message=AIMessage(
+        content="a", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15}))]])
+    from_llm_output = LLMResult(generations=[[ChatGeneration(message=AIMessage(content="b"))]],
+                                llm_output={"token_usage": {"prompt_tokens": 7, "completion_tokens": 2}})
+
+    for response in (with_usage, from_llm_output):
+        run_id = uuid.uuid4()
+        handler.on_chat_model_start({}, [], run_id=run_id, metadata={"ls_model_name": "gpt-4.1"})
+        handler.on_llm_end(response, run_id=run_id)
+    failed = uuid.uuid4()
+    handler.on_chat_model_start({}, [], run_id=failed, metadata={"ls_model_name": "gpt-4.1"})
+    handler.on_llm_error(RuntimeError("boom"), run_id=failed)
+    # Unknown runs are ignored
+    handler.on_llm_end(with_usage, run_id=uuid.uuid4())
+
+    counters = registry.snapshot()["counters"]
+    tokens = {entry["labels"]["direction"]: entry["value"] for entry in counters["odr_llm_tokens_total"]}
+    assert tokens == {"input": 19, "output": 5}
+    assert counters["odr_llm_requests_total"][0]["value"] == 3
+    assert counters["odr_llm_errors_total"][0]["value"] == 1
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Offline tests of the multi-agent supervisor and researcher context. The chat model is replaced by a stub
+that records its input, so they need no API keys or network access.
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from open_deep_research import multi_agent
+from open_deep_research.multi_agent import (
+    Section,
+    compact_tool_outputs,
+    format_source_snippets,
+    latest_tool_outputs,
+    recall_source,
+)
+
+
+def tool_turn(*calls):
+    return AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": call_id} for name, call_id in calls])
+
+@pytest.fixture
+def supervisor_inputs(monkeypatch):
+    """Run the supervisor on a state, returning the messages the model was given."""
+    inputs = []
+
+    class Model:
+        async def ainvoke(self, messages):
+            inputs.append(messages)
+            return AIMessage(content="done")
+
+    monkeypatch.setattr(multi_agent, "get_supervisor_tools", lambda config: ([], {}))
+    monkeypatch.setattr(multi_agent, "get_tool_calling_model", lambda *args, **kwargs: Model())
+
+    def run(state):
+        asyncio.run(multi_agent.supervisor(state, {}))
+        return inputs[-1]
+
+    return run
+
+def test_tool_outputs_are_stored_as_previews():
+    long_output, short_output = "x" * 30, "short"
+    messages = [
+        {"role": "tool", "name": "search", "tool_call_id": "a", "content": long_output},
+        {"role": "tool", "name": "search", "tool_call_id": "b", "content": short_output},
+        {"role": "tool", "name": "Sections", "tool_call_id": "c", "content": object()},
+        {"role": "tool", "name": "Section", "tool_call_id": "d", "content": long_output},
+    ]
+
+    assert compact_tool_outputs(messages, preview_chars=10, tool_names={"search", "Sections"}) == {"a": long_output}
+    assert messages[0]["content"].startswith("x" * 10 + "\n\n[20 more characters of this search output")
+    assert messages[1]["content"] == short_output
+    assert messages[3]["content"] == long_output
+
+def test_full_outputs_are_only_shown_on_the_next_turn():
+    state = {"messages": [tool_turn(("search", "a"), ("search", "b")),
+                          ToolMessage(content="preview", tool_call_id="a", name="search"),
+                          ToolMessage(content="short", tool_call_id="b", name="search")],
+             "tool_outputs": {"a": "full output"}}
+
+    shown = latest_tool_outputs(state)
+    assert len(shown) == 1 and "--- search (a) ---\nfull output" in shown[0]["content"]
+
+    # Once the model has made another tool call, the outputs are not shown again
+    state["messages"].append(tool_turn(("search", "c")))
+    assert latest_tool_outputs(state) == []
+    assert latest_tool_outputs({"messages": [], "tool_outputs": {}}) == []
+
+def test_supervisor_history_is_never_rewritten(supervisor_inputs):
+    history = [HumanMessage(content="Write a report"), tool_turn(("search", "a")),
+               ToolMessage(content="preview", tool_call_id="a", name="search")]
+
+    messages = supervisor_inputs({"messages": history, "tool_outputs": {"a": "full output"}})
+
+    assert messages[1:4] == history
+    assert "full output" in messages[4]["content"]
+
+def test_supervisor_is_asked_for_the_introduction_until_it_is_written(supervisor_inputs):
+    completed = [Section.args_schema(name="Body", description="d", content="## Body\n\nBody text")]
+    state = {"messages": [HumanMessage(content="Write a report"), tool_turn(("search", "a")),
+                          ToolMessage(content="results", tool_call_id="a", name="search")],
+             "sections": ["Body"], "completed_sections": completed, "conclusion": "## Conclusion"}
+
+    # A search turn after the research is done keeps the instruction
+    instruction = supervisor_inputs(state)[-1]["content"]
+    assert "Now write the introduction" in instruction and "Body text" in instruction
+
+    ledger = supervisor_inputs({**state, "introduction": "# Report"})[-1]["content"]
+    assert ledger.startswith("Report status:") and "Research is complete" not in ledger
+
+def test_supervisor_makes_one_tool_call_per_turn(monkeypatch):
+    bound = []
+
+    class Model:
+        async def ainvoke(self, messages):
+            return AIMessage(content="done")
+
+    def get_tool_calling_model(*args, **kwargs):
+        bound.append(kwargs.get("bind_kwargs"))
+        return Model()
+
+    monkeypatch.setattr(multi_agent, "get_supervisor_tools", lambda config: ([], {}))
+    monkeypatch.setattr(multi_agent, "get_tool_calling_model", get_tool_calling_model)
+    asyncio.run(multi_agent.supervisor({"messages": [HumanMessage(content="Write a report")]}, {}))
+
+    assert bound == [{"parallel_tool_calls": False}]
+
+SOURCES = [
+    {"url": "https://a.example", "title": "A", "summary": "Summary of A", "content": "a" * 40},
+    {"url": "https://b.example", "title": "B", "summary": "", "content": "b" * 40},
+]
+
+def test_search_results_are_formatted_as_snippets(monkeypatch):
+    monkeypatch.setattr(multi_agent, "SOURCE_SNIPPET_CHARS", 10)
+
+    formatted = format_source_snippets(SOURCES, {"https://b.example": SOURCES[1]})
+
+    assert "--- SOURCE: A ---\nURL: https://a.example\nFull content: 40 characters\n\nSNIPPET:\nSummary of..." in formatted
+    # Sources found by an earlier search are only referenced
+    assert "--- ALREADY FOUND: B ---\nURL: https://b.example\n" in formatted
+    assert "b" * 10 not in formatted
+    assert "No valid search results" in format_source_snippets([], {})
+
+def test_snippets_fall_back_to_the_content():
+    formatted = format_source_snippets(SOURCES[1:], {})
+    assert "SNIPPET:\n" + "b" * 40 in formatted
+
+def test_recall_source_returns_the_full_content(monkeypatch):
+    sources = {source["url"]: source for source in SOURCES}
+
+    assert recall_source("https://a.example", sources) == "--- SOURCE: A ---\nURL: https://a.example\n\nFULL CONTENT:\n" + "a" * 40
+    monkeypatch.setattr(multi_agent, "RECALL_SOURCE_MAX_CHARS", 10)
+    assert recall_source("https://a.example", sources).endswith("\n" + "a" * 10 + "...")
+    assert recall_source("https://c.example", sources).startswith("No source with URL https://c.example")
+
+def test_researcher_answers_recalls_from_sources_found_in_the_same_turn(monkeypatch):
+    class Search:
+        name = "search"
+        response_format = "content_and_artifact"
+
+        async def ainvoke(self, tool_call):
+            return ToolMessage(content="", artifact=SOURCES, tool_call_id=tool_call["id"], name="search")
+
+    tools = {"search": Search(), "RecallSource": multi_agent.RecallSource}
+    monkeypatch.setattr(multi_agent, "get_research_tools", lambda config: (list(tools.values()), tools))
+    monkeypatch.setattr(multi_agent, "SOURCE_SNIPPET_CHARS", 10)
+    turn = AIMessage(content="", tool_calls=[{"name": "search", "args": {"queries": ["q"]}, "id": "s"},
+                                             {"name": "RecallSource", "args": {"url": "https://a.example"}, "id": "r"}])
+
+    update = asyncio.run(multi_agent.research_agent_tools({"messages": [turn], "sources": {}}, {}))
+
+    assert set(update["sources"]) == {"https://a.example", "https://b.example"}
+    search, recall = update["messages"]
+    assert "--- SOURCE: A ---" in search["content"]
+    # The recalled content is stored as a preview and shown whole on the next turn
+    assert recall["content"].startswith("--- SOURCE")
+    assert "a" * 40 not in recall["content"] and "a" * 40 in update["tool_outputs"]["r"]
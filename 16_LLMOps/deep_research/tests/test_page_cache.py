@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Offline tests of the scraped page cache and its conditional revalidation. Pages are served by an
+httpx mock transport, so they need no network access.
+"""
+
+import asyncio
+import json
+import zlib
+
+import httpx
+import pytest
+
+from open_deep_research import utils
+from open_deep_research.utils import PageCache, fetch_page_content, set_page_cache
+
+
+def entry(content, validated_at=0.0, etag=None):
+    return {"content_type": "text/plain", "content": content, "truncated": False, "etag": etag,
+            "last_modified": None, "validated_at": validated_at}
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_page_cache_evicts_least_recently_used_pages(tmp_path, on_disk):
+    path = str(tmp_path / "page_cache.sqlite") if on_disk else None
+    # Room for two entries but not three
+    size = len(zlib.compress(json.dumps(entry("a" * 10, etag="e")).encode("utf-8")))
+    cache = PageCache(path=path, max_bytes=2 * size + size // 2)
+    for url in ("a", "b"):
+        cache.set(url, "text", entry(url * 10, etag="e"))
+    assert cache.get("a", "text")["content"] == "a" * 10
+    cache.set("c", "text", entry("c" * 10, etag="e"))
+
+    assert cache.get("b", "text") is None
+    assert cache.get("a", "text") is not None and cache.get("c", "text") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    # Outputs are cached separately
+    assert cache.get("a", "markdown") is None
+
+def test_page_cache_drops_entries_it_cannot_revalidate(monkeypatch):
+    now = [10_000.0]
+    monkeypatch.setattr(utils.time, "time", lambda: now[0])
+    cache = PageCache(ttl=100)
+    cache.set("plain", "text", entry("plain", validated_at=now[0]))
+    cache.set("tagged", "text", entry("tagged", validated_at=now[0], etag='"v1"'))
+
+    now[0] += 101
+    assert cache.get("plain", "text") is None
+    assert cache.get("tagged", "text")["content"] == "tagged"
+
+def test_fetch_page_content_revalidates_stale_pages(restore_page_cache):
+    cache = PageCache(fresh_for=0)
+    set_page_cache(cache)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"Content-Type": "text/plain", "ETag": '"v1"'}, text="page")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await fetch_page_content(client, "https://example.com/page", "text") for _ in range(2)]
+
+    assert asyncio.run(run()) == [("text/plain", "page", False)] * 2
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert (cache.stats()["misses"], cache.stats()["revalidated"]) == (1, 1)
+
+def test_fetch_page_content_serves_fresh_pages_without_a_request(restore_page_cache):
+    set_page_cache(PageCache())
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, headers={"Content-Type": "text/plain"}, text="page")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await fetch_page_content(client, "https://example.com/page", "text") for _ in range(2)]
+
+    assert asyncio.run(run()) == [("text/plain", "page", False)] * 2
+    assert len(requests) == 1
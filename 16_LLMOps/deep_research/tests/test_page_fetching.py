@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Offline tests of page fetching for full-content search results. Pages are served by an httpx mock
+transport, so they need no network access.
+"""
+
+import asyncio
+
+import httpx
+
+from open_deep_research import utils
+from open_deep_research.utils import fetch_page_content, fetch_pages
+
+
+def test_fetch_page_content_stops_at_max_bytes(no_page_cache):
+    served = []
+
+    async def body():
+        for _ in range(100):
+            served.append(1)
+            yield b"x" * 1000
+
+    def handler(request):
+        if request.url.path == "/binary":
+            return httpx.Response(200, headers={"Content-Type": "application/pdf"}, content=body())
+        return httpx.Response(200, headers={"Content-Type": "text/plain"}, content=body())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            text = await fetch_page_content(client, "https://example.com/text", max_bytes=2500)
+            binary = await fetch_page_content(client, "https://example.com/binary")
+            return text, binary
+
+    (content_type, content, truncated), binary = asyncio.run(run())
+    assert (content_type, content, truncated) == ("text/plain", "x" * 2500, True)
+    # Reading stops once the cap is reached instead of downloading the rest of the page
+    assert len(served) == 3
+    assert binary == ("application/pdf", "", False)
+
+def test_fetch_pages_keeps_order_and_reports_slow_pages(no_page_cache, monkeypatch):
+    async def handler(request):
+        if request.url.path == "/slow":
+            await asyncio.sleep(5)
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"Content-Type": "text/plain"}, text=f"page {request.url.path}")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(utils, "get_http_client", lambda name="default": client)
+            urls = [f"https://example.com/{path}" for path in ("slow", "a", "missing", "b")]
+            return await fetch_pages(urls, deadline=0.2)
+
+    slow, a, missing, b = asyncio.run(run())
+    assert slow == "Error fetching URL: not fetched within the 0.2s deadline"
+    assert (a, b) == ("page /a", "page /b")
+    assert missing.startswith("Error fetching URL: Client error '404 Not Found'")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Offline tests of the PubMed E-utilities search. E-utilities responses are served by an httpx mock
+transport, so they need no network access.
+"""
+
+import asyncio
+
+import httpx
+
+from open_deep_research.search_backends import pubmed
+from open_deep_research.search_backends.pubmed import (
+    _parse_pubmed_article,
+    _parse_pubmed_xml,
+    pubmed_search_async,
+)
+from open_deep_research.utils import AsyncRateLimiter
+
+EFETCH_XML = """<?xml version="1.0"?>
+<PubmedArticleSet>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">111</PMID>
+      <Article>
+        <ArticleTitle>Structured <i>abstracts</i> in trials</ArticleTitle>
+        <Abstract>
+          <AbstractText Label="BACKGROUND">Why it matters.</AbstractText>
+          <AbstractText Label="RESULTS">What was found.</AbstractText>
+          <CopyrightInformation>(c) 2024 The Authors</CopyrightInformation>
+        </Abstract>
+        <ArticleDate DateType="Electronic"><Year>2024</Year><Month>03</Month><Day>07</Day></ArticleDate>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID Version="1">222</PMID>
+      <Article>
+        <ArticleTitle>No abstract here</ArticleTitle>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+  <PubmedBookArticle>
+    <BookDocument>
+      <PMID Version="1">333</PMID>
+      <BookTitle>A book chapter</BookTitle>
+      <Abstract><AbstractText>Plain abstract text.</AbstractText></Abstract>
+    </BookDocument>
+  </PubmedBookArticle>
+</PubmedArticleSet>
+"""
+
+def parsed_articles():
+    article_set = _parse_pubmed_xml(EFETCH_XML)["PubmedArticleSet"]
+    return article_set["PubmedArticle"] + [article_set["PubmedBookArticle"]]
+
+def test_parse_pubmed_article_reads_structured_abstracts():
+    doc = _parse_pubmed_article(parsed_articles()[0], doc_content_chars_max=4000)
+    assert doc == {
+        "uid": "111",
+        "Title": "Structured abstracts in trials",
+        "Published": "2024-03-07",
+        "Copyright Information": "(c) 2024 The Authors",
+        "Summary": "BACKGROUND: Why it matters.\nRESULTS: What was found.",
+    }
+    assert _parse_pubmed_article(parsed_articles()[0], doc_content_chars_max=10)["Summary"] == "BACKGROUND"
+
+def test_parse_pubmed_article_handles_missing_abstracts_and_books():
+    no_abstract, book = parsed_articles()[1:]
+    assert _parse_pubmed_article(no_abstract, 4000)["Summary"] == "No abstract available"
+    assert _parse_pubmed_article(no_abstract, 4000)["Published"] == ""
+    doc = _parse_pubmed_article(book, 4000)
+    assert (doc["uid"], doc["Title"], doc["Summary"]) == ("333", "A book chapter", "Plain abstract text.")
+
+def test_pubmed_search_batches_efetch_across_queries(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path.endswith("esearch.fcgi"):
+            # The first esearch call is throttled once
+            if len(requests) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            ids = {"trials": ["111", "222"], "books": ["333", "111"]}[request.url.params["term"]]
+            return httpx.Response(200, json={"esearchresult": {"idlist": ids}})
+        return httpx.Response(200, text=EFETCH_XML)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(pubmed, "get_http_client", lambda name="default": client)
+    monkeypatch.setattr(pubmed, "get_pubmed_rate_limiter", lambda api_key=None: AsyncRateLimiter(rate=1000.0))
+
+    trials, books = asyncio.run(pubmed_search_async(["trials", "books"], api_key="key"))
+
+    assert [result["url"] for result in trials["results"]] == [
+        "https://pubmed.ncbi.nlm.nih.gov/111/", "https://pubmed.ncbi.nlm.nih.gov/222/"]
+    assert [result["title"] for result in books["results"]] == ["A book chapter", "Structured abstracts in trials"]
+    assert "Published: 2024-03-07" in trials["results"][0]["content"]
+    assert trials["results"][0]["score"] > trials["results"][1]["score"]
+
+    efetches = [request for request in requests if request.url.path.endswith("efetch.fcgi")]
+    assert len(efetches) == 1
+    assert efetches[0].url.params["id"] == "111,222,333"
+    assert all(request.url.params["api_key"] == "key" for request in requests)
+
+def test_pubmed_search_reports_failed_queries(monkeypatch):
+    def handler(request):
+        if request.url.params.get("term") == "broken":
+            return httpx.Response(400)
+        if request.url.path.endswith("esearch.fcgi"):
+            return httpx.Response(200, json={"esearchresult": {"idlist": ["222"]}})
+        return httpx.Response(200, text=EFETCH_XML)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(pubmed, "get_http_client", lambda name="default": client)
+    monkeypatch.setattr(pubmed, "get_pubmed_rate_limiter", lambda api_key=None: AsyncRateLimiter(rate=1000.0))
+
+    broken, working = asyncio.run(pubmed_search_async(["broken", "working"]))
+    assert broken["results"] == [] and "400" in broken["error"]
+    assert [result["title"] for result in working["results"]] == ["No abstract here"]
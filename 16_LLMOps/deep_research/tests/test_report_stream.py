@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+"""Offline tests of the report event stream. They need no API keys or network access."""
+
+from open_deep_research import streaming
+from open_deep_research.streaming import ReportStream
+
+
+def test_report_stream_emits_in_plan_order(monkeypatch):
+    events = []
+    monkeypatch.setattr(streaming, "_stream_writer", lambda: events.append)
+
+    stream = ReportStream(["Intro", "Body", "Conclusion"])
+    stream.start()
+    stream.token("Body", "body ")
+    stream.complete("Conclusion", "conclusion text")
+    stream.token("Intro", "intro ")
+    stream.token("Body", "more")
+    stream.complete("Intro", "intro text")
+    stream.complete("Body", "body text")
+
+    assert [(event["event"], event["section"], event.get("text")) for event in events] == [
+        ("section_started", "Intro", None),
+        ("token", "Intro", "intro "),
+        ("section_completed", "Intro", None),
+        ("section_started", "Body", None),
+        ("token", "Body", "body more"),
+        ("section_completed", "Body", None),
+        ("section_started", "Conclusion", None),
+        ("section_completed", "Conclusion", None),
+    ]
+    assert [event["content"] for event in events if event["event"] == "section_completed"] == [
+        "intro text", "body text", "conclusion text"]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Offline tests of the search backend registry and the Tavily output format. The Tavily client is
+replaced by a stub, so they need no network access.
+"""
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from open_deep_research import utils
+from open_deep_research.search_backends import tavily
+from open_deep_research.utils import (
+    SEARCH_BACKENDS,
+    make_search_tool,
+    select_and_execute_search,
+    set_search_cache,
+)
+
+TAVILY_RESULTS = {
+    "first": [
+        {"title": "Graphs", "url": "https://example.com/graphs", "content": "About graphs.",
+         "score": 0.9, "raw_content": "Graphs " * 5000},
+        {"title": "No page", "url": "https://example.com/snippet", "content": "Only a snippet.",
+         "score": 0.5, "raw_content": None},
+    ],
+    "second": [
+        {"title": "Graphs again", "url": "https://example.com/graphs/", "content": "About graphs.",
+         "score": 0.8, "raw_content": "Graphs"},
+    ],
+}
+
+# The format tavily_search has always returned
+EXPECTED_TAVILY_OUTPUT = (
+    "Search results: \n\n"
+    "\n\n--- SOURCE 1: Graphs ---\nURL: https://example.com/graphs\n\nSUMMARY:\nAbout graphs.\n\n"
+    f"FULL CONTENT:\n{('Graphs ' * 5000)[:30000]}"
+    "\n\n" + "-" * 80 + "\n"
+    "\n\n--- SOURCE 2: No page ---\nURL: https://example.com/snippet\n\nSUMMARY:\nOnly a snippet.\n\n"
+    "\n\n" + "-" * 80 + "\n"
+)
+
+@pytest.fixture
+def stub_tavily(monkeypatch, restore_search_cache):
+    set_search_cache(None)
+
+    class AsyncTavilyClient:
+        async def search(self, query, **kwargs):
+            return {"query": query, "results": TAVILY_RESULTS[query]}
+
+    monkeypatch.setattr(tavily, "get_tavily_client", AsyncTavilyClient)
+
+def test_tavily_tool_output_format(stub_tavily):
+    output = asyncio.run(tavily.tavily_search.ainvoke({"queries": ["first", "second"]}))
+    assert output == EXPECTED_TAVILY_OUTPUT
+
+def test_tavily_backend_matches_the_tool(stub_tavily):
+    assert asyncio.run(select_and_execute_search("tavily", ["first", "second"], {})) == EXPECTED_TAVILY_OUTPUT
+    # Agents get the Tavily tool itself
+    assert make_search_tool("tavily") is tavily.tavily_search
+
+def test_registry_points_at_backend_modules():
+    for backend in SEARCH_BACKENDS.values():
+        assert backend.search_fn.startswith("open_deep_research.search_backends.")
+        assert callable(backend.load())
+    # Names that moved out of utils are still importable from it
+    assert utils.duckduckgo_search_async is not None
+    with pytest.raises(AttributeError):
+        utils.no_such_search
+
+def test_search_sdks_are_imported_on_first_use():
+    code = (
+        "import sys\n"
+        "import open_deep_research.graph, open_deep_research.multi_agent\n"
+        "sdks = ('tavily', 'exa_py', 'linkup', 'azure.search.documents', 'xmltodict', 'arxiv', 'pymupdf', 'duckduckgo_search')\n"
+        "assert not [sdk for sdk in sdks if sdk in sys.modules], sys.modules.keys() & set(sdks)\n"
+        "from open_deep_research.utils import get_search_backend\n"
+        "get_search_backend('pubmed').load()\n"
+        "assert 'xmltodict' in sys.modules and 'tavily' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
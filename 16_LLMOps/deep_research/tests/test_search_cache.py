@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Offline tests of the search response cache and cached_search. They use stub search functions, so
+they need no API keys or network access.
+"""
+
+import asyncio
+
+from open_deep_research import utils
+from open_deep_research.utils import SearchCache, cached_search, set_search_cache
+
+
+def response(query, results=1):
+    return {"query": query, "results": [{"url": f"https://example.com/{query}/{i}"} for i in range(results)]}
+
+def test_search_cache_normalizes_queries_and_params():
+    cache = SearchCache()
+    cache.set("tavily", "What is LangGraph?", {"max_results": 5}, response("langgraph"))
+
+    assert cache.get("tavily", "  what is   langgraph ", {"max_results": 5}) == response("langgraph")
+    assert cache.get("tavily", "what is langgraph", {"max_results": 3}) is None
+    assert cache.get("exa", "what is langgraph", {"max_results": 5}) is None
+    assert cache.stats()["tavily"]["hits"] == 1
+
+def test_search_cache_returns_copies():
+    cache = SearchCache()
+    cache.set("tavily", "query", None, response("query"))
+    cache.get("tavily", "query")["results"].clear()
+    assert cache.get("tavily", "query")["results"]
+
+def test_search_cache_expires_entries_per_api(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "time", lambda: now[0])
+    cache = SearchCache(ttls={"tavily": 60, "azureaisearch": 0})
+    cache.set("tavily", "query", None, response("query"))
+    cache.set("azureaisearch", "query", None, response("query"))
+
+    now[0] += 59
+    assert cache.get("tavily", "query") is not None
+    now[0] += 2
+    assert cache.get("tavily", "query") is None
+    # A TTL of zero disables caching for that API
+    assert cache.get("azureaisearch", "query") is None
+
+def test_search_cache_evicts_least_recently_used_entries():
+    cache = SearchCache(max_entries=2)
+    for query in ("a", "b"):
+        cache.set("tavily", query, None, response(query))
+    cache.get("tavily", "a")
+    cache.set("tavily", "c", None, response("c"))
+
+    assert cache.get("tavily", "b") is None
+    assert cache.get("tavily", "a") is not None and cache.get("tavily", "c") is not None
+    assert cache.stats()["total"]["evictions"] == 1
+
+def test_search_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "cache" / "search_cache.sqlite")
+    cache = SearchCache(path=path, max_disk_entries=2)
+    for query in ("a", "b", "c"):
+        cache.set("tavily", query, None, response(query))
+
+    reopened = SearchCache(path=path)
+    assert reopened.get("tavily", "c") == response("c")
+    # Only max_disk_entries rows are kept on disk
+    assert reopened.get("tavily", "a") is None
+
+    reopened.clear()
+    assert SearchCache(path=path).get("tavily", "c") is None
+
+def test_cached_search_fetches_only_missing_queries(restore_search_cache):
+    set_search_cache(SearchCache())
+    calls = []
+
+    async def search_fn(queries, **params):
+        calls.append(list(queries))
+        return [response(query, results=0 if query == "empty" else 1) for query in queries]
+
+    async def run():
+        first = await cached_search("tavily", search_fn, ["alpha", "Alpha?", "empty"], max_results=5)
+        second = await cached_search("tavily", search_fn, ["alpha", "beta", "empty"], max_results=5)
+        return first, second
+
+    first, second = asyncio.run(run())
+    # Equivalent queries are fetched once and empty responses are never cached
+    assert calls == [["alpha", "empty"], ["beta", "empty"]]
+    assert first[0] == first[1] == second[0] == response("alpha")
+    assert second[1] == response("beta")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Offline tests of the run-scoped search coordinator. They use stub search functions, so they need no
+API keys or network access.
+"""
+
+import asyncio
+
+import pytest
+
+from open_deep_research.utils import SearchCoordinator, set_search_cache
+
+
+@pytest.fixture
+def no_search_cache(restore_search_cache):
+    """Run without the process-wide search cache."""
+    set_search_cache(None)
+
+def test_search_coordinator_single_flight(no_search_cache):
+    calls = []
+
+    async def search_fn(queries, **params):
+        calls.append(list(queries))
+        await asyncio.sleep(0.01)
+        return [{"query": query, "results": [{"url": f"https://example.com/{query}"}]} for query in queries]
+
+    async def run():
+        coordinator = SearchCoordinator()
+        first, second = await asyncio.gather(
+            coordinator.search("stub", search_fn, ["alpha", "beta"]),
+            coordinator.search("stub", search_fn, ["Alpha", "gamma"]),
+        )
+        third = await coordinator.search("stub", search_fn, ["beta"])
+        return coordinator, first, second, third
+
+    coordinator, first, second, third = asyncio.run(run())
+    assert calls == [["alpha", "beta"], ["gamma"]]
+    assert second[0] == first[0] and third[0] == first[1]
+    assert (coordinator.issued, coordinator.reused) == (3, 2)
+    # Callers get their own copies of shared responses
+    first[0]["results"].clear()
+    assert second[0]["results"]
+
+def test_search_coordinator_retries_empty_responses(no_search_cache):
+    calls = []
+
+    async def search_fn(queries, **params):
+        calls.append(list(queries))
+        return [{"query": query, "results": []} for query in queries]
+
+    async def run():
+        coordinator = SearchCoordinator()
+        await coordinator.search("stub", search_fn, ["alpha"])
+        await coordinator.search("stub", search_fn, ["alpha"])
+
+    asyncio.run(run())
+    assert calls == [["alpha"], ["alpha"]]
+
+def test_search_coordinator_rejects_missing_responses(no_search_cache):
+    async def search_fn(queries, **params):
+        return [{"query": queries[0], "results": []}]
+
+    async def run():
+        coordinator = SearchCoordinator()
+        return await asyncio.gather(
+            coordinator.search("stub", search_fn, ["alpha", "beta"]),
+            coordinator.search("stub", search_fn, ["beta"]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
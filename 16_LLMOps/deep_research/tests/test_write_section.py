@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Offline tests of write_section with speculative follow-up search. The chat models and the search are
+replaced by stubs, so they need no API keys or network access.
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from open_deep_research import graph, streaming
+from open_deep_research.state import Feedback, Queries, SearchQuery, Section
+from open_deep_research.streaming import release_report_stream, start_report_stream
+
+DRAFT = ["Graphs ", "make agents ", "easy to inspect."]
+
+@pytest.fixture
+def run(monkeypatch):
+    """Run write_section once with a given grade, returning its command and the report events."""
+    searches = []
+    grade = "pass"
+
+    class Writer:
+        async def astream(self, messages):
+            for text in DRAFT:
+                yield AIMessageChunk(content=text)
+
+        async def ainvoke(self, messages):
+            return AIMessage(content="".join(DRAFT))
+
+    def structured_model(model, schema, **kwargs):
+        class Model:
+            async def ainvoke(self, messages):
+                if schema is Queries:
+                    return Queries(queries=[SearchQuery(search_query="speculative query")])
+                return Feedback(grade=grade, follow_up_queries=[SearchQuery(search_query="grader query")])
+        return Model()
+
+    async def search(search_api, query_list, params_to_pass, coordinator=None):
+        searches.append(query_list)
+        return "new sources"
+
+    monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: Writer())
+    monkeypatch.setattr(graph, "get_structured_chat_model", structured_model)
+    monkeypatch.setattr(graph, "select_and_execute_search", search)
+    monkeypatch.setattr(graph, "get_search_coordinator", lambda config: None)
+    events = []
+    monkeypatch.setattr(streaming, "_stream_writer", lambda: events.append)
+
+    def write(feedback_grade):
+        nonlocal grade
+        grade = feedback_grade
+        config = {"configurable": {"thread_id": f"write-section-{grade}", "speculative_search": True}}
+        section = Section(name="Graphs", description="Agent graphs", research=True, content="")
+        start_report_stream(config, [section])
+        state = {"topic": "Agents", "section": section, "source_str": "sources", "search_iterations": 0}
+        try:
+            command = asyncio.run(graph.write_section(state, config))
+        finally:
+            release_report_stream(config)
+        return command, events, searches
+
+    return write
+
+def test_accepted_speculative_draft_is_streamed(run):
+    command, events, searches = run("pass")
+
+    assert command.update["completed_sections"][0].content == "".join(DRAFT)
+    assert [(event["event"], event.get("text")) for event in events] == [
+        ("section_started", None),
+        ("token", "".join(DRAFT)),
+        ("section_completed", None),
+    ]
+
+def test_rejected_speculative_draft_is_rewritten_with_the_speculative_search(run):
+    command, events, searches = run("fail")
+
+    assert command.goto == "write_section"
+    assert command.update["source_str"] == "new sources"
+    assert command.update["search_iterations"] == 1
+    assert searches == [["speculative query"]]
+    # The rejected draft is not part of the report
+    assert [event["event"] for event in events] == ["section_started"]
+
+def test_final_sections_get_only_their_dependencies_as_context():
+    sections = [
+        Section(name="Intro", description="d", research=False, content="", depends_on=["Body"]),
+        Section(name="Body", description="d", research=True, content=""),
+        Section(name="Other", description="d", research=True, content=""),
+        Section(name="Conclusion", description="d", research=False, content=""),
+    ]
+    completed = [s.model_copy(update={"content": f"{s.name} text"}) for s in sections if s.research]
+
+    sends = graph.initiate_final_section_writing({"topic": "Agents", "sections": sections, "completed_sections": completed})
+
+    assert [send.arg["section"].name for send in sends] == ["Intro", "Conclusion"]
+    intro, conclusion = (send.arg["report_sections_from_research"] for send in sends)
+    assert "Body text" in intro and "Other text" not in intro
+    assert "Body text" in conclusion and "Other text" in conclusion
+    assert graph.initiate_final_section_writing({"topic": "Agents", "sections": sections[1:3],
+                                                 "completed_sections": completed}) == "compile_final_report"